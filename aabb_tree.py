@@ -0,0 +1,367 @@
+from typing import Callable, Optional
+
+from custom_types import AABB, Scalar
+from vec2 import Vec2
+
+# How far a body's bounding box is grown when stored in the tree. A body
+# can move this far before its node has to be reinserted.
+FAT_MARGIN = 10
+
+type RayCallback = Callable[[int], Optional[Scalar]]
+
+
+class TreeNode:
+    """A node in an AABBTree.
+
+    Leaves hold a single body ID, and branches always have two children.
+    Every node's box encloses the boxes of all of its children.
+
+    Attributes:
+        aabb: The (fattened, for leaves) bounding box of the node.
+        parent: The parent node, or None for the root.
+        child_1: The first child, or None for leaves.
+        child_2: The second child, or None for leaves.
+        height: The height of the subtree, 0 for leaves.
+        id: The body ID of a leaf, or None for branches.
+    """
+
+    def __init__(self, aabb: AABB, id: Optional[int] = None) -> None:
+        """Initializes a node with a bounding box.
+
+        Args:
+            aabb: The bounding box of the node.
+            id: The body ID, if the node is a leaf.
+        """
+        self.aabb = aabb
+        self.parent: Optional[TreeNode] = None
+        self.child_1: Optional[TreeNode] = None
+        self.child_2: Optional[TreeNode] = None
+        self.height: int = 0
+        self.id = id
+
+    @property
+    def is_leaf(self) -> bool:
+        """Determines if the node is a leaf."""
+        return self.child_1 is None
+
+
+class AABBTree:
+    """A dynamic bounding volume hierarchy over body bounding boxes.
+
+    Each body is stored in a leaf with a fattened bounding box, so that
+    small movements do not change the tree at all; a leaf is only
+    reinserted once the body leaves its fat box. The tree is kept
+    balanced with rotations, so queries are O(log n) rather than a
+    scan over every body.
+
+    Attributes:
+        root: The root node of the tree, or None if it is empty.
+        margin: The distance leaf boxes are fattened by.
+    """
+
+    def __init__(self, margin: Scalar = FAT_MARGIN) -> None:
+        """Initializes an empty tree.
+
+        Args:
+            margin: The distance leaf boxes are fattened by.
+                Defaults to FAT_MARGIN.
+        """
+        self.root: Optional[TreeNode] = None
+        self.margin = margin
+        self._leaves: dict[int, TreeNode] = {}
+
+    def __len__(self) -> int:
+        """Returns the number of bodies in the tree."""
+        return len(self._leaves)
+
+    def __contains__(self, id: int) -> bool:
+        """Determines if a body ID is stored in the tree."""
+        return id in self._leaves
+
+    def insert(self, id: int, aabb: AABB) -> None:
+        """Adds a body to the tree, replacing it if already present.
+
+        Args:
+            id: The ID of the body.
+            aabb: The tight bounding box of the body.
+        """
+        if id in self._leaves:
+            self.remove(id)
+        leaf = TreeNode(aabb.expanded(self.margin), id)
+        self._leaves[id] = leaf
+        self._insert_leaf(leaf)
+
+    def remove(self, id: int) -> None:
+        """Removes a body from the tree if present.
+
+        Args:
+            id: The ID of the body.
+        """
+        leaf = self._leaves.pop(id, None)
+        if leaf is not None:
+            self._remove_leaf(leaf)
+
+    def move(self, id: int, aabb: AABB) -> bool:
+        """Updates the bounding box of a body.
+
+        Nothing changes unless the body has left its fat box.
+
+        Args:
+            id: The ID of the body.
+            aabb: The new tight bounding box of the body.
+
+        Returns:
+            True if the body had to be reinserted, otherwise False.
+        """
+        leaf = self._leaves.get(id)
+        if leaf is None:
+            self.insert(id, aabb)
+            return True
+        if leaf.aabb.contains(aabb):
+            return False
+        self._remove_leaf(leaf)
+        leaf.aabb = aabb.expanded(self.margin)
+        self._insert_leaf(leaf)
+        return True
+
+    def clear(self) -> None:
+        """Removes every body from the tree."""
+        self.root = None
+        self._leaves = {}
+
+    def query_point(self, point: Vec2) -> list[int]:
+        """Finds every body whose fat box contains a point.
+
+        Args:
+            point: The point to search at.
+
+        Returns:
+            The IDs of bodies which may contain the point.
+        """
+        return self._query(lambda aabb: aabb.contains_point(point))
+
+    def query_region(self, region: AABB) -> list[int]:
+        """Finds every body whose fat box overlaps a region.
+
+        Args:
+            region: The box to search in.
+
+        Returns:
+            The IDs of bodies which may overlap the region.
+        """
+        return self._query(region.overlaps)
+
+    def raycast(
+        self,
+        origin: Vec2,
+        direction: Vec2,
+        max_distance: Scalar,
+        callback: RayCallback,
+    ) -> tuple[int, Scalar] | None:
+        """Finds the first body along a ray.
+
+        Subtrees are skipped if the ray enters them further away than
+        the closest hit found so far.
+
+        Args:
+            origin: The start of the ray.
+            direction: The normalized direction of the ray.
+            max_distance: The length of the ray.
+            callback: Called with the ID of each body whose box the ray
+                enters; returns the exact distance to the body along the
+                ray, or None if the ray misses it.
+
+        Returns:
+            The ID of the closest body hit and the distance to it,
+            or None if nothing was hit.
+        """
+        best: tuple[int, Scalar] | None = None
+        best_distance = max_distance
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            entry = node.aabb.ray_entry(origin, direction, best_distance)
+            if entry is None:
+                continue
+            if node.is_leaf:
+                distance = callback(node.id)
+                if distance is not None and distance <= best_distance:
+                    best_distance = distance
+                    best = (node.id, distance)
+            else:
+                stack.append(node.child_1)
+                stack.append(node.child_2)
+        return best
+
+    def _query(self, test: Callable[[AABB], bool]) -> list[int]:
+        """Collects every leaf whose box and ancestors pass a test.
+
+        Args:
+            test: A predicate over bounding boxes.
+
+        Returns:
+            The IDs of the matching leaves.
+        """
+        found: list[int] = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            if not test(node.aabb):
+                continue
+            if node.is_leaf:
+                found.append(node.id)
+            else:
+                stack.append(node.child_1)
+                stack.append(node.child_2)
+        return found
+
+    def _insert_leaf(self, leaf: TreeNode) -> None:
+        """Inserts a leaf next to the sibling that grows the tree least.
+
+        Args:
+            leaf: The leaf to insert.
+        """
+        if self.root is None:
+            self.root = leaf
+            leaf.parent = None
+            return
+
+        aabb = leaf.aabb
+        node = self.root
+        while not node.is_leaf:
+            combined = node.aabb.union(aabb).perimeter()
+            # Cost of pairing the leaf with this node directly.
+            cost = 2 * combined
+            # Cost pushed down onto the children by descending.
+            inherited = 2 * (combined - node.aabb.perimeter())
+
+            costs = []
+            for child in (node.child_1, node.child_2):
+                enlarged = child.aabb.union(aabb).perimeter()
+                if child.is_leaf:
+                    costs.append(enlarged + inherited)
+                else:
+                    costs.append(enlarged - child.aabb.perimeter() + inherited)
+
+            if cost < costs[0] and cost < costs[1]:
+                break
+            node = node.child_1 if costs[0] < costs[1] else node.child_2
+
+        sibling = node
+        old_parent = sibling.parent
+        parent = TreeNode(sibling.aabb.union(aabb))
+        parent.parent = old_parent
+        parent.height = sibling.height + 1
+        parent.child_1 = sibling
+        parent.child_2 = leaf
+        sibling.parent = parent
+        leaf.parent = parent
+
+        if old_parent is None:
+            self.root = parent
+        elif old_parent.child_1 is sibling:
+            old_parent.child_1 = parent
+        else:
+            old_parent.child_2 = parent
+
+        self._refit_ancestors(parent.parent)
+
+    def _remove_leaf(self, leaf: TreeNode) -> None:
+        """Detaches a leaf and collapses its parent into its sibling.
+
+        Args:
+            leaf: The leaf to remove.
+        """
+        if leaf is self.root:
+            self.root = None
+            return
+
+        parent = leaf.parent
+        grandparent = parent.parent
+        sibling = parent.child_2 if parent.child_1 is leaf else parent.child_1
+
+        if grandparent is None:
+            self.root = sibling
+            sibling.parent = None
+        else:
+            if grandparent.child_1 is parent:
+                grandparent.child_1 = sibling
+            else:
+                grandparent.child_2 = sibling
+            sibling.parent = grandparent
+            self._refit_ancestors(grandparent)
+        leaf.parent = None
+
+    def _refit_ancestors(self, node: Optional[TreeNode]) -> None:
+        """Rebalances and recomputes boxes from a node up to the root.
+
+        Args:
+            node: The first node to refit.
+        """
+        while node is not None:
+            node = self._balance(node)
+            node.height = 1 + max(node.child_1.height, node.child_2.height)
+            node.aabb = node.child_1.aabb.union(node.child_2.aabb)
+            node = node.parent
+
+    def _balance(self, a: TreeNode) -> TreeNode:
+        """Rotates a node if one subtree is more than one level taller.
+
+        Args:
+            a: The node to balance.
+
+        Returns:
+            The node now at a's position in the tree.
+        """
+        if a.is_leaf or a.height < 2:
+            return a
+
+        b, c = a.child_1, a.child_2
+        balance = c.height - b.height
+        if balance > 1:
+            return self._rotate(a, c, b, tall_is_first=False)
+        if balance < -1:
+            return self._rotate(a, b, c, tall_is_first=True)
+        return a
+
+    def _rotate(
+        self, a: TreeNode, tall: TreeNode, short: TreeNode, tall_is_first: bool
+    ) -> TreeNode:
+        """Promotes the taller child of a node above it.
+
+        Args:
+            a: The unbalanced node.
+            tall: The taller child, which takes a's place.
+            short: The shorter child, which stays under a.
+            tall_is_first: True if tall was a's first child.
+
+        Returns:
+            The promoted node.
+        """
+        f, g = tall.child_1, tall.child_2
+
+        tall.child_1 = a
+        tall.parent = a.parent
+        a.parent = tall
+        if tall.parent is None:
+            self.root = tall
+        elif tall.parent.child_1 is a:
+            tall.parent.child_1 = tall
+        else:
+            tall.parent.child_2 = tall
+
+        # The taller grandchild stays with the promoted node and the
+        # shorter one moves down under a.
+        keep, move = (f, g) if f.height > g.height else (g, f)
+        tall.child_2 = keep
+        move.parent = a
+        if tall_is_first:
+            a.child_1 = move
+        else:
+            a.child_2 = move
+
+        a.aabb = short.aabb.union(move.aabb)
+        a.height = 1 + max(short.height, move.height)
+        tall.aabb = a.aabb.union(keep.aabb)
+        tall.height = 1 + max(a.height, keep.height)
+        return tall
@@ -0,0 +1,134 @@
+"""Compares the speed of the collision detection methods.
+
+Also measures the memory and update speed of many bodies. That the
+flat-float kernels give exactly the same results as the Vec2 code is
+tested in test_kernels.py.
+
+Run this file directly: python benchmark.py
+"""
+import random
+import time
+import tracemalloc
+
+from collision import detect_collision, detect_collision_flat, handle_collision
+from rigidbody import RigidBody
+from shapes import CIRCLE, get_circle, get_shape
+from vec2 import Vec2
+
+# CIRCLE times the analytic circle tests, which every method uses.
+VERTEX_COUNTS = (3, 4, 6, 8, 12, 16, 20, 25, CIRCLE)
+BODY_COUNTS = (1_000, 10_000)
+PAIRS = 500
+SIZE = 40
+
+
+def make_pairs(
+    sides: int | str, count: int, seed: int = 0
+) -> list[tuple[RigidBody, RigidBody]]:
+    """Creates pairs of regular polygons close enough to often overlap.
+
+    Args:
+        sides: The number of sides of every polygon, or CIRCLE for
+            circles which fit in a square of the same size.
+        count: The number of pairs to create.
+        seed: The seed for the random positions and angles.
+
+    Returns:
+        The pairs of bodies.
+    """
+    rng = random.Random(seed)
+    shape = get_circle(SIZE / 2) if sides == CIRCLE else get_shape(sides, SIZE)
+    pairs = []
+    for _ in range(count):
+        offset = Vec2(rng.uniform(-SIZE, SIZE), rng.uniform(-SIZE, SIZE))
+        body_a = RigidBody(shape, Vec2(0, 0), Vec2(), rng.uniform(0, 6.3))
+        body_b = RigidBody(shape, offset, Vec2(), rng.uniform(0, 6.3))
+        pairs.append((body_a, body_b))
+    return pairs
+
+
+def time_method(pairs: list[tuple[RigidBody, RigidBody]], method: str) -> tuple[float, int]:
+    """Times a collision detection method over every pair.
+
+    Args:
+        pairs: The pairs of bodies to test.
+        method: The method passed to detect_collision, or "kernels" for
+            detect_collision_flat.
+
+    Returns:
+        The mean time per pair in microseconds, and the number of
+        pairs found to be colliding.
+    """
+    start = time.perf_counter()
+    if method == "kernels":
+        collided = sum(detect_collision_flat(a, b) is not None for a, b in pairs)
+    else:
+        collided = sum(detect_collision(a, b, method) is not None for a, b in pairs)
+    return (time.perf_counter() - start) / len(pairs) * 1e6, collided
+
+
+def measure_bodies(count: int, seed: int = 0) -> tuple[float, float, float]:
+    """Measures the memory and speed of many bodies.
+
+    Args:
+        count: The number of bodies to create.
+        seed: The seed for the random positions and angles.
+
+    Returns:
+        The memory used per body in bytes, the time to update each body
+        in microseconds, and the time to detect and resolve each
+        overlapping pair in microseconds.
+    """
+    tracemalloc.start()
+    pairs = make_pairs(8, count // 2, seed)
+    memory = tracemalloc.get_traced_memory()[0] / count
+    tracemalloc.stop()
+
+    bodies = [body for pair in pairs for body in pair]
+    start = time.perf_counter()
+    for _ in range(10):
+        for body in bodies:
+            body.save_state()
+            body.update(0.016)
+    update_time = (time.perf_counter() - start) / (10 * count) * 1e6
+
+    # Put every pair back where make_pairs left it, so they overlap.
+    pairs = make_pairs(8, count // 2, seed)
+    start = time.perf_counter()
+    for a, b in pairs:
+        handle_collision(a, b)
+    collide_time = (time.perf_counter() - start) / len(pairs) * 1e6
+    return memory, update_time, collide_time
+
+
+def main() -> None:
+    """Prints the time per pair of each method for each vertex count."""
+    print(
+        f"{'sides':>6} {'sat (us)':>10} {'gjk (us)':>10} {'kernels (us)':>13}"
+        f" {'collided':>9}"
+    )
+    for sides in VERTEX_COUNTS:
+        pairs = make_pairs(sides, PAIRS)
+        # Every body caches its vertices, so warm the caches first to
+        # time only the collision tests.
+        for a, b in pairs:
+            a.get_vertices()
+            b.get_vertices()
+        sat_time, sat_collided = time_method(pairs, "sat")
+        gjk_time, gjk_collided = time_method(pairs, "gjk")
+        kernel_time, _ = time_method(pairs, "kernels")
+        agree = "" if sat_collided == gjk_collided else " (differ)"
+        print(
+            f"{sides:>6} {sat_time:>10.1f} {gjk_time:>10.1f} {kernel_time:>13.1f}"
+            f" {sat_collided:>9}{agree}"
+        )
+
+    print()
+    print(f"{'bodies':>6} {'bytes/body':>11} {'update (us)':>12} {'collide (us)':>13}")
+    for count in BODY_COUNTS:
+        memory, update_time, collide_time = measure_bodies(count)
+        print(f"{count:>6} {memory:>11.0f} {update_time:>12.2f} {collide_time:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
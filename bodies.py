@@ -1,8 +1,15 @@
 from typing import Iterator
 
+from aabb_tree import AABBTree
+from body_store import BodyStore
+from custom_types import AABB, Scalar
 from rigidbody import RigidBody
+from vec2 import Vec2
 
-type ObjectsMap = dict[int, RigidBody]
+# Generated IDs are (generation << INDEX_BITS) | slot. Generations start
+# at 1, so generated IDs never clash with small IDs such as canvas IDs.
+INDEX_BITS = 32
+INDEX_MASK = (1 << INDEX_BITS) - 1
 
 
 class Bodies:
@@ -11,22 +18,65 @@ class Bodies:
     Used in Engine to allow more effective pairing of canvas IDs and
     RigidBodies.
 
+    The bodies are kept in a dense list (a slot map), so adding,
+    removing, finding a body by ID and finding it by position are all
+    O(1). Each body owns a slot, which maps its ID to its position in the
+    dense list. A removed body's slot is reused, with its generation
+    incremented, so an old ID can never find the body that took its
+    place. Removing a body moves the last body into its position.
+
+    Positions in the dense list (see index) stay the same until a body
+    is removed. With a store, each body's row in it is its position in
+    the dense list, as the store fills gaps the same way (see
+    BodyStore.release), so its columns can be indexed by them directly.
+
+    An AABBTree is kept alongside the bodies for spatial queries, so
+    finding the bodies at a point, in a region or along a ray does not
+    need to check every body.
+
     Attributes:
-        objects: A dictionary mapping of IDs to RigidBody objects.
-        next_id: The next available ID for a new RigidBody.
-        iter_index: An index for dereferencing the objects for iteration.
+        next_id: The ID the next body added without one will get.
+        tree: The bounding volume tree over every body.
+        store: The store bodies are attached to when added, if any.
     """
 
-    def __init__(self):
-        """Initializes an empty Bodies collection."""
-        self._objects: ObjectsMap = {}
-        self._next_id: int = 0
-        self._iter_index: int = 0
+    def __init__(self, store: BodyStore | None = None):
+        """Initializes an empty Bodies collection.
+
+        Args:
+            store: A store to keep the state of every body in. If None,
+                bodies keep their own state.
+        """
+        # The dense list, and the ID and slot of each entry.
+        self._bodies: list[RigidBody] = []
+        self._ids: list[int] = []
+        self._dense_slots: list[int] = []
+        # Per slot: the dense index of its body (-1 if free) and its generation.
+        self._slots: list[int] = []
+        self._generations: list[int] = []
+        self._free: list[int] = []
+        # Slots of the bodies added with an ID of their own, such as canvas IDs.
+        self._given_ids: dict[int, int] = {}
+        self._tree = AABBTree()
+        self._store = store
+
+    @property
+    def store(self) -> BodyStore | None:
+        """Gets the store bodies are attached to, if any."""
+        return self._store
 
     @property
-    def objects(self) -> ObjectsMap:
-        """Gets the dictionary of RigidBody objects."""
-        return self._objects
+    def tree(self) -> AABBTree:
+        """Gets the bounding volume tree over every body."""
+        return self._tree
+
+    @property
+    def next_id(self) -> int:
+        """Gets the ID the next body added without one will get."""
+        if self._free:
+            slot = self._free[-1]
+            return (self._generations[slot] << INDEX_BITS) | slot
+        return (1 << INDEX_BITS) | len(self._slots)
 
     def add(self, new_body: RigidBody, id: int | None = None) -> int:
         """Adds a new RigidBody to the collection.
@@ -37,62 +87,70 @@ class Bodies:
 
         Args:
             new_body: The RigidBody to add.
-            id: The ID to assign to the new RigidBody.
-                If it is none next_id is assigned and
-                then incremented.
+            id: The ID to assign to the new RigidBody. If None, next_id
+                is assigned.
 
         Returns:
             The ID assigned to the new RigidBody.
+
+        Raises:
+            ValueError: If a body with the given ID already exists.
         """
+        if id is not None and self._find(id) >= 0:
+            raise ValueError(f"A body with ID {id} already exists")
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._slots)
+            self._slots.append(-1)
+            self._generations.append(1)
         if id is None:
-            id = self.next_id
-            self.next_id = 1
-        self.objects[id] = new_body
-        return id
+            id = (self._generations[slot] << INDEX_BITS) | slot
+        else:
+            self._given_ids[id] = slot
 
-    @property
-    def next_id(self) -> int:
-        """Gets the next available ID for a new RigidBody."""
-        return self._next_id
+        if self.store is not None:
+            new_body.attach(self.store)
+        self._slots[slot] = len(self._bodies)
+        self._bodies.append(new_body)
+        self._ids.append(id)
+        self._dense_slots.append(slot)
+        self.tree.insert(id, new_body.get_aabb())
+        return id
 
-    @next_id.setter
-    def next_id(self, increment: int = 1) -> int:
-        """Sets the next available ID for a new RigidBody.
+    def _find(self, id: int) -> int:
+        """Finds the dense index of a body.
 
         Args:
-            increment: The amount to increment the next ID by.
+            id: The ID of the body.
 
         Returns:
-            The new next ID after incrementing.
+            The dense index, or -1 if there is no body with the ID.
         """
-        new_id = self.next_id + increment
-        self._next_id = new_id
-        return new_id
+        slot = self._given_ids.get(id)
+        if slot is None:
+            slot = id & INDEX_MASK
+            if slot >= len(self._slots):
+                return -1
+        index = self._slots[slot]
+        # A stale ID points at a slot whose body has since changed.
+        if index < 0 or self._ids[index] != id:
+            return -1
+        return index
 
-    def __iter__(self) -> Iterator:
-        """Initializes the iterator for the Bodies collection."""
-        self._iter_index = 0
-        self._keys = list(self.objects.keys())
-        return self
+    def __iter__(self) -> Iterator[tuple[int, RigidBody]]:
+        """Iterates over the (ID, RigidBody) pairs in dense order.
 
-    def __next__(self) -> tuple[int, RigidBody]:
-        """Returns the next (ID, RigidBody) pair in the iteration.
-
-        Raises:
-            StopIteration: If there are no more items to iterate over.
+        Nothing is copied, so any number of iterations can run at once,
+        but bodies must not be added or removed during one.
 
         Returns:
-            The next ID and corresponding RigidBody as a tuple.
+            An iterator of (ID, RigidBody) pairs.
         """
-        if self._iter_index < len(self._keys):
-            key = self._keys[self._iter_index]
-            self._iter_index += 1
-            return key, self.objects[key]
-        else:
-            raise StopIteration
+        return zip(self._ids, self._bodies)
 
     def __getitem__(self, index: int) -> RigidBody:
-        """Gets the RigidBody at the specified index.
+        """Gets the RigidBody at the specified dense index.
 
         Args:
             index: The index of the RigidBody to retrieve.
@@ -100,21 +158,51 @@ class Bodies:
         Returns:
             The RigidBody at the specified index.
         """
-        items = list(self.objects.items())
-        return items[index][1]
+        return self._bodies[index]
 
     def __len__(self) -> int:
         """Returns the number of RigidBody objects in the collection."""
-        return len(self.objects)
+        return len(self._bodies)
+
+    def __contains__(self, id: int) -> bool:
+        """Determines if there is a body with an ID.
+
+        Args:
+            id: The ID to look for.
+
+        Returns:
+            True if a body has the ID.
+        """
+        return self._find(id) >= 0
 
     def delete(self, id: int) -> None:
         """Deletes a RigidBody from the collection by its ID.
 
+        The last body in the dense list takes the deleted body's place.
+
         Args:
             id: The ID of the RigidBody to delete.
         """
-        if id in self.objects:
-            del self.objects[id]
+        index = self._find(id)
+        if index < 0:
+            return
+        if self.store is not None:
+            self._bodies[index].detach()
+        slot = self._dense_slots[index]
+        last = len(self._bodies) - 1
+        if index != last:
+            self._bodies[index] = self._bodies[last]
+            self._ids[index] = self._ids[last]
+            self._dense_slots[index] = self._dense_slots[last]
+            self._slots[self._dense_slots[index]] = index
+        self._bodies.pop()
+        self._ids.pop()
+        self._dense_slots.pop()
+        self._slots[slot] = -1
+        self._generations[slot] += 1
+        self._free.append(slot)
+        self._given_ids.pop(id, None)
+        self.tree.remove(id)
 
     def get(self, id: int) -> RigidBody | None:
         """Gets a RigidBody by its ID.
@@ -125,13 +213,114 @@ class Bodies:
         Returns:
             The RigidBody if found, otherwise None.
         """
-        return self.objects.get(id)
+        index = self._find(id)
+        return self._bodies[index] if index >= 0 else None
 
-    def items(self):
+    def index(self, id: int) -> int:
+        """Gets the dense index of a body, for indexing per-body arrays.
+
+        Args:
+            id: The ID of the body.
+
+        Returns:
+            The position of the body in the dense list.
+
+        Raises:
+            KeyError: If there is no body with the ID.
+        """
+        index = self._find(id)
+        if index < 0:
+            raise KeyError(id)
+        return index
+
+    def id_at(self, index: int) -> int:
+        """Gets the ID of the body at a dense index.
+
+        Args:
+            index: The position of the body in the dense list.
+
+        Returns:
+            The ID of the body.
+        """
+        return self._ids[index]
+
+    def items(self) -> Iterator[tuple[int, RigidBody]]:
         """Returns an iterator over the (ID, RigidBody)
             pairs in the collection.
 
         Returns:
             An iterator of (ID, RigidBody) pairs.
         """
-        return self.objects.items()
+        return iter(self)
+
+    def refit(self, id: int | None = None) -> None:
+        """Updates the tree after bodies have moved.
+
+        Bodies that are still inside their fattened box are left alone.
+
+        Args:
+            id: The ID of the body which moved. If None, every body
+                is updated.
+        """
+        if id is not None:
+            body = self.get(id)
+            if body is not None:
+                self.tree.move(id, body.get_aabb())
+            return
+        for body_id, body in self.items():
+            self.tree.move(body_id, body.get_aabb())
+
+    def query_point(self, point: Vec2) -> list[int]:
+        """Finds every body containing a point.
+
+        Args:
+            point: The point to search at.
+
+        Returns:
+            The IDs of the bodies containing the point, sorted by ID.
+        """
+        found = [
+            id
+            for id in self.tree.query_point(point)
+            if self.get(id).contains_point(point)
+        ]
+        return sorted(found)
+
+    def query_region(self, region: AABB) -> list[int]:
+        """Finds every body whose bounding box overlaps a region.
+
+        Args:
+            region: The box to search in.
+
+        Returns:
+            The IDs of the bodies in the region, sorted by ID.
+        """
+        found = [
+            id
+            for id in self.tree.query_region(region)
+            if self.get(id).get_aabb().overlaps(region)
+        ]
+        return sorted(found)
+
+    def raycast(
+        self, origin: Vec2, direction: Vec2, max_distance: Scalar = float("inf")
+    ) -> tuple[int, Scalar] | None:
+        """Finds the first body hit by a ray.
+
+        Args:
+            origin: The start of the ray.
+            direction: The direction of the ray; it does not need to
+                be normalized.
+            max_distance: The length of the ray. Defaults to infinity.
+
+        Returns:
+            The ID of the first body hit and the distance to it, or
+            None if the ray hits nothing.
+        """
+        direction = direction.normalized()
+        return self.tree.raycast(
+            origin,
+            direction,
+            max_distance,
+            lambda id: self.get(id).raycast(origin, direction, max_distance),
+        )
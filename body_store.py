@@ -0,0 +1,253 @@
+from array import array
+from typing import Any
+
+from custom_types import Scalar
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# The per-body values kept by a BodyStore, one array each.
+COLUMNS = (
+    "x",
+    "y",
+    "vx",
+    "vy",
+    "angle",
+    "angular_velocity",
+    "mass",
+    "moment_of_inertia",
+    "fx",
+    "fy",
+    "torque",
+    "previous_x",
+    "previous_y",
+    "previous_angle",
+    "step_x",
+    "step_y",
+    "step_angle",
+    "movable",
+    "dynamic",
+)
+INITIAL_CAPACITY = 64
+
+
+class BodyStore:
+    """Keeps the state of many bodies in contiguous arrays.
+
+    Each body owns a row, and each value (x, y, vx, ...) is a column
+    array, so every body can be integrated in one batched operation
+    instead of a method call and several Vec2 allocations per body.
+    RigidBody reads and writes its row once it is attached (see
+    RigidBody.attach), so nothing else needs to know about the store.
+
+    The rows in use are always the first len(store), with no gaps, so
+    only real bodies are integrated. Releasing a row moves the last row
+    into its place, the same way Bodies fills the gap in its dense list,
+    so a body's row is its dense index in the Bodies it was added to.
+
+    The columns are NumPy arrays if NumPy is installed, otherwise
+    array('d') with a plain Python loop.
+
+    Attributes:
+        x, y, vx, ...: One array per name in COLUMNS. "movable" is 1 for
+            bodies that are integrated and 0 for static or sleeping
+            bodies. "dynamic" is 1 for bodies accelerated by gravity
+            and forces, and 0 for kinematic bodies, which only move at
+            their own velocity.
+        uses_numpy: Whether the columns are NumPy arrays.
+        capacity: The number of rows allocated.
+        version: Incremented every time the store integrates, so bodies
+            know their cached vertices are out of date.
+    """
+
+    def __init__(self, use_numpy: bool | None = None) -> None:
+        """Initializes an empty store.
+
+        Args:
+            use_numpy: Whether to use NumPy arrays. Defaults to using
+                NumPy if it is installed.
+
+        Raises:
+            ValueError: If NumPy is requested but not installed.
+        """
+        if use_numpy is None:
+            use_numpy = HAS_NUMPY
+        if use_numpy and not HAS_NUMPY:
+            raise ValueError("NumPy is not installed")
+        self.uses_numpy = use_numpy
+        self.version: int = 0
+        self.capacity: int = 0
+        self._size: int = 0
+        # The body in each row, told when its row moves (see release).
+        self._owners: list[Any] = []
+        for name in COLUMNS:
+            setattr(self, name, self._zeros(0))
+        self._grow(INITIAL_CAPACITY)
+
+    def __len__(self) -> int:
+        """Returns the number of rows in use."""
+        return self._size
+
+    def allocate(self, owner: Any) -> int:
+        """Reserves the row after the last one in use for a body.
+
+        Args:
+            owner: The body the row is for. Its relocate method is
+                called if the row moves.
+
+        Returns:
+            The index of the row, with every column set to 0.
+        """
+        if self._size == self.capacity:
+            self._grow(self.capacity * 2)
+        self._owners.append(owner)
+        self._size += 1
+        return self._size - 1
+
+    def release(self, row: int) -> None:
+        """Frees a row, moving the last row in use into its place.
+
+        Args:
+            row: The index of the row.
+        """
+        last = self._size - 1
+        for name in COLUMNS:
+            column = getattr(self, name)
+            column[row] = column[last]
+            column[last] = 0
+        moved = self._owners.pop()
+        self._size -= 1
+        if row != last:
+            self._owners[row] = moved
+            moved.relocate(row)
+
+    def clear(self) -> None:
+        """Frees every row."""
+        for name in COLUMNS:
+            setattr(self, name, self._zeros(self.capacity))
+        self._size = 0
+        self._owners = []
+
+    def save_state(self) -> None:
+        """Saves every row's position and angle for interpolation, as
+        RigidBody.save_state does."""
+        n = self._size
+        self.previous_x[:n] = self.x[:n]
+        self.previous_y[:n] = self.y[:n]
+        self.previous_angle[:n] = self.angle[:n]
+
+    def integrate(self, delta_time: Scalar, gravity: Scalar) -> None:
+        """Moves every movable body forward in time.
+
+        Every row's position and angle is saved first, for sweeping (see
+        RigidBody.save_step), then the same semi-implicit Euler step as
+        RigidBody.update is applied to every movable row. Only dynamic
+        rows are accelerated. Forces and torques on moved rows are
+        cleared. NumPy and the Python loop both do the same arithmetic in
+        the same order as RigidBody.update, so the results are identical
+        to the "objects" backend's.
+
+        Args:
+            delta_time: The time step to update over.
+            gravity: The gravitational acceleration.
+        """
+        self.version += 1
+        if self.uses_numpy:
+            self._integrate_numpy(delta_time, gravity)
+        else:
+            self._integrate_python(delta_time, gravity)
+
+    def _integrate_numpy(self, delta_time: Scalar, gravity: Scalar) -> None:
+        """Integrates every row with NumPy array operations.
+
+        Args:
+            delta_time: The time step to update over.
+            gravity: The gravitational acceleration.
+        """
+        n = self._size
+        x, y, angle = self.x[:n], self.y[:n], self.angle[:n]
+        vx, vy, angular_velocity = self.vx[:n], self.vy[:n], self.angular_velocity[:n]
+        fx, fy, torque = self.fx[:n], self.fy[:n], self.torque[:n]
+        step = self.movable[:n] * delta_time
+        # Only accelerated rows are divided by their mass, which may be 0
+        # in the others.
+        accelerated = (self.movable[:n] * self.dynamic[:n]) != 0
+        mass = self.mass[:n][accelerated]
+
+        self.step_x[:n] = x
+        self.step_y[:n] = y
+        self.step_angle[:n] = angle
+
+        vx[accelerated] += fx[accelerated] / mass * delta_time
+        vy[accelerated] += (fy[accelerated] + mass * gravity) / mass * delta_time
+        x += vx * step
+        y += vy * step
+        angular_velocity[accelerated] += (
+            torque[accelerated] / self.moment_of_inertia[:n][accelerated] * delta_time
+        )
+        angle += angular_velocity * step
+
+        still = 1 - self.movable[:n]
+        fx *= still
+        fy *= still
+        torque *= still
+
+    def _integrate_python(self, delta_time: Scalar, gravity: Scalar) -> None:
+        """Integrates every row with a Python loop over the arrays.
+
+        Args:
+            delta_time: The time step to update over.
+            gravity: The gravitational acceleration.
+        """
+        x, y, angle = self.x, self.y, self.angle
+        vx, vy, angular_velocity = self.vx, self.vy, self.angular_velocity
+        fx, fy, torque = self.fx, self.fy, self.torque
+        mass, inertia, movable = self.mass, self.moment_of_inertia, self.movable
+        dynamic = self.dynamic
+        self.step_x[: self._size] = x[: self._size]
+        self.step_y[: self._size] = y[: self._size]
+        self.step_angle[: self._size] = angle[: self._size]
+
+        for i in range(self._size):
+            if not movable[i]:
+                continue
+            if dynamic[i]:
+                vx[i] += fx[i] / mass[i] * delta_time
+                vy[i] += (fy[i] + mass[i] * gravity) / mass[i] * delta_time
+            x[i] += vx[i] * delta_time
+            y[i] += vy[i] * delta_time
+            if dynamic[i]:
+                angular_velocity[i] += torque[i] / inertia[i] * delta_time
+            angle[i] += angular_velocity[i] * delta_time
+            fx[i] = fy[i] = torque[i] = 0
+
+    def _zeros(self, length: int):
+        """Creates a column of zeros.
+
+        Args:
+            length: The length of the column.
+
+        Returns:
+            A NumPy array or array('d') of zeros.
+        """
+        if self.uses_numpy:
+            return np.zeros(length)
+        return array("d", bytes(8 * length))
+
+    def _grow(self, capacity: int) -> None:
+        """Increases the number of allocated rows, keeping their values.
+
+        Args:
+            capacity: The new number of rows.
+        """
+        extra = capacity - self.capacity
+        for name in COLUMNS:
+            column = getattr(self, name)
+            if self.uses_numpy:
+                setattr(self, name, np.concatenate((column, self._zeros(extra))))
+            else:
+                column.extend(self._zeros(extra))
+        self.capacity = capacity
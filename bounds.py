@@ -0,0 +1,202 @@
+from custom_types import AABB, CollisionResult, Feature, Scalar
+from rigidbody import STATIC, RigidBody, next_serial
+from vec2 import Vec2, Vec2List
+
+# The most contact points reported against a single wall.
+MAX_CONTACTS = 2
+
+
+class HalfPlane:
+    """An infinite wall, splitting the plane into inside and outside.
+
+    A point p is inside the half-plane when normal.dot(p) <= offset.
+
+    Attributes:
+        normal: The unit normal of the wall, pointing outwards.
+        offset: The distance of the wall from the origin along the normal.
+        serial: A number unique to the wall, from the same sequence as
+            RigidBody.serial, so contacts with it can be cached.
+    """
+
+    def __init__(self, normal: Vec2, offset: Scalar) -> None:
+        """Initializes the half-plane from its normal and offset.
+
+        Args:
+            normal: The unit normal of the wall, pointing outwards.
+            offset: The distance of the wall from the origin along the normal.
+        """
+        self.normal = normal
+        self.offset = offset
+        self.serial: int = next_serial()
+
+    def penetration(self, aabb: AABB) -> Scalar:
+        """Calculates how far a bounding box pokes through the wall.
+
+        Only the corner of the box furthest along the normal needs to be
+        checked, which is found per axis from the sign of the normal.
+
+        Args:
+            aabb: The bounding box to test.
+
+        Returns:
+            The depth of the box past the wall. Zero or negative values
+            mean the box is inside.
+        """
+        x = aabb.max_x if self.normal.x > 0 else aabb.min_x
+        y = aabb.max_y if self.normal.y > 0 else aabb.min_y
+        return self.normal.x * x + self.normal.y * y - self.offset
+
+    def depth(self, point: Vec2) -> Scalar:
+        """Calculates how far a point is past the wall.
+
+        Args:
+            point: The point to test.
+
+        Returns:
+            The depth of the point past the wall, negative if inside.
+        """
+        return self.normal.dot(point) - self.offset
+
+
+class Boundary:
+    """The static walls around the edges of the canvas.
+
+    Bodies are tested against the walls analytically, rather than
+    building a RigidBody for each wall and running SAT. The boundary is
+    also passed to resolve_collision in place of a body; it has infinite
+    mass so it never moves.
+
+    Attributes:
+        dimensions: The x-y dimensions of the canvas.
+        planes: The four walls, as half-planes facing outwards.
+        position: The center of the canvas.
+        velocity: Always a zero vector.
+        angular_velocity: Always 0.
+        mass: 0, which is treated as infinite mass.
+        moment_of_inertia: 0, which is treated as infinite inertia.
+        restitution: The restitution coefficient of the walls.
+        body_type: Always STATIC.
+        dynamic: Always False.
+        sleeping: Always False.
+    """
+
+    def __init__(self, dimensions: Vec2, restitution: Scalar = 0.9) -> None:
+        """Initializes the walls for the given canvas dimensions.
+
+        Args:
+            dimensions: The x-y dimensions of the canvas.
+            restitution: The restitution coefficient of the walls.
+                Defaults to 0.9.
+        """
+        self.dimensions = Vec2(dimensions.x, dimensions.y)
+        self.planes = [
+            HalfPlane(Vec2(-1, 0), 0),
+            HalfPlane(Vec2(1, 0), dimensions.x),
+            HalfPlane(Vec2(0, -1), 0),
+            HalfPlane(Vec2(0, 1), dimensions.y),
+        ]
+        self.position = Vec2(dimensions.x / 2, dimensions.y / 2)
+        self.velocity = Vec2()
+        self.angular_velocity: Scalar = 0
+        self.mass: Scalar = 0
+        self.moment_of_inertia: Scalar = 0
+        self.restitution = restitution
+        self.body_type = STATIC
+        self.dynamic = False
+        self.sleeping = False
+
+    def matches(self, dimensions: Vec2) -> bool:
+        """Determines if the boundary was built for the given dimensions.
+
+        Args:
+            dimensions: The x-y dimensions of the canvas.
+
+        Returns:
+            True if the dimensions are unchanged.
+        """
+        return (
+            self.dimensions.x == dimensions.x and self.dimensions.y == dimensions.y
+        )
+
+    def reflect(self, body: RigidBody) -> bool:
+        """Moves a body back inside the walls, reflecting its velocity off
+        every wall it has crossed.
+
+        This is for kinematic bodies, which the solver cannot push as
+        they have infinite mass like the walls.
+
+        Args:
+            body: The body to keep inside.
+
+        Returns:
+            True if the body was touching a wall.
+        """
+        touched = False
+        for plane in self.planes:
+            penetration = plane.penetration(body.get_aabb())
+            if penetration <= 0:
+                continue
+            touched = True
+            body.position = body.position.add_scaled(plane.normal, -penetration)
+            speed = body.velocity.dot(plane.normal)
+            if speed > 0:
+                body.velocity = body.velocity.add_scaled(plane.normal, -2 * speed)
+        return touched
+
+    def collide(self, body: RigidBody) -> list[tuple[HalfPlane, CollisionResult]]:
+        """Tests a body against every wall.
+
+        Args:
+            body: The body to test.
+
+        Returns:
+            Each wall the body is touching, paired with the result of the
+            collision. The normal points out of the canvas, from the body
+            to the wall. A circle touches each wall at a single point.
+        """
+        aabb = body.get_aabb()
+        results: list[tuple[HalfPlane, CollisionResult]] = []
+        vertices = None
+        for plane in self.planes:
+            penetration = plane.penetration(aabb)
+            if penetration <= 0:
+                continue
+            radius = body.radius
+            if radius:
+                # The bounding box of a circle is exact, so its deepest
+                # point is as deep as the box.
+                contact = body.position + plane.normal * radius
+                results.append(
+                    (
+                        plane,
+                        CollisionResult(
+                            True,
+                            penetration,
+                            plane.normal,
+                            Vec2List([contact]),
+                            [(0, 0)],
+                            [penetration],
+                        ),
+                    )
+                )
+                continue
+            if vertices is None:
+                vertices = body.get_vertices()
+            # The vertices past the wall, deepest first.
+            outside = sorted(
+                (i for i, vertex in enumerate(vertices) if plane.depth(vertex) > 0),
+                key=lambda i: plane.depth(vertices[i]),
+                reverse=True,
+            )[:MAX_CONTACTS]
+            contacts = Vec2List([vertices[i] for i in outside])
+            features: list[Feature] = [(0, i) for i in outside]
+            depths = [plane.depth(vertices[i]) for i in outside]
+            results.append(
+                (
+                    plane,
+                    CollisionResult(
+                        True, penetration, plane.normal, contacts, features, depths
+                    ),
+                )
+            )
+        return results
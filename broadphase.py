@@ -0,0 +1,268 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from itertools import combinations
+
+from bodies import Bodies
+from custom_types import AABB
+from rigidbody import STATIC, RigidBody
+
+type BodyPair = tuple[RigidBody, RigidBody]
+
+
+class Broadphase(ABC):
+    """The interface for finding pairs of bodies that may be in contact.
+
+    A broadphase is a cheap first pass over every body in the engine.
+    It only returns candidate pairs; the exact test is left to the
+    narrowphase (see collision.handle_collision), so a broadphase is
+    allowed to return pairs that do not collide, but must never omit a
+    pair that does. The exception is pairs of static bodies, which can
+    never respond to a collision and are always left out.
+    """
+
+    @abstractmethod
+    def find_pairs(self, bodies: Bodies) -> list[BodyPair]:
+        """Finds all pairs of bodies which could be colliding.
+
+        Args:
+            bodies: The collection of bodies to search.
+
+        Returns:
+            A list of candidate body pairs.
+        """
+
+    def reset(self) -> None:
+        """Clears any state kept between frames."""
+
+
+class BruteForce(Broadphase):
+    """Pairs every body with every other body.
+
+    This is O(n²), but has no overhead, so it is faster for scenes
+    with only a handful of bodies.
+    """
+
+    def find_pairs(self, bodies: Bodies) -> list[BodyPair]:
+        """Finds all pairs of bodies which could be colliding.
+
+        Args:
+            bodies: The collection of bodies to search.
+
+        Returns:
+            Every unique pair of bodies, except pairs of static bodies.
+        """
+        return [
+            (body_a, body_b)
+            for (_, body_a), (_, body_b) in combinations(bodies, 2)
+            if not (body_a.body_type == STATIC and body_b.body_type == STATIC)
+        ]
+
+
+class SweepEntry:
+    """A body tracked by the sweep and prune broadphase.
+
+    Attributes:
+        id: The ID of the body in Bodies.
+        body: The tracked body.
+        aabb: The bounding box of the body for the current frame.
+        frame: The last frame the body was seen in, used to
+            detect bodies which have been removed.
+        static: Whether the body was static when it was added, which
+            decides which list of entries it is kept in.
+    """
+
+    def __init__(self, id: int, body: RigidBody, frame: int) -> None:
+        """Initializes the entry and computes its bounding box.
+
+        Args:
+            id: The ID of the body in Bodies.
+            body: The tracked body.
+            frame: The frame the body was added in.
+        """
+        self.id = id
+        self.body = body
+        self.aabb: AABB = body.get_aabb()
+        self.frame = frame
+        self.static: bool = body.body_type == STATIC
+
+
+def left_edge(entry: SweepEntry) -> float:
+    """Gets the left edge of an entry's bounding box, to sort by."""
+    return entry.aabb.min_x
+
+
+class SweepAndPrune(Broadphase):
+    """Incremental sweep and prune (also known as sort and sweep).
+
+    Every body's bounding box is projected onto the x axis, and the
+    intervals are kept sorted by their left edge. Sweeping the sorted
+    list, a body only needs to be compared with the bodies that start
+    before it ends; the rest are pruned.
+
+    Bodies rarely move far in a single frame, so the list from the last
+    frame is already nearly sorted. Insertion sort is O(n) on nearly
+    sorted input, which makes the whole pass close to linear.
+
+    Static bodies are kept in a separate sorted list. Moving bodies are
+    swept against each other as usual, and each is compared with only
+    the static bodies starting within its extent, found by a binary
+    search. Static bodies are never compared with each other, so any
+    amount of level geometry costs little while nothing touches it.
+
+    Attributes:
+        entries: The tracked moving bodies, sorted by the left edge of
+            their bounding box.
+        static_entries: The tracked static bodies, sorted the same way.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty broadphase."""
+        self._entries: list[SweepEntry] = []
+        self._static_entries: list[SweepEntry] = []
+        self._tracked: dict[int, SweepEntry] = {}
+        self._frame: int = 0
+
+    @property
+    def entries(self) -> list[SweepEntry]:
+        """Gets the tracked moving bodies, sorted by left edge."""
+        return self._entries
+
+    @property
+    def static_entries(self) -> list[SweepEntry]:
+        """Gets the tracked static bodies, sorted by left edge."""
+        return self._static_entries
+
+    def reset(self) -> None:
+        """Forgets all tracked bodies."""
+        self._entries = []
+        self._static_entries = []
+        self._tracked = {}
+        self._frame = 0
+
+    def find_pairs(self, bodies: Bodies) -> list[BodyPair]:
+        """Finds all pairs of bodies whose bounding boxes overlap.
+
+        Args:
+            bodies: The collection of bodies to search.
+
+        Returns:
+            A list of body pairs with overlapping bounding boxes, except
+            pairs of static bodies.
+        """
+        self.synchronise(bodies)
+        self.sort()
+
+        pairs: list[BodyPair] = []
+        entries = self.entries
+        statics = self.static_entries
+        for i, entry in enumerate(entries):
+            aabb = entry.aabb
+            for j in range(i + 1, len(entries)):
+                other = entries[j].aabb
+                # Everything after this starts past our right edge.
+                if other.min_x > aabb.max_x:
+                    break
+                if other.min_y <= aabb.max_y and aabb.min_y <= other.max_y:
+                    pairs.append((entry.body, entries[j].body))
+            # Static bodies starting inside this one; the rest are found
+            # from the static side below.
+            start = bisect_left(statics, aabb.min_x, key=left_edge)
+            self._overlapping(entry, statics, start, pairs)
+        for entry in statics:
+            start = bisect_right(entries, entry.aabb.min_x, key=left_edge)
+            self._overlapping(entry, entries, start, pairs)
+        return pairs
+
+    @staticmethod
+    def _overlapping(
+        entry: SweepEntry, others: list[SweepEntry], start: int, pairs: list[BodyPair]
+    ) -> None:
+        """Pairs an entry with the overlapping entries of another list.
+
+        Args:
+            entry: The entry to pair.
+            others: The sorted entries to pair it with.
+            start: The first entry of others which does not start before
+                the entry.
+            pairs: The list to add the pairs to.
+        """
+        aabb = entry.aabb
+        for k in range(start, len(others)):
+            other = others[k].aabb
+            if other.min_x > aabb.max_x:
+                break
+            if other.min_y <= aabb.max_y and aabb.min_y <= other.max_y:
+                pairs.append((entry.body, others[k].body))
+
+    def synchronise(self, bodies: Bodies) -> None:
+        """Updates the tracked bodies and their bounding boxes.
+
+        New bodies are appended to the end of their list, bodies which
+        have become or stopped being static move to the other list, and
+        bodies that are no longer in the collection are removed.
+
+        Args:
+            bodies: The collection of bodies to track.
+        """
+        self._frame += 1
+        for id, body in bodies:
+            entry = self._tracked.get(id)
+            static = body.body_type == STATIC
+            if entry is None or entry.body is not body or entry.static != static:
+                if entry is not None:
+                    self._list_of(entry).remove(entry)
+                entry = SweepEntry(id, body, self._frame)
+                self._tracked[id] = entry
+                self._list_of(entry).append(entry)
+                continue
+            entry.aabb = body.get_aabb()
+            entry.frame = self._frame
+
+        # Every body has exactly one entry, so any extras are stale.
+        if len(self._entries) + len(self._static_entries) != len(bodies):
+            self._entries = [
+                entry for entry in self._entries if entry.frame == self._frame
+            ]
+            self._static_entries = [
+                entry for entry in self._static_entries if entry.frame == self._frame
+            ]
+            self._tracked = {
+                entry.id: entry for entry in self._entries + self._static_entries
+            }
+
+    def _list_of(self, entry: SweepEntry) -> list[SweepEntry]:
+        """Gets the list an entry belongs in.
+
+        Args:
+            entry: The entry.
+
+        Returns:
+            The static entries if the entry is static, otherwise the
+            moving entries.
+        """
+        return self._static_entries if entry.static else self._entries
+
+    def sort(self) -> None:
+        """Sorts both lists of entries by the left edge of their bounding box.
+
+        Uses insertion sort, as the order from the last frame is
+        almost always still correct.
+        """
+        self._insertion_sort(self._entries)
+        self._insertion_sort(self._static_entries)
+
+    @staticmethod
+    def _insertion_sort(entries: list[SweepEntry]) -> None:
+        """Sorts entries by left edge, in place.
+
+        Args:
+            entries: The entries to sort.
+        """
+        for i in range(1, len(entries)):
+            entry = entries[i]
+            key = entry.aabb.min_x
+            j = i - 1
+            while j >= 0 and entries[j].aabb.min_x > key:
+                entries[j + 1] = entries[j]
+                j -= 1
+            entries[j + 1] = entry
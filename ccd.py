@@ -0,0 +1,161 @@
+import math
+
+from bounds import Boundary
+from custom_types import AABB, Scalar
+from rigidbody import RigidBody
+from sat import overlap_intervals, project_polygon
+from vec2 import Vec2, Vec2List
+
+# A body is swept if it moved further than this fraction of its smallest
+# width in a single step.
+CCD_THRESHOLD = 0.5
+# The most poses sampled along a single sweep.
+MAX_SAMPLES = 32
+# How many times the first touching sample is bisected.
+BISECTION_ITERATIONS = 8
+
+
+def needs_sweep(body: RigidBody, threshold: Scalar = CCD_THRESHOLD) -> bool:
+    """Determines if a body moved far enough in the last step to tunnel.
+
+    Args:
+        body: The body to check, after it has been integrated.
+        threshold: The fraction of the body's smallest width it may move
+            without being swept. Defaults to CCD_THRESHOLD.
+
+    Returns:
+        True if the body should be swept.
+    """
+    if not body.dynamic or body.sleeping or body.min_extent <= 0:
+        return False
+    moved = (body.position - body.step_position).magnitude()
+    return moved > threshold * body.min_extent
+
+
+def pose_at(body: RigidBody, t: Scalar) -> tuple[Vec2, Scalar]:
+    """Finds the pose of a body part of the way through the last step.
+
+    Args:
+        body: The body to move.
+        t: How far between the start (0) and end (1) of the step.
+
+    Returns:
+        The position and angle of the body at t.
+    """
+    position = body.step_position + (body.position - body.step_position) * t
+    angle = body.step_angle + (body.angle - body.step_angle) * t
+    return position, angle
+
+
+def swept_aabb(body: RigidBody) -> AABB:
+    """Calculates a box enclosing a body over the whole of the last step.
+
+    Args:
+        body: The swept body.
+
+    Returns:
+        The union of the body's boxes before and after the step.
+    """
+    before = body.transform_vertices(body.step_position, body.step_angle)
+    xs = [vertex.x for vertex in before]
+    ys = [vertex.y for vertex in before]
+    return AABB(min(xs), min(ys), max(xs), max(ys)).union(body.get_aabb())
+
+
+def polygons_overlap(a: Vec2List, b: Vec2List) -> bool:
+    """Tests if two convex polygons overlap using separating axes.
+
+    Args:
+        a: The vertices of the first polygon.
+        b: The vertices of the second polygon.
+
+    Returns:
+        True if no edge normal of either polygon separates them.
+    """
+    for polygon in (a, b):
+        for i, vertex in enumerate(polygon):
+            axis = (polygon[(i + 1) % len(polygon)] - vertex).perpendicular()
+            min_a, max_a = project_polygon(axis, a)
+            min_b, max_b = project_polygon(axis, b)
+            if overlap_intervals(min_a, max_a, min_b, max_b) <= 0:
+                return False
+    return True
+
+
+def time_of_impact(
+    body: RigidBody,
+    obstacles: list[RigidBody],
+    bounds: Boundary | None = None,
+    threshold: Scalar = CCD_THRESHOLD,
+) -> Scalar:
+    """Finds when a body first touched anything during the last step.
+
+    The body is moved from its previous pose to its current pose while
+    the obstacles stay where they are. Poses are sampled close enough
+    together that the body cannot skip over anything as thick as itself
+    or the thinnest obstacle, then the first touching sample is bisected.
+    The result errs towards the touching side, so the body is left just
+    overlapping and the narrowphase picks up the contact.
+
+    Obstacles the body already overlapped at the start of the step are
+    ignored, as the solver is already separating them.
+
+    Args:
+        body: The body to sweep, after it has been integrated.
+        obstacles: The bodies it may have hit.
+        bounds: The walls around the canvas, if any.
+        threshold: The fraction of the thinnest width the body may move
+            between samples. Defaults to CCD_THRESHOLD.
+
+    Returns:
+        The fraction of the step (between 0 and 1) at which the body
+        first touched something, or 1 if it hit nothing.
+    """
+    start = body.transform_vertices(body.step_position, body.step_angle)
+    planes = []
+    if bounds is not None:
+        planes = [
+            plane
+            for plane in bounds.planes
+            if max(plane.depth(vertex) for vertex in start) <= 0
+        ]
+    targets = [
+        (other.get_vertices(), other.min_extent)
+        for other in obstacles
+        if other is not body
+    ]
+    targets = [
+        (vertices, extent)
+        for vertices, extent in targets
+        if not polygons_overlap(start, vertices)
+    ]
+    if not planes and not targets:
+        return 1
+
+    def touching(t: Scalar) -> bool:
+        vertices = body.transform_vertices(*pose_at(body, t))
+        for plane in planes:
+            if max(plane.depth(vertex) for vertex in vertices) > 0:
+                return True
+        return any(polygons_overlap(vertices, other) for other, _ in targets)
+
+    thinnest = min([body.min_extent] + [extent for _, extent in targets if extent > 0])
+    distance = (body.position - body.step_position).magnitude()
+    samples = max(1, min(MAX_SAMPLES, math.ceil(distance / (threshold * thinnest))))
+
+    low: Scalar = 0
+    for i in range(1, samples + 1):
+        high = i / samples
+        if touching(high):
+            break
+        low = high
+    else:
+        return 1
+
+    for _ in range(BISECTION_ITERATIONS):
+        middle = (low + high) / 2
+        if touching(middle):
+            high = middle
+        else:
+            low = middle
+    return high
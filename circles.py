@@ -0,0 +1,157 @@
+import math
+
+from custom_types import CollisionResult, Feature
+from rigidbody import RigidBody
+from vec2 import Vec2, Vec2List
+
+# Circles collide analytically: a single distance test against another
+# circle, and the nearest edge or vertex of a polygon, instead of
+# testing the edge normals of a many-sided outline with SAT. Each test
+# gives one contact point, the point of the circle deepest inside the
+# other body, with the same conventions as sat: the normal points from
+# the first body to the second.
+
+
+def collide(body_a: RigidBody, body_b: RigidBody) -> CollisionResult:
+    """Checks for a collision between two bodies, at least one of which
+    is a circle.
+
+    Args:
+        body_a: The first rigid body.
+        body_b: The second rigid body.
+
+    Returns:
+        The result of the collision test.
+    """
+    if body_a.radius and body_b.radius:
+        return circle_circle(body_a, body_b)
+    if body_b.radius:
+        return polygon_circle(body_a, body_b, 0)
+    result = polygon_circle(body_b, body_a, 1)
+    if result.collided:
+        result.normal = -result.normal
+    return result
+
+
+def circle_circle(a: RigidBody, b: RigidBody) -> CollisionResult:
+    """Checks for a collision between two circles.
+
+    Args:
+        a: The first circle.
+        b: The second circle.
+
+    Returns:
+        The result of the collision test. The contact is the point of b
+        deepest inside a.
+    """
+    position_a = a.position
+    position_b = b.position
+    dx = position_b.x - position_a.x
+    dy = position_b.y - position_a.y
+    reach = a.radius + b.radius
+    distance_squared = dx * dx + dy * dy
+    if distance_squared >= reach * reach:
+        return CollisionResult(False)
+    distance = math.sqrt(distance_squared)
+    if distance == 0:
+        # Concentric circles can be pushed apart in any direction.
+        normal = Vec2(0, 1)
+    else:
+        normal = Vec2(dx / distance, dy / distance)
+    penetration = reach - distance
+    contact = position_b - normal * b.radius
+    return CollisionResult(
+        True, penetration, normal, Vec2List([contact]), [(1, 0)], [penetration]
+    )
+
+
+def polygon_circle(
+    polygon: RigidBody, circle: RigidBody, polygon_index: int
+) -> CollisionResult:
+    """Checks for a collision between a polygon and a circle.
+
+    The edge the circle's center is furthest outside of is found first.
+    If even that is further away than the radius, the edge separates
+    the bodies. Otherwise the center is either inside the polygon, or
+    outside it next to that edge or one of its ends, which decides the
+    normal.
+
+    Args:
+        polygon: The polygon.
+        circle: The circle.
+        polygon_index: Whether the polygon is the first (0) or second (1)
+            body of the pair, for the contact's feature.
+
+    Returns:
+        The result of the collision test, with the normal pointing from
+        the polygon to the circle. The contact is the point of the
+        circle deepest inside the polygon.
+    """
+    coordinates = polygon.get_vertices().flat()
+    winding = polygon.shape.winding
+    center = circle.position
+    center_x = center.x
+    center_y = center.y
+    radius = circle.radius
+    count = len(coordinates) // 2
+
+    best_separation = -math.inf
+    best_edge = 0
+    best_normal_x = best_normal_y = 0.0
+    for i in range(count):
+        j = (i + 1) % count
+        edge_x = coordinates[2 * j] - coordinates[2 * i]
+        edge_y = coordinates[2 * j + 1] - coordinates[2 * i + 1]
+        length = math.sqrt(edge_x * edge_x + edge_y * edge_y)
+        if length == 0:
+            continue
+        normal_x = -edge_y / length * winding
+        normal_y = edge_x / length * winding
+        separation = normal_x * (center_x - coordinates[2 * i]) + normal_y * (
+            center_y - coordinates[2 * i + 1]
+        )
+        if separation >= radius:
+            return CollisionResult(False)
+        if separation > best_separation:
+            best_separation = separation
+            best_edge = i
+            best_normal_x = normal_x
+            best_normal_y = normal_y
+
+    start = best_edge
+    end = (best_edge + 1) % count
+    start_x = coordinates[2 * start]
+    start_y = coordinates[2 * start + 1]
+    end_x = coordinates[2 * end]
+    end_y = coordinates[2 * end + 1]
+    feature: Feature = (polygon_index, start)
+    normal = Vec2(best_normal_x, best_normal_y)
+    penetration = radius - best_separation
+    if best_separation > 0:
+        # Outside the polygon, the center is nearest one of the edge's
+        # ends if it is past that end along the edge.
+        vertex = None
+        if (center_x - start_x) * (end_x - start_x) + (center_y - start_y) * (
+            end_y - start_y
+        ) <= 0:
+            vertex = start
+        elif (center_x - end_x) * (start_x - end_x) + (center_y - end_y) * (
+            start_y - end_y
+        ) <= 0:
+            vertex = end
+        if vertex is not None:
+            dx = center_x - coordinates[2 * vertex]
+            dy = center_y - coordinates[2 * vertex + 1]
+            distance_squared = dx * dx + dy * dy
+            if distance_squared >= radius * radius:
+                return CollisionResult(False)
+            distance = math.sqrt(distance_squared)
+            if distance > 0:
+                normal = Vec2(dx / distance, dy / distance)
+            penetration = radius - distance
+            feature = (polygon_index, vertex)
+
+    contact = center - normal * radius
+    return CollisionResult(
+        True, penetration, normal, Vec2List([contact]), [feature], [penetration]
+    )
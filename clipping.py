@@ -0,0 +1,143 @@
+from typing import Optional
+
+from custom_types import Feature, Scalar
+from vec2 import Vec2, Vec2List
+
+# How much closer to perpendicular the second body's face must be to
+# become the reference face, so near-parallel faces don't swap roles
+# (and contact features) from frame to frame.
+REFERENCE_TOLERANCE = 0.05
+
+
+def best_edge(vertices: Vec2List, index: int, normal: Vec2) -> tuple[int, int]:
+    """Finds the edge at a vertex which is most perpendicular to a normal.
+
+    Args:
+        vertices: The vertices of the polygon.
+        index: The vertex furthest along the normal.
+        normal: The collision normal, pointing away from the polygon.
+
+    Returns:
+        The indices of the edge's start and end vertices, in the winding
+        order of the polygon.
+    """
+    n = len(vertices)
+    previous = (index - 1) % n
+    following = (index + 1) % n
+    vertex = vertices[index]
+    to_previous = (vertex - vertices[previous]).normalized()
+    to_following = (vertices[following] - vertex).normalized()
+    if abs(to_following.dot(normal)) <= abs(to_previous.dot(normal)):
+        return index, following
+    return previous, index
+
+
+def clip(
+    points: list[tuple[Vec2, Feature]],
+    direction: Vec2,
+    offset: Scalar,
+    feature: Feature,
+) -> list[tuple[Vec2, Feature]]:
+    """Clips a segment to the side of a line where direction.dot(p) >= offset.
+
+    Args:
+        points: The two ends of the segment, with their features.
+        direction: The normal of the clipping line.
+        offset: The position of the clipping line along the direction.
+        feature: The feature given to a point created by clipping.
+
+    Returns:
+        The ends of the clipped segment; fewer than two if the segment
+        is entirely on the wrong side.
+    """
+    (start, start_feature), (end, end_feature) = points
+    start_distance = direction.dot(start) - offset
+    end_distance = direction.dot(end) - offset
+    clipped = []
+    if start_distance >= 0:
+        clipped.append((start, start_feature))
+    if end_distance >= 0:
+        clipped.append((end, end_feature))
+    if start_distance * end_distance < 0:
+        t = start_distance / (start_distance - end_distance)
+        clipped.append((start + (end - start) * t, feature))
+    return clipped
+
+
+def clip_contacts(
+    a: Vec2List,
+    b: Vec2List,
+    normal: Vec2,
+    index_a: Optional[int] = None,
+    index_b: Optional[int] = None,
+) -> tuple[Vec2List, list[Feature], list[Scalar]]:
+    """Finds up to two contact points between two overlapping polygons by
+    clipping.
+
+    The edge of each polygon most facing the other is found. Whichever is
+    more perpendicular to the normal becomes the reference face, and the
+    other (the incident face) is clipped to the sides of the reference
+    face, Sutherland-Hodgman style. The clipped points that are behind the
+    reference face are the contacts.
+
+    Face-to-face contacts get a point at each end of the overlap, rather
+    than whichever single vertex is deepest, so resting bodies stay still.
+
+    Args:
+        a: The vertices of the first polygon.
+        b: The vertices of the second polygon.
+        normal: The collision normal, pointing from a to b.
+        index_a: The vertex of a furthest along the normal, if known.
+        index_b: The vertex of b furthest against the normal, if known.
+
+    Returns:
+        The contact points, the feature each came from, and how far
+        each is behind the reference face. Points on the incident face
+        keep its vertex as their feature, and points created by clipping
+        take the reference vertex they were clipped against.
+    """
+    if index_a is None:
+        index_a = max(range(len(a)), key=lambda i: a[i].dot(normal))
+    if index_b is None:
+        index_b = min(range(len(b)), key=lambda i: b[i].dot(normal))
+    edge_a = best_edge(a, index_a, normal)
+    edge_b = best_edge(b, index_b, -normal)
+
+    direction_a = (a[edge_a[1]] - a[edge_a[0]]).normalized()
+    direction_b = (b[edge_b[1]] - b[edge_b[0]]).normalized()
+    if abs(direction_a.dot(normal)) <= abs(direction_b.dot(normal)) + REFERENCE_TOLERANCE:
+        reference, reference_edge, reference_body = a, edge_a, 0
+        incident, incident_edge, incident_body = b, edge_b, 1
+        reference_index, incident_index = index_a, index_b
+        reference_normal = normal
+    else:
+        reference, reference_edge, reference_body = b, edge_b, 1
+        incident, incident_edge, incident_body = a, edge_a, 0
+        reference_index, incident_index = index_b, index_a
+        reference_normal = -normal
+
+    start, end = reference_edge
+    side = (reference[end] - reference[start]).normalized()
+    points = [(incident[i], (incident_body, i)) for i in incident_edge]
+    points = clip(points, side, side.dot(reference[start]), (reference_body, start))
+    if len(points) == 2:
+        points = clip(points, -side, -side.dot(reference[end]), (reference_body, end))
+
+    face = reference_normal.dot(reference[reference_index])
+    contacts = Vec2List()
+    features: list[Feature] = []
+    depths: list[Scalar] = []
+    for point, feature in points:
+        depth = face - reference_normal.dot(point)
+        if depth >= 0:
+            contacts.append(point)
+            features.append(feature)
+            depths.append(depth)
+
+    if not contacts:
+        # Rounding clipped everything away; fall back to the deepest vertex.
+        vertex = incident[incident_index]
+        contacts.append(vertex)
+        features.append((incident_body, incident_index))
+        depths.append(max(face - reference_normal.dot(vertex), 0))
+    return contacts, features, depths
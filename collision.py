@@ -1,5 +1,13 @@
+from typing import Optional
+
+from batch_sat import sat_batch
+from broadphase import BodyPair
+import circles
+import kernels
+from contacts import Contact, ContactCache, Manifold, ordered
 from custom_types import CollisionResult
-from sat import sat
+from gjk import gjk_epa
+from sat import AxisCache, sat
 from rigidbody import RigidBody
 from vec2 import Vec2, Vec2List
 from custom_types import Scalar
@@ -8,35 +16,276 @@ from custom_types import Scalar
 # Prevent excessive overlap.
 SLOP = 0.8
 THRESHOLD = 0.01
+# Contacts closing slower than this do not bounce, so resting bodies don't jitter.
+RESTITUTION_VELOCITY = 1.0
 
 def safe_inverse(value: Scalar):
     """Calculate the safe inverse of a given numeric value."""
     return 0 if value == 0 else 1 / value
 
 
-def handle_collision(body_a: RigidBody, body_b: RigidBody, method="sat") -> CollisionResult | None:
+class EarlyOuts:
+    """Counts the pairs rejected before reaching the narrowphase.
+
+    Attributes:
+        circle: Pairs whose bounding circles do not overlap.
+        aabb: Pairs whose bounding circles overlap but whose bounding
+            boxes do not.
+    """
+
+    def __init__(self) -> None:
+        """Initializes both counts to 0."""
+        self.circle: int = 0
+        self.aabb: int = 0
+
+
+def bounds_overlap(
+    body_a: RigidBody, body_b: RigidBody, early_outs: Optional[EarlyOuts] = None
+) -> bool:
+    """Cheaply tests if two bodies could be colliding.
+
+    The bounding circles are compared first, which needs no vertices at
+    all, then the (cached) bounding boxes. Bodies which pass may still
+    not be colliding, but bodies which fail cannot be.
+
+    Args:
+        body_a: The first rigid body.
+        body_b: The second rigid body.
+        early_outs: Counts the pairs rejected by each test, if given.
+
+    Returns:
+        False if the bodies are definitely not colliding.
+    """
+    d = body_b.position - body_a.position
+    reach = body_a.bounding_radius + body_b.bounding_radius
+    # Circles that only touch can only hold polygons that only touch.
+    if d.x * d.x + d.y * d.y >= reach * reach:
+        if early_outs is not None:
+            early_outs.circle += 1
+        return False
+    if not body_a.get_aabb().overlaps(body_b.get_aabb()):
+        if early_outs is not None:
+            early_outs.aabb += 1
+        return False
+    return True
+
+
+def handle_collision(
+    body_a: RigidBody,
+    body_b: RigidBody,
+    method="sat",
+    cache: Optional[ContactCache] = None,
+    early_outs: Optional[EarlyOuts] = None,
+    use_kernels: bool = False,
+) -> CollisionResult | None:
     """Interface for managing the collision between two bodies using the specified method.
 
     This function checks for a collision between two rigid bodies (`body_a` and `body_b`)
-    using the specified collision detection method. Currently, it supports the
-    Separating Axis Theorem (SAT), GJK was too hard to implement. If a collision is detected, 
+    using the specified collision detection method. It supports the Separating Axis
+    Theorem ("sat") and GJK with EPA ("gjk"). If a collision is detected,
     it resolves the collision by calling the appropriate resolution function.
 
+    Engine does not use this, as it detects every collision before solving
+    any of them; this resolves a single pair on its own.
+
     Args:
         body_a: The first rigid body involved in the collision.
         body_b: The second rigid body involved in the collision.
+        method (str, optional): The method to use for collision detection,
+                                either "sat" or "gjk". Defaults to "sat".
+        cache: A contact cache to warm start the collision from. If None,
+            every contact starts from zero impulse.
+        early_outs: Counts the pairs rejected before the narrowphase, if given.
+        use_kernels: Whether to use the flat-float kernels (see kernels.py)
+            for SAT and the impulses. The results are the same, without a
+            Vec2 for every arithmetic step. GJK has no kernel.
+
+    Returns:
+        The result of the collision if the bodies are colliding, otherwise None.
+    """
+    # Keep the pair in a consistent order so cached contacts line up.
+    if cache is not None:
+        body_a, body_b = ordered(body_a, body_b)
+    if use_kernels and method == "sat":
+        result = detect_collision_flat(body_a, body_b, early_outs)
+    else:
+        result = detect_collision(body_a, body_b, method, early_outs=early_outs)
+    if result is None:
+        return None
+    manifold = None
+    if cache is not None:
+        manifold = cache.update((body_a.serial, body_b.serial), body_a, body_b, result)
+    if use_kernels:
+        resolve_collision_flat(body_a, body_b, result, manifold)
+    else:
+        resolve_collision(body_a, body_b, result, manifold)
+    return result
+
+
+def detect_collision(
+    body_a: RigidBody,
+    body_b: RigidBody,
+    method="sat",
+    axis_cache: Optional[AxisCache] = None,
+    early_outs: Optional[EarlyOuts] = None,
+) -> CollisionResult | None:
+    """Checks for a collision between two bodies without resolving it.
+
+    Pairs that fail bounds_overlap are rejected before the narrowphase.
+    Pairs with a circle are tested analytically (see circles.collide),
+    whichever method is given.
+
+    Args:
+        body_a: The first rigid body.
+        body_b: The second rigid body.
         method (str, optional): The method to use for collision detection.
                                 Defaults to "sat".
+        axis_cache: A cache of the best axis for each pair, used by SAT.
+        early_outs: Counts the pairs rejected by bounds_overlap, if given.
+
+    Returns:
+        The result of the collision if the bodies are colliding, otherwise None.
     """
-    if method == "sat":
-        result: CollisionResult = sat(body_a, body_b)
+    if not bounds_overlap(body_a, body_b, early_outs):
+        return None
+    if body_a.radius or body_b.radius:
+        result: CollisionResult = circles.collide(body_a, body_b)
+    elif method == "sat":
+        result = sat(body_a, body_b, axis_cache)
+    elif method == "gjk":
+        result = gjk_epa(body_a, body_b)
     else:
         return None
-    if result is not False:
-        resolve_collision(body_a, body_b, result)
+    if not result.collided:
+        return None
+    return result
+
+
+def detect_collision_flat(
+    body_a: RigidBody,
+    body_b: RigidBody,
+    early_outs: Optional[EarlyOuts] = None,
+) -> CollisionResult | None:
+    """Checks for a collision with SAT like detect_collision, using the
+    flat-float kernels.
+
+    Pairs with a circle are tested analytically, as in detect_collision.
+
+    Args:
+        body_a: The first rigid body.
+        body_b: The second rigid body.
+        early_outs: Counts the pairs rejected by bounds_overlap, if given.
+
+    Returns:
+        The result of the collision if the bodies are colliding, otherwise None.
+    """
+    if not bounds_overlap(body_a, body_b, early_outs):
+        return None
+    if body_a.radius or body_b.radius:
+        result = circles.collide(body_a, body_b)
+        return result if result.collided else None
+    return sat_flat(body_a, body_b)
+
+
+def sat_flat(body_a: RigidBody, body_b: RigidBody) -> CollisionResult | None:
+    """Tests two polygons with the flat-float SAT and clipping kernels.
+
+    Args:
+        body_a: The first rigid body.
+        body_b: The second rigid body.
+
+    Returns:
+        The result of the collision if the bodies are colliding, otherwise None.
+    """
+    vertices_a = body_a.get_vertices().flat()
+    vertices_b = body_b.get_vertices().flat()
+    axes = kernels.flatten(body_a.get_axes() + body_b.get_axes())
+    position_a = body_a.position
+    position_b = body_b.position
+    found = kernels.sat(
+        vertices_a,
+        vertices_b,
+        axes,
+        position_b.x - position_a.x,
+        position_b.y - position_a.y,
+    )
+    if found is None:
+        return None
+    penetration, normal_x, normal_y = found
+    points, features = kernels.clip_contacts(vertices_a, vertices_b, normal_x, normal_y)
+    contacts = Vec2List(
+        [Vec2(points[i], points[i + 1]) for i in range(0, len(points), 3)]
+    )
+    return CollisionResult(
+        True, penetration, Vec2(normal_x, normal_y), contacts, features, points[2::3]
+    )
+
+
+def detect_collisions(
+    pairs: list[BodyPair],
+    method="sat",
+    axis_cache: Optional[AxisCache] = None,
+    early_outs: Optional[EarlyOuts] = None,
+    use_kernels: bool = False,
+) -> list[CollisionResult | None]:
+    """Checks for collisions between many pairs of bodies at once.
+
+    SAT tests are batched (see batch_sat.sat_batch), which gives the
+    same results as testing each pair with detect_collision. Pairs with
+    a circle are tested analytically rather than batched.
+
+    Args:
+        pairs: The pairs of bodies to test.
+        method (str, optional): The method to use for collision detection.
+                                Defaults to "sat".
+        axis_cache: A cache of the best axis for each pair, used by SAT
+            to skip pairs that are still separated.
+        early_outs: Counts the pairs rejected by bounds_overlap, if given.
+        use_kernels: Whether to test polygon pairs one at a time with the
+            flat-float kernels (see sat_flat) instead of batching them.
+            The axis cache is not used. GJK has no kernel.
+
+    Returns:
+        The result of the collision for each pair if the bodies are
+        colliding, otherwise None.
+    """
+    if method != "sat":
+        return [
+            detect_collision(body_a, body_b, method, axis_cache, early_outs)
+            for body_a, body_b in pairs
+        ]
+    candidates = [
+        i
+        for i, (body_a, body_b) in enumerate(pairs)
+        if bounds_overlap(body_a, body_b, early_outs)
+    ]
+    results: list[CollisionResult | None] = [None] * len(pairs)
+    polygons = []
+    for i in candidates:
+        body_a, body_b = pairs[i]
+        if body_a.radius or body_b.radius:
+            result = circles.collide(body_a, body_b)
+            if result.collided:
+                results[i] = result
+        else:
+            polygons.append(i)
+    if use_kernels:
+        for i in polygons:
+            results[i] = sat_flat(*pairs[i])
+        return results
+    batch = sat_batch([pairs[i] for i in polygons], axis_cache)
+    for i, result in zip(polygons, batch):
+        if result.collided:
+            results[i] = result
+    return results
 
 
-def resolve_collision(body_a: RigidBody, body_b: RigidBody, result: CollisionResult) -> None:
+def resolve_collision(
+    body_a: RigidBody,
+    body_b: RigidBody,
+    result: CollisionResult,
+    manifold: Optional[Manifold] = None,
+) -> None:
     """Resolves the collision between two rigid bodies based on the collision result.
 
     This function applies impulse-based resolution to two rigid bodies (`body_a` and `body_b`)
@@ -49,42 +298,148 @@ def resolve_collision(body_a: RigidBody, body_b: RigidBody, result: CollisionRes
         body_b: The second rigid body involved in the collision.
         result (CollisionResult): An object containing the collision result, including
                                   contact points, penetration depth, and collision normal.
+        manifold: The manifold for the collision from a ContactCache. Its
+            cached impulses are applied before solving (warm starting).
     """
-    contacts: Vec2List | None = result.contacts
-    penetration: Scalar | None = result.penetration
-    collision_normal: Vec2 | None = result.normal
+    if not result.contacts or not result.normal or not result.penetration:
+        return
+
+    if manifold is None:
+        manifold = Manifold(body_a, body_b, result)
+
+    prepare_manifold(manifold)
+    warm_start(manifold)
+    solve_velocity(manifold)
+    solve_position(manifold)
+
+
+def resolve_collision_flat(
+    body_a: RigidBody,
+    body_b: RigidBody,
+    result: CollisionResult,
+    manifold: Optional[Manifold] = None,
+) -> None:
+    """Resolves a collision like resolve_collision, using the flat-float
+    impulse kernel.
 
-    if not contacts or not collision_normal or not penetration:
+    Args:
+        body_a: The first rigid body involved in the collision.
+        body_b: The second rigid body involved in the collision.
+        result: The result of the collision test.
+        manifold: The manifold for the collision from a ContactCache, for
+            warm starting.
+    """
+    if not result.contacts or not result.normal or not result.penetration:
         return
 
+    if manifold is None:
+        manifold = Manifold(body_a, body_b, result)
+
+    solve_velocities_flat([manifold], 1)
+    solve_position(manifold)
+
+
+def solve_velocities_flat(manifolds: list[Manifold], iterations: int) -> None:
+    """Prepares, warm starts and solves the velocities of many manifolds,
+    like prepare_manifold, warm_start and solve_velocity, using the
+    flat-float solver kernel (see kernels.solve_velocities).
+
+    Every body's velocity is read into a list of floats once, solved,
+    and written back once, so no Vec2 is made per impulse.
+
+    Args:
+        manifolds: The manifolds to solve.
+        iterations: The number of passes over every contact.
+    """
+    rows: dict[int, int] = {}
+    bodies = []
+    velocities: list[float] = []
+    masses: list[float] = []
+    flat_manifolds = []
+    offsets: list[float] = []
+    impulses: list[float] = []
+
+    def row(body) -> int:
+        index = rows.get(id(body))
+        if index is None:
+            index = rows[id(body)] = len(bodies)
+            bodies.append(body)
+            velocity = body.velocity
+            velocities.extend((velocity.x, velocity.y, body.angular_velocity))
+            masses.extend((inverse_mass(body), inverse_inertia(body), body.dynamic))
+        return index
+
+    for manifold in manifolds:
+        body_a = manifold.body_a
+        body_b = manifold.body_b
+        position_a = body_a.position
+        position_b = body_b.position
+        start = len(impulses)
+        for contact in manifold.contacts:
+            x = contact.position.x
+            y = contact.position.y
+            offsets += (x - position_a.x, y - position_a.y, x - position_b.x, y - position_b.y)
+            impulses.append(contact.normal_impulse)
+        flat_manifolds.append(
+            (
+                row(body_a),
+                row(body_b),
+                manifold.normal.x,
+                manifold.normal.y,
+                min(body_a.restitution, body_b.restitution),
+                start,
+                len(impulses),
+            )
+        )
+
+    kernels.solve_velocities(
+        velocities,
+        masses,
+        flat_manifolds,
+        offsets,
+        impulses,
+        RESTITUTION_VELOCITY,
+        iterations,
+    )
+
+    impulse = iter(impulses)
+    for manifold in manifolds:
+        for contact in manifold.contacts:
+            contact.normal_impulse = next(impulse)
+    for index, body in enumerate(bodies):
+        if body.dynamic:
+            body.velocity = Vec2(velocities[3 * index], velocities[3 * index + 1])
+            body.angular_velocity = velocities[3 * index + 2]
+
+
+def prepare_manifold(manifold: Manifold) -> None:
+    """Calculates the values for each contact which stay the same while solving.
+
+    Args:
+        manifold: The manifold to prepare.
+    """
+    body_a = manifold.body_a
+    body_b = manifold.body_b
+    collision_normal: Vec2 = manifold.normal
+
     restitution: Scalar = min(body_a.restitution, body_b.restitution)
 
     # We calculate inverse as impulses are based on *change* in velocity.
     # Specifically, a body's impulse is directly proportional to the change in velocity.
     # An impulse is force applied over time, and in this context it is the required change
     # in velocity for bodies to resolve their collisions.
-    inv_mass_a: Scalar = safe_inverse(body_a.mass)
-    inv_mass_b: Scalar = safe_inverse(body_b.mass)
-    inv_inertia_a: Scalar = safe_inverse(body_a.moment_of_inertia)
-    inv_inertia_b: Scalar = safe_inverse(body_b.moment_of_inertia)
-
-    for contact_point in contacts:
-        a_to_contact: Vec2 = contact_point - body_a.position
-        b_to_contact: Vec2 = contact_point - body_b.position
-
-        # Determines how fast bodies are moving proportional to one another.
-        relative_velocity: Vec2 = (
-            body_b.velocity + b_to_contact.perpendicular() * body_b.angular_velocity
-        ) - (body_a.velocity + a_to_contact.perpendicular() * body_a.angular_velocity)
-        
-        velocity_along_normal: Scalar = relative_velocity.dot(collision_normal)
-
-        if velocity_along_normal > 0:
-            continue
-
-        ra_cross_n: Scalar = a_to_contact.cross(collision_normal)
-        rb_cross_n: Scalar = b_to_contact.cross(collision_normal)
-        
+    inv_mass_a: Scalar = inverse_mass(body_a)
+    inv_mass_b: Scalar = inverse_mass(body_b)
+    inv_inertia_a: Scalar = inverse_inertia(body_a)
+    inv_inertia_b: Scalar = inverse_inertia(body_b)
+
+    for contact in manifold.contacts:
+        contact.r_a = contact.position - body_a.position
+        contact.r_b = contact.position - body_b.position
+
+        ra_cross_n: Scalar = contact.r_a.cross(collision_normal)
+        rb_cross_n: Scalar = contact.r_b.cross(collision_normal)
+
         # The denominator is calculated to determine if the impulse is proportional
         # to the combined mass and inertia of both bodies.
         denominator: Scalar = (
@@ -93,36 +448,152 @@ def resolve_collision(body_a: RigidBody, body_b: RigidBody, result: CollisionRes
             + (ra_cross_n**2) * inv_inertia_a
             + (rb_cross_n**2) * inv_inertia_b
         )
+        contact.normal_mass = safe_inverse(denominator)
+
+        velocity_along_normal = relative_velocity(manifold, contact).dot(collision_normal)
+        if velocity_along_normal < -RESTITUTION_VELOCITY:
+            contact.velocity_bias = -restitution * velocity_along_normal
+        else:
+            contact.velocity_bias = 0
+
+
+def inverse_mass(body: RigidBody) -> Scalar:
+    """Calculates the inverse mass of a body for the solver.
+
+    Static and kinematic bodies have infinite mass. Sleeping bodies are
+    also treated as immovable, so bodies resting on them do not push
+    them around without waking them.
+
+    Args:
+        body: The body to calculate for.
+
+    Returns:
+        The inverse mass, or 0 for infinite mass.
+    """
+    if body.sleeping or not body.dynamic:
+        return 0
+    return safe_inverse(body.mass)
+
+
+def inverse_inertia(body: RigidBody) -> Scalar:
+    """Calculates the inverse moment of inertia of a body for the solver.
+
+    As with inverse_mass, only awake dynamic bodies have finite inertia.
+
+    Args:
+        body: The body to calculate for.
+
+    Returns:
+        The inverse moment of inertia, or 0 for infinite inertia.
+    """
+    if body.sleeping or not body.dynamic:
+        return 0
+    return safe_inverse(body.moment_of_inertia)
+
+
+def relative_velocity(manifold: Manifold, contact: Contact) -> Vec2:
+    """Calculates how fast the second body moves relative to the first at a contact.
+
+    Args:
+        manifold: The manifold the contact belongs to.
+        contact: The contact to measure at.
+
+    Returns:
+        The relative velocity at the contact.
+    """
+    body_a = manifold.body_a
+    body_b = manifold.body_b
+    return (
+        body_b.velocity + contact.r_b.perpendicular() * body_b.angular_velocity
+    ) - (body_a.velocity + contact.r_a.perpendicular() * body_a.angular_velocity)
+
+
+def apply_impulse(manifold: Manifold, contact: Contact, impulse: Scalar) -> None:
+    """Applies an equal and opposite impulse to both bodies at a contact.
+
+    Only dynamic bodies are moved, and sleeping ones have no inverse mass.
+
+    Args:
+        manifold: The manifold the contact belongs to.
+        contact: The contact to apply the impulse at.
+        impulse: The magnitude of the impulse along the normal.
+    """
+    body_a = manifold.body_a
+    body_b = manifold.body_b
+    impulse_vector: Vec2 = manifold.normal * impulse
+
+    if body_a.dynamic:
+        body_a.velocity = body_a.velocity.add_scaled(impulse_vector, -inverse_mass(body_a))
+        body_a.angular_velocity -= contact.r_a.cross(impulse_vector) * inverse_inertia(
+            body_a
+        )
+
+    if body_b.dynamic:
+        body_b.velocity = body_b.velocity.add_scaled(impulse_vector, inverse_mass(body_b))
+        body_b.angular_velocity += contact.r_b.cross(impulse_vector) * inverse_inertia(
+            body_b
+        )
 
-        # No impulse can be applied.
-        if denominator == 0:
-            continue
 
-        impulse: Scalar = -(1 + restitution) * velocity_along_normal
-        impulse: Scalar = impulse / denominator
-        impulse: Scalar = impulse / len(contacts)
+def warm_start(manifold: Manifold) -> None:
+    """Applies the impulses carried over from the last frame.
 
-        impulse_vector: Vec2 = collision_normal * impulse
+    Args:
+        manifold: The manifold to warm start.
+    """
+    for contact in manifold.contacts:
+        if contact.normal_impulse:
+            apply_impulse(manifold, contact, contact.normal_impulse)
 
-        if not body_a.pinned:
-            body_a.velocity -= impulse_vector * inv_mass_a
-            body_a.angular_velocity -= ra_cross_n * impulse * inv_inertia_a
 
-        if not body_b.pinned:
-            body_b.velocity += impulse_vector * inv_mass_b
-            body_b.angular_velocity += rb_cross_n * impulse * inv_inertia_b
+def solve_velocity(manifold: Manifold) -> None:
+    """Applies impulses so the bodies stop moving into each other.
 
+    The total impulse at each contact is clamped so it only ever pushes
+    the bodies apart; a later pass may take back some of an earlier
+    pass's impulse, but never pull the bodies together.
 
-    # Ensure there is minimal overlap between bodies due to time steps.
-    if penetration > THRESHOLD:
-        total_inv_mass: Scalar = inv_mass_a + inv_mass_b
-        penetration_correction: Scalar = penetration * SLOP / total_inv_mass
-        correction_vector = collision_normal * (
-            penetration * SLOP / (inv_mass_a + inv_mass_b)
+    Args:
+        manifold: The manifold to solve.
+    """
+    for contact in manifold.contacts:
+        velocity_along_normal: Scalar = relative_velocity(manifold, contact).dot(
+            manifold.normal
         )
-        
-        if not body_a.pinned:
-            body_a.position -= correction_vector * inv_mass_a
-        if not body_b.pinned:
-            body_b.position += correction_vector * inv_mass_b
+        impulse: Scalar = -contact.normal_mass * (
+            velocity_along_normal - contact.velocity_bias
+        )
+        total: Scalar = max(contact.normal_impulse + impulse, 0)
+        impulse = total - contact.normal_impulse
+        contact.normal_impulse = total
+        apply_impulse(manifold, contact, impulse)
+
+
+def solve_position(manifold: Manifold) -> None:
+    """Moves the bodies apart so there is minimal overlap due to time steps.
+
+    The penetration is estimated from how far the bodies have already
+    been moved apart, so this can be run several times per step.
+
+    Args:
+        manifold: The manifold to correct.
+    """
+    body_a = manifold.body_a
+    body_b = manifold.body_b
+    penetration: Scalar = manifold.current_penetration()
+
+    if penetration <= THRESHOLD:
+        return
+
+    inv_mass_a: Scalar = inverse_mass(body_a)
+    inv_mass_b: Scalar = inverse_mass(body_b)
+    total_inv_mass: Scalar = inv_mass_a + inv_mass_b
+    if total_inv_mass == 0:
+        return
+
+    correction_vector = manifold.normal * (penetration * SLOP / total_inv_mass)
 
+    if body_a.dynamic:
+        body_a.position = body_a.position.add_scaled(correction_vector, -inv_mass_a)
+    if body_b.dynamic:
+        body_b.position = body_b.position.add_scaled(correction_vector, inv_mass_b)
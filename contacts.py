@@ -0,0 +1,212 @@
+from typing import Optional
+
+from custom_types import CollisionResult, Feature, Scalar
+from vec2 import Vec2
+
+# Identifies a pair of colliding objects between frames by their serial
+# numbers (see RigidBody.serial and HalfPlane.serial).
+type PairKey = tuple[int, int]
+
+
+def ordered(body_a, body_b) -> tuple:
+    """Puts a pair of bodies in a consistent order, so the same pair
+    always produces the same key and normal direction.
+
+    Bodies are ordered by serial number (see RigidBody.serial) rather
+    than by id(), so the order, and so the result of a seeded run, does
+    not depend on where each body happens to be in memory.
+
+    Args:
+        body_a: The first body.
+        body_b: The second body.
+
+    Returns:
+        The two bodies, in the order they were created.
+    """
+    if body_a.serial > body_b.serial:
+        return body_b, body_a
+    return body_a, body_b
+
+
+class Contact:
+    """A single point of contact between two bodies.
+
+    Attributes:
+        position: The point of contact.
+        feature: The vertex the contact came from, used to find the
+            same contact in the next frame.
+        depth: How deep the contact was when it was detected.
+        normal_impulse: The total impulse applied along the normal at
+            this contact, carried between frames for warm starting.
+        r_a: The offset from the first body's position to the contact.
+        r_b: The offset from the second body's position to the contact.
+        normal_mass: The inverse of the effective mass along the normal.
+        velocity_bias: The target separating speed due to restitution.
+    """
+
+    def __init__(
+        self, position: Vec2, feature: Optional[Feature] = None, depth: Scalar = 0
+    ) -> None:
+        """Initializes the contact with no accumulated impulse.
+
+        Args:
+            position: The point of contact.
+            feature: The vertex the contact came from, if known.
+            depth: How deep the contact is, if known.
+        """
+        self.position = position
+        self.feature = feature
+        self.depth = depth
+        self.normal_impulse: Scalar = 0
+        self.r_a = Vec2()
+        self.r_b = Vec2()
+        self.normal_mass: Scalar = 0
+        self.velocity_bias: Scalar = 0
+
+
+class Manifold:
+    """The set of contact points between two colliding bodies.
+
+    Attributes:
+        body_a: The first body in the collision.
+        body_b: The second body in the collision.
+        normal: The collision normal, pointing from body_a to body_b.
+        penetration: The depth of the collision along the normal when
+            it was detected.
+        contacts: The points of contact.
+        start_a: The position of body_a when the collision was detected.
+        start_b: The position of body_b when the collision was detected.
+    """
+
+    def __init__(self, body_a, body_b, result: CollisionResult) -> None:
+        """Initializes the manifold from the result of a collision test.
+
+        Args:
+            body_a: The first body in the collision.
+            body_b: The second body in the collision.
+            result: The result of the collision test.
+        """
+        self.body_a = body_a
+        self.body_b = body_b
+        self.normal: Vec2 = result.normal
+        self.penetration: Scalar = result.penetration
+        contacts = result.contacts if result.contacts is not None else []
+        features = result.features or [None] * len(contacts)
+        depths = result.depths or [0] * len(contacts)
+        self.contacts = [
+            Contact(position, feature, depth)
+            for position, feature, depth in zip(contacts, features, depths)
+        ]
+        self.start_a = Vec2(body_a.position.x, body_a.position.y)
+        self.start_b = Vec2(body_b.position.x, body_b.position.y)
+
+    def current_penetration(self) -> Scalar:
+        """Estimates the penetration after the bodies have been moved apart.
+
+        Only the movement of the bodies along the normal is considered;
+        rotation since the collision was detected is ignored.
+
+        Returns:
+            The estimated depth of the collision along the normal.
+        """
+        moved_a = self.body_a.position - self.start_a
+        moved_b = self.body_b.position - self.start_b
+        return self.penetration - (moved_b - moved_a).dot(self.normal)
+
+
+class ContactCache:
+    """Keeps the manifolds from the last frame so impulses can be reused.
+
+    Resting contacts need roughly the same impulse every frame. Starting
+    the solver from last frame's impulse (warm starting) rather than from
+    zero lets stacks settle in far fewer iterations.
+
+    Contacts are matched between frames by the pair of objects and the
+    feature (vertex) each contact came from.
+
+    Attributes:
+        hits: The number of contacts matched with the last frame.
+        misses: The number of new contacts.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty cache."""
+        self._manifolds: dict[PairKey, Manifold] = {}
+        self._touched: set[PairKey] = set()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        """Returns the number of cached manifolds."""
+        return len(self._manifolds)
+
+    @property
+    def hit_rate(self) -> Scalar:
+        """Gets the fraction of contacts which were matched with the
+        last frame.
+
+        Returns:
+            The hit rate between 0 and 1, or 0 if nothing has been cached.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+    def update(
+        self, key: PairKey, body_a, body_b, result: CollisionResult
+    ) -> Manifold:
+        """Creates the manifold for a collision, copying the impulses of
+        matching contacts from the last frame.
+
+        Args:
+            key: Identifies the pair of colliding objects.
+            body_a: The first body in the collision.
+            body_b: The second body in the collision.
+            result: The result of the collision test.
+
+        Returns:
+            The new manifold.
+        """
+        manifold = Manifold(body_a, body_b, result)
+        old = self._manifolds.get(key)
+        previous = {}
+        if old is not None:
+            previous = {
+                contact.feature: contact.normal_impulse for contact in old.contacts
+            }
+        for contact in manifold.contacts:
+            if contact.feature is not None and contact.feature in previous:
+                contact.normal_impulse = previous[contact.feature]
+                self.hits += 1
+            else:
+                self.misses += 1
+        self._manifolds[key] = manifold
+        self._touched.add(key)
+        return manifold
+
+    def prune(self) -> None:
+        """Forgets every manifold which was not updated since the last prune."""
+        self._manifolds = {
+            key: manifold
+            for key, manifold in self._manifolds.items()
+            if key in self._touched
+        }
+        self._touched = set()
+
+    def forget(self, serial: int) -> None:
+        """Forgets every manifold involving a body, such as one which has
+        been removed.
+
+        Args:
+            serial: The serial number of the body.
+        """
+        self._manifolds = {
+            key: manifold
+            for key, manifold in self._manifolds.items()
+            if serial not in key
+        }
+        self._touched = {key for key in self._touched if serial not in key}
+
+    def clear(self) -> None:
+        """Forgets every manifold."""
+        self._manifolds = {}
+        self._touched = set()
@@ -5,6 +5,10 @@ from vec2 import Vec2, Vec2List
 # Analogous to "Real"
 type Scalar = int | float
 
+# Identifies which part of which body a contact point came from, as
+# (body, index): body is 0 for the first body and 1 for the second.
+type Feature = tuple[int, int]
+
 
 class CollisionResult:
     """Stores the result of a collision check between two RigidBodies
@@ -18,13 +22,22 @@ class CollisionResult:
         contacts: A list of vectors which are common between both bodies;
             points of contact. Typically limited to two with the current
             collision algorithm.
+        features: The feature each contact point came from, in the same
+            order as contacts. Used to match contacts between frames.
+        depths: How deep each contact point is, in the same order as
+            contacts.
     """
+
+    __slots__ = ("collided", "penetration", "normal", "contacts", "features", "depths")
+
     def __init__(
         self,
         collided: bool,
         penetration: Optional[Scalar] = 0,
         normal: Optional[Vec2] = None,
         contacts: Optional[Vec2List] = None,
+        features: Optional[list[Feature]] = None,
+        depths: Optional[list[Scalar]] = None,
     ):
         """Initializes the instance based on the result of a collision.
 
@@ -36,8 +49,164 @@ class CollisionResult:
             contacts: A list of vectors which are common between both bodies;
                 points of contact. Typically limited to two with the current
                 collision algorithm.
+            features: The feature each contact point came from.
+            depths: How deep each contact point is.
         """
         self.collided = collided
         self.penetration = penetration
         self.normal = normal
         self.contacts = contacts
+        self.features = features
+        self.depths = depths
+
+
+class AABB:
+    """An axis-aligned bounding box, the smallest upright rectangle
+    that contains a body.
+
+    Used by the broadphase to cheaply discard pairs of bodies which
+    cannot possibly be in contact before any axis projection is done.
+
+    Attributes:
+        min_x: The left edge of the box.
+        min_y: The top edge of the box.
+        max_x: The right edge of the box.
+        max_y: The bottom edge of the box.
+    """
+    def __init__(self, min_x: Scalar, min_y: Scalar, max_x: Scalar, max_y: Scalar):
+        """Initializes the box from its extents.
+
+        Args:
+            min_x: The left edge of the box.
+            min_y: The top edge of the box.
+            max_x: The right edge of the box.
+            max_y: The bottom edge of the box.
+        """
+        self.min_x = min_x
+        self.min_y = min_y
+        self.max_x = max_x
+        self.max_y = max_y
+
+    def overlaps(self, other: "AABB") -> bool:
+        """Determines if this box intersects another box.
+
+        Args:
+            other: The box to test against.
+
+        Returns:
+            True if the boxes overlap or touch, otherwise False.
+        """
+        return (
+            self.min_x <= other.max_x
+            and other.min_x <= self.max_x
+            and self.min_y <= other.max_y
+            and other.min_y <= self.max_y
+        )
+
+    def union(self, other: "AABB") -> "AABB":
+        """Creates the smallest box containing this box and another.
+
+        Args:
+            other: The box to combine with.
+
+        Returns:
+            A new box enclosing both boxes.
+        """
+        return AABB(
+            min(self.min_x, other.min_x),
+            min(self.min_y, other.min_y),
+            max(self.max_x, other.max_x),
+            max(self.max_y, other.max_y),
+        )
+
+    def expanded(self, margin: Scalar) -> "AABB":
+        """Creates a copy of this box grown by a margin on every side.
+
+        Args:
+            margin: The distance to grow each edge by.
+
+        Returns:
+            A new, larger box.
+        """
+        return AABB(
+            self.min_x - margin,
+            self.min_y - margin,
+            self.max_x + margin,
+            self.max_y + margin,
+        )
+
+    def contains(self, other: "AABB") -> bool:
+        """Determines if another box lies entirely inside this box.
+
+        Args:
+            other: The box to test.
+
+        Returns:
+            True if the other box is enclosed by this box.
+        """
+        return (
+            self.min_x <= other.min_x
+            and self.min_y <= other.min_y
+            and other.max_x <= self.max_x
+            and other.max_y <= self.max_y
+        )
+
+    def contains_point(self, point: Vec2) -> bool:
+        """Determines if a point lies inside this box.
+
+        Args:
+            point: The point to test.
+
+        Returns:
+            True if the point is inside or on the edge of the box.
+        """
+        return (
+            self.min_x <= point.x <= self.max_x
+            and self.min_y <= point.y <= self.max_y
+        )
+
+    def perimeter(self) -> Scalar:
+        """Calculates the perimeter of the box.
+
+        The perimeter is used as the cost of a node in the AABB tree,
+        as it is proportional to the chance of a random ray or box
+        hitting it.
+
+        Returns:
+            The perimeter of the box.
+        """
+        return 2 * ((self.max_x - self.min_x) + (self.max_y - self.min_y))
+
+    def ray_entry(
+        self, origin: Vec2, direction: Vec2, max_distance: Scalar
+    ) -> Scalar | None:
+        """Finds where a ray enters the box using the slab method.
+
+        Args:
+            origin: The start of the ray.
+            direction: The normalized direction of the ray.
+            max_distance: The length of the ray.
+
+        Returns:
+            The distance along the ray at which it enters the box,
+            which is 0 if it starts inside, or None if it misses.
+        """
+        t_min: Scalar = 0
+        t_max: Scalar = max_distance
+        for start, step, low, high in (
+            (origin.x, direction.x, self.min_x, self.max_x),
+            (origin.y, direction.y, self.min_y, self.max_y),
+        ):
+            if step == 0:
+                if start < low or start > high:
+                    return None
+                continue
+            t1 = (low - start) / step
+            t2 = (high - start) / step
+            if t1 > t2:
+                t1, t2 = t2, t1
+            t_min = max(t_min, t1)
+            t_max = min(t_max, t2)
+            if t_min > t_max:
+                return None
+        return t_min
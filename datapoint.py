@@ -15,6 +15,8 @@ class DataPoint:
         y: The y-coordinate of the position.
     """
 
+    __slots__ = ("_time", "_x", "_y")
+
     def __init__(self, time: Scalar, position: Vec2) -> None:
         """Initializes a DataPoint with time and position.
 
@@ -38,7 +40,7 @@ class DataPoint:
         Args:
             new_time: The new time to set.
         """
-        self.time = new_time
+        self._time = new_time
 
     @property
     def x(self) -> Scalar:
@@ -52,7 +54,7 @@ class DataPoint:
         Args:
             new_x: The new x-coordinate to set.
         """
-        self.x = new_x
+        self._x = new_x
 
     @property
     def y(self) -> Scalar:
@@ -66,7 +68,7 @@ class DataPoint:
         Args:
             new_y: The new y-coordinate to set.
         """
-        self.y = new_y
+        self._y = new_y
 
 
 class DataPointList:
@@ -13,6 +13,19 @@ def calculate_side_length(n: int, side_length: Scalar) -> Scalar:
     # Calculate the side length for the polygon with n sides
     return 2 * r * math.sin(math.pi / n)
 
+def calculate_circumradius(side_length: Scalar, sides: int) -> Scalar:
+    """Calculates the radius of the circle through every vertex of a regular polygon.
+
+    Args:
+        side_length: The length of each side of the polygon.
+        sides: The quantity of sides
+
+    Returns:
+        The radius of the circumcircle.
+    """
+    return side_length / (2 * math.sin(math.pi / sides))
+
+
 def draw_polygon(side_length: Scalar, sides: int) -> Vec2List:
     """Creates a polygon defined by vectors given quantity and length of sides
 
@@ -31,7 +44,7 @@ def draw_polygon(side_length: Scalar, sides: int) -> Vec2List:
     """
     # Derives relationship between side length of a regular polygon and the
     # radius of its circumcircle.
-    circumcircle_radius: Scalar = side_length / (2 * math.sin(math.pi / sides))
+    circumcircle_radius: Scalar = calculate_circumradius(side_length, sides)
     vertices: Vec2List = Vec2List()
 
     for i in range(sides):
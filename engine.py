@@ -1,12 +1,51 @@
-from itertools import combinations
+import math
 
-import drawing
 from bodies import Bodies
-from collision import handle_collision
+from body_store import BodyStore
+from bounds import Boundary
+from broadphase import Broadphase, BruteForce, SweepAndPrune
+from ccd import needs_sweep, pose_at, swept_aabb, time_of_impact
+from collision import (
+    EarlyOuts,
+    detect_collisions,
+    prepare_manifold,
+    solve_position,
+    solve_velocities_flat,
+    solve_velocity,
+    warm_start,
+)
+from contacts import ContactCache, Manifold, ordered
 from custom_types import Scalar
-from rigidbody import RigidBody
+from sat import AxisCache
+from rigidbody import KINEMATIC, STATIC, RigidBody
 from vec2 import Vec2
 
+# Bodies moving slower than this for TIME_TO_SLEEP seconds fall asleep.
+SLEEP_LINEAR_VELOCITY = 0.5
+SLEEP_ANGULAR_VELOCITY = 0.1
+TIME_TO_SLEEP = 0.5
+
+# A body may move at most this fraction of its smallest width per substep.
+SUBSTEP_CFL = 0.5
+MAX_SUBSTEPS = 8
+
+# How many times the solver passes over every contact each step.
+VELOCITY_ITERATIONS = 8
+POSITION_ITERATIONS = 3
+
+# Names accepted by Engine's broadphase setting.
+BROADPHASES: dict[str, type[Broadphase]] = {
+    "brute": BruteForce,
+    "sap": SweepAndPrune,
+}
+
+# Collision detection methods accepted by Engine, see collision.detect_collision.
+NARROWPHASES = ("sat", "gjk")
+
+# Ways of storing body state accepted by Engine. "objects" keeps the state
+# in each RigidBody, "arrays" in a shared BodyStore integrated in one batch.
+BACKENDS = ("objects", "arrays")
+
 
 class Engine:
     """A class to manage the physics engine, including bodies and gravity.
@@ -16,18 +55,119 @@ class Engine:
             abstract class with id: body pairs.
         gravity: The gravitational acceleration affecting the bodies.
         canvas: The canvas on which the bodies are drawn (optional).
+        broadphase: The strategy used to find pairs of bodies which
+            may be colliding. Set by name, see BROADPHASES.
+        bounds: The walls around the canvas, or None before the first
+            update.
+        sleep_linear_threshold: The speed below which a body may sleep.
+        sleep_angular_threshold: The angular speed below which a body
+            may sleep.
+        time_to_sleep: How long a body must stay below both thresholds
+            before it falls asleep.
+        contacts: The contact cache used to warm start collisions.
+        axes: The separating axis cache used by SAT.
+        early_outs: Counts the pairs rejected before the narrowphase.
+        velocity_iterations: How many passes the solver makes over every
+            contact to resolve velocities each step. More passes are
+            slower, but settle stacks faster.
+        position_iterations: How many passes the solver makes over every
+            contact to push overlapping bodies apart each step.
+        narrowphase: The collision detection method, see NARROWPHASES.
+        store: The BodyStore every body is attached to, or None if
+            bodies keep their own state.
+        ccd: Whether fast bodies are swept to stop them tunnelling
+            through walls and other bodies.
+        kernels: Whether collisions are detected and solved with the
+            flat-float kernels (see kernels.py) rather than Vec2 code.
+            The results are the same.
+        stats: Counters for tuning the engine. "sleeps" and "wakes" count
+            every time a body falls asleep or is woken, and "sleeping" is
+            the number of bodies currently asleep. "manifolds" is the
+            number of colliding pairs in the last update, and
+            "contact_hit_rate" the fraction of contacts warm started.
+            "substeps" is the number of substeps in the last update, and
+            "ccd_sweeps" the number of bodies swept during it.
+            "transform_cache_hits" and "transform_cache_misses" total how
+            often every body's world-space vertices were reused or
+            recalculated. "axis_cache_hits" and "axis_cache_misses" count
+            the SAT tests ended early by the separating axis cache, and
+            those which had to check every axis. "circle_early_outs" and
+            "aabb_early_outs" count the pairs rejected by their bounding
+            circles or boxes before reaching the narrowphase.
     """
 
-    def __init__(self, gravity: Scalar = 9.81, canvas=None) -> None:
+    def __init__(
+        self,
+        gravity: Scalar = 9.81,
+        canvas=None,
+        broadphase: str = "sap",
+        velocity_iterations: int = VELOCITY_ITERATIONS,
+        position_iterations: int = POSITION_ITERATIONS,
+        ccd: bool = False,
+        backend: str = "objects",
+        narrowphase: str = "sat",
+        kernels: bool = False,
+    ) -> None:
         """Initializes the Engine with a specified gravity and optional canvas.
 
         Args:
             gravity (Scalar): The gravitational acceleration. Defaults to 9.81.
             canvas: The canvas for rendering (optional).
+            broadphase: The name of the broadphase to use, either "brute"
+                or "sap" (sweep and prune). Defaults to "sap".
+            velocity_iterations: The number of velocity solver passes.
+                Defaults to VELOCITY_ITERATIONS.
+            position_iterations: The number of position solver passes.
+                Defaults to POSITION_ITERATIONS.
+            ccd: Whether to enable continuous collision detection.
+                Defaults to False.
+            backend: How body state is stored, see BACKENDS.
+                Defaults to "objects".
+            narrowphase: The collision detection method, either "sat"
+                or "gjk". Defaults to "sat".
+            kernels: Whether to use the flat-float kernels. GJK has no
+                kernel, so only the solver uses them with "gjk".
+                Defaults to False.
+
+        Raises:
+            ValueError: If the backend or narrowphase is not known.
         """
-        self._bodies = Bodies()
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        if narrowphase not in NARROWPHASES:
+            raise ValueError(f"Unknown narrowphase: {narrowphase}")
+        self.narrowphase = narrowphase
+        self.store = BodyStore() if backend == "arrays" else None
+        self._bodies = Bodies(self.store)
         self._gravity: Scalar = gravity
         self.canvas = canvas
+        self.broadphase = broadphase
+        self._bounds: Boundary | None = None
+        self.sleep_linear_threshold: Scalar = SLEEP_LINEAR_VELOCITY
+        self.sleep_angular_threshold: Scalar = SLEEP_ANGULAR_VELOCITY
+        self.time_to_sleep: Scalar = TIME_TO_SLEEP
+        self.contacts = ContactCache()
+        self.axes = AxisCache()
+        self.early_outs = EarlyOuts()
+        self.velocity_iterations = velocity_iterations
+        self.position_iterations = position_iterations
+        self.ccd = ccd
+        self.kernels = kernels
+        self.stats: dict[str, Scalar] = {
+            "sleeps": 0,
+            "wakes": 0,
+            "sleeping": 0,
+            "manifolds": 0,
+            "contact_hit_rate": 0,
+            "substeps": 0,
+            "ccd_sweeps": 0,
+            "transform_cache_hits": 0,
+            "transform_cache_misses": 0,
+            "axis_cache_hits": 0,
+            "axis_cache_misses": 0,
+            "circle_early_outs": 0,
+            "aabb_early_outs": 0,
+        }
 
     @property
     def bodies(self) -> Bodies:
@@ -51,11 +191,48 @@ class Engine:
     def gravity(self, new_gravity: Scalar) -> None:
         """Sets the gravitational acceleration.
 
+        Every body is woken if the gravity changes, as resting bodies
+        are no longer in balance.
+
         Args:
             new_gravity: The new gravitational acceleration.
         """
+        if new_gravity != self._gravity:
+            self.wake_all()
         self._gravity = new_gravity
 
+    @property
+    def broadphase(self) -> Broadphase:
+        """Gets the broadphase used to find candidate pairs.
+
+        Returns:
+            The current broadphase.
+        """
+        return self._broadphase
+
+    @broadphase.setter
+    def broadphase(self, name: str) -> None:
+        """Sets the broadphase used to find candidate pairs.
+
+        Args:
+            name: The name of the broadphase, see BROADPHASES.
+
+        Raises:
+            ValueError: If the name is not a known broadphase.
+        """
+        if name not in BROADPHASES:
+            raise ValueError(f"Unknown broadphase: {name}")
+        self._broadphase: Broadphase = BROADPHASES[name]()
+
+    @property
+    def bounds(self) -> Boundary | None:
+        """Gets the walls around the canvas.
+
+        Returns:
+            The current boundary, or None before the first update.
+        """
+        return self._bounds
+
     def __getitem__(self, id: int) -> RigidBody:
         """Gets a body by its ID.
 
@@ -64,8 +241,11 @@ class Engine:
 
         Returns:
             The RigidBody object associated with the given ID.
+
+        Raises:
+            KeyError: If there is no body with the ID.
         """
-        return self.bodies[id]
+        return self.bodies[self.bodies.index(id)]
 
     def get_body(self, id: int) -> RigidBody | None:
         """Returns a body given its ID.
@@ -78,56 +258,294 @@ class Engine:
         """
         return self.bodies.get(id)
 
+    def delete_body(self, id: int) -> None:
+        """Removes a body, forgetting its cached contacts and axes.
+
+        Args:
+            id: The ID of the body to remove.
+        """
+        body = self.bodies.get(id)
+        if body is None:
+            return
+        self.bodies.delete(id)
+        self.contacts.forget(body.serial)
+        self.axes.forget(body.serial)
+
+    def wake_body(self, body: RigidBody) -> None:
+        """Wakes a body if it is asleep.
+
+        Args:
+            body: The body to wake.
+        """
+        if body.sleeping:
+            body.wake()
+            self.stats["wakes"] += 1
+            self.stats["sleeping"] = max(self.stats["sleeping"] - 1, 0)
+
+    def wake_all(self) -> None:
+        """Wakes every body in the engine."""
+        for _, body in self.bodies:
+            self.wake_body(body)
+
     def reset(self) -> None:
         """Clears all bodies from the engine."""
-        self._bodies = Bodies()
+        if self.store is not None:
+            for _, body in self.bodies:
+                body.detach()
+            self.store.clear()
+        self._bodies = Bodies(self.store)
+        self.broadphase.reset()
+        self.contacts.clear()
+        self.axes.clear()
+        self.stats["sleeping"] = 0
 
-    def create_bounds(self, dimensions: Vec2) -> list:
-        """Creates a rectangular boundary as rigid bodies given dimensions.
+    def create_bounds(self, dimensions: Vec2) -> Boundary:
+        """Creates a rectangular boundary given dimensions.
 
         Args:
             dimensions: The x-y dimensions of the canvas.
 
         Returns:
-            A list of four walls represented as RigidBody objects.
+            A static boundary made of four walls.
         """
-        walls = [
-            (dimensions.x, 1, 0, 0),
-            (dimensions.x, 1, 0, dimensions.y),
-            (1, dimensions.y, 0, 0),
-            (1, dimensions.y, dimensions.x, 0),
-        ]
-
-        return [
-            RigidBody(
-                drawing.draw_rectangle(width, height),
-                Vec2(x, y),
-                Vec2(),
-                mass=100,
-                restitution=0.9,
-            )
-            for width, height, x, y in walls
-        ]
+        return Boundary(dimensions)
 
     def update(self, delta_time: Scalar, dimensions: Vec2) -> None:
         """Updates the state of the engine, iterating through all bodies
             and resolving collisions.
 
-        Bodies are iterated over in pairs using itertools. This could
-        be done with two deep nested for loop, but itertools' solution
-        is more elegant and performant.
+        The update is split into substeps if any body is moving fast
+        enough to pass through something in a single step; see
+        choose_substeps.
 
         Args:
             delta_time: The time step to update over.
             dimensions: The x-y dimensions of the canvas.
         """
-        walls = self.create_bounds(dimensions)
+        # The walls are only rebuilt when the canvas is resized.
+        if self.bounds is None or not self.bounds.matches(dimensions):
+            self._bounds = self.create_bounds(dimensions)
+        substeps = self.choose_substeps(delta_time)
+        self.stats["substeps"] = substeps
+        self.stats["ccd_sweeps"] = 0
+        self.save_states()
+        for _ in range(substeps):
+            self.step(delta_time / substeps)
+        self.bodies.refit()
+        self.stats["transform_cache_hits"] = sum(
+            body.cache_hits for _, body in self.bodies
+        )
+        self.stats["transform_cache_misses"] = sum(
+            body.cache_misses for _, body in self.bodies
+        )
+
+    def step(self, delta_time: Scalar) -> None:
+        """Advances the simulation by a single step.
+
+        The step runs in phases: every body is integrated, then every
+        collision is detected, then the solver makes several passes over
+        all of the contacts at once. Solving every contact together makes
+        the result independent of the order of the bodies.
+
+        Args:
+            delta_time: The time step to update over.
+        """
+        self.integrate(delta_time)
+        self.contain_kinematic()
+        if self.ccd:
+            self.sweep()
+        manifolds = self.collect_contacts()
+        self.solve(manifolds)
+        self.update_sleep(delta_time)
+
+    def choose_substeps(self, delta_time: Scalar) -> int:
+        """Chooses how many substeps to split an update into.
+
+        Each body should move less than SUBSTEP_CFL of its smallest
+        width per substep, like the Courant-Friedrichs-Lewy condition.
+        Calm scenes take a single step, and only frames with fast
+        bodies pay for more.
+
+        Args:
+            delta_time: The time step to update over.
+
+        Returns:
+            The number of substeps, between 1 and MAX_SUBSTEPS.
+        """
+        ratio: Scalar = 0
+        for _, body in self.bodies:
+            if body.sleeping or body.body_type == STATIC or body.min_extent <= 0:
+                continue
+            # Include the speed gained from gravity during the step.
+            speed = body.velocity.magnitude() + abs(self.gravity) * delta_time
+            ratio = max(ratio, speed * delta_time / (SUBSTEP_CFL * body.min_extent))
+        return max(1, min(MAX_SUBSTEPS, math.ceil(ratio)))
+
+    def save_states(self) -> None:
+        """Saves every body's position and angle at the start of an update.
+
+        This is done once per update rather than once per substep, so
+        the renderer interpolates across the whole update.
+        """
+        if self.store is not None:
+            self.store.save_state()
+            return
         for _, body in self.bodies:
+            body.save_state()
+
+    def integrate(self, delta_time: Scalar) -> None:
+        """Moves every awake body forward in time.
+
+        Every body's pose is saved first, so fast bodies can be swept
+        back along the step. With the "arrays" backend every body is
+        integrated at once by the store.
+
+        Args:
+            delta_time: The time step to update over.
+        """
+        if self.store is not None:
+            self.store.integrate(delta_time, self.gravity)
+            return
+        for _, body in self.bodies:
+            body.save_step()
+            if body.sleeping:
+                continue
             body.update(delta_time, gravity=self.gravity)
-            for wall in walls:
-                handle_collision(body, wall)
-        # See docstring.
-        for body_a, body_b in combinations(self.bodies, 2):
-            body_a = body_a[1]
-            body_b = body_b[1]
-            handle_collision(body_a, body_b)
+
+    def contain_kinematic(self) -> None:
+        """Keeps kinematic bodies inside the walls.
+
+        Walls cannot push a kinematic body through the solver, so one
+        that reaches a wall is moved back inside and bounces off it
+        instead (see Boundary.reflect). There are no walls before the
+        first update.
+        """
+        if self.bounds is None:
+            return
+        for _, body in self.bodies:
+            if body.body_type == KINEMATIC:
+                self.bounds.reflect(body)
+
+    def sweep(self) -> None:
+        """Pulls fast bodies back to where they first hit something.
+
+        Only bodies that moved further than a fraction of their size in
+        the last step are swept (see ccd.time_of_impact). Their velocity
+        is left alone, so the collision is resolved as normal.
+        """
+        fast = [body for _, body in self.bodies if needs_sweep(body)]
+        if not fast:
+            return
+        self.bodies.refit()
+        for body in fast:
+            obstacles = [
+                self.bodies.get(id) for id in self.bodies.query_region(swept_aabb(body))
+            ]
+            self.stats["ccd_sweeps"] += 1
+            t = time_of_impact(body, obstacles, self.bounds)
+            if t < 1:
+                body.position, body.angle = pose_at(body, t)
+
+    def collect_contacts(self) -> list[Manifold]:
+        """Detects every collision, without resolving any of them.
+
+        Only the pairs returned by the broadphase are passed to the
+        narrowphase, rather than every combination of bodies. Only awake
+        dynamic bodies are tested against the walls; kinematic bodies are
+        kept inside by contain_kinematic. Pairs without a
+        dynamic body are skipped, as nothing could respond, as are pairs
+        which are each asleep or static. A sleeping body is woken when a
+        moving body, including a kinematic one, touches it.
+
+        Returns:
+            A manifold for every colliding pair, including bodies
+            touching the walls once there are any.
+        """
+        manifolds: list[Manifold] = []
+        bounds = self.bounds
+        if bounds is not None:
+            for _, body in self.bodies:
+                if body.sleeping or not body.dynamic:
+                    continue
+                for plane, result in bounds.collide(body):
+                    manifolds.append(
+                        self.contacts.update(
+                            (body.serial, plane.serial), body, bounds, result
+                        )
+                    )
+
+        # Keep each pair in a consistent order so cached contacts line up.
+        pairs = [
+            ordered(body_a, body_b)
+            for body_a, body_b in self.broadphase.find_pairs(self.bodies)
+            if (body_a.dynamic or body_b.dynamic)
+            and not (
+                (body_a.sleeping or body_a.body_type == STATIC)
+                and (body_b.sleeping or body_b.body_type == STATIC)
+            )
+        ]
+        results = detect_collisions(
+            pairs, self.narrowphase, self.axes, self.early_outs, self.kernels
+        )
+        for (body_a, body_b), result in zip(pairs, results):
+            if result is None or not result.contacts:
+                continue
+            # Only a moving body wakes a sleeping one, otherwise resting
+            # neighbours would keep waking each other.
+            for body, other in ((body_a, body_b), (body_b, body_a)):
+                if body.sleeping and other.sleep_time == 0:
+                    self.wake_body(body)
+            manifolds.append(
+                self.contacts.update(
+                    (body_a.serial, body_b.serial), body_a, body_b, result
+                )
+            )
+
+        self.contacts.prune()
+        self.axes.prune()
+        self.stats["axis_cache_hits"] = self.axes.hits
+        self.stats["axis_cache_misses"] = self.axes.misses
+        self.stats["circle_early_outs"] = self.early_outs.circle
+        self.stats["aabb_early_outs"] = self.early_outs.aabb
+        self.stats["manifolds"] = len(self.contacts)
+        self.stats["contact_hit_rate"] = self.contacts.hit_rate
+        return manifolds
+
+    def solve(self, manifolds: list[Manifold]) -> None:
+        """Resolves every collision together.
+
+        Args:
+            manifolds: The manifolds of every colliding pair.
+        """
+        if self.kernels:
+            solve_velocities_flat(manifolds, self.velocity_iterations)
+        else:
+            for manifold in manifolds:
+                prepare_manifold(manifold)
+                warm_start(manifold)
+            for _ in range(self.velocity_iterations):
+                for manifold in manifolds:
+                    solve_velocity(manifold)
+        for _ in range(self.position_iterations):
+            for manifold in manifolds:
+                solve_position(manifold)
+
+    def update_sleep(self, delta_time: Scalar) -> None:
+        """Puts bodies which have been still for long enough to sleep.
+
+        Args:
+            delta_time: The time step to update over.
+        """
+        sleeping = 0
+        for _, body in self.bodies:
+            if body.sleeping:
+                sleeping += 1
+            elif body.dynamic and body.update_sleep(
+                delta_time,
+                self.sleep_linear_threshold,
+                self.sleep_angular_threshold,
+                self.time_to_sleep,
+            ):
+                self.stats["sleeps"] += 1
+                sleeping += 1
+        self.stats["sleeping"] = sleeping
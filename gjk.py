@@ -0,0 +1,190 @@
+from typing import Optional
+
+from clipping import clip_contacts
+from custom_types import CollisionResult, Scalar
+from rigidbody import RigidBody
+from vec2 import Vec2
+
+# Bounds on the number of iterations, in case of rounding problems.
+MAX_GJK_ITERATIONS = 32
+MAX_EPA_ITERATIONS = 32
+# EPA stops once the polytope grows less than this in an iteration.
+EPA_TOLERANCE = 1e-6
+
+
+def support(a: RigidBody, b: RigidBody, direction: Vec2) -> Vec2:
+    """Finds the point of the Minkowski difference A - B furthest along
+    a direction.
+
+    Only the two support points are needed, not every vertex of either
+    body, so this is O(log n) for bodies with many vertices (see
+    RigidBody.support_index).
+
+    Args:
+        a: The first body.
+        b: The second body.
+        direction: The direction to search in.
+
+    Returns:
+        The furthest point of A - B.
+    """
+    vertices_a = a.get_vertices()
+    vertices_b = b.get_vertices()
+    return vertices_a[a.support_index(direction)] - vertices_b[b.support_index(-direction)]
+
+
+def towards_origin(edge: Vec2, point: Vec2) -> Vec2:
+    """Finds the normal of an edge which points towards the origin.
+
+    Args:
+        edge: The direction of the edge.
+        point: Any point on the edge.
+
+    Returns:
+        The normal of the edge on the origin's side. Zero if the origin
+        lies on the line through the edge.
+    """
+    normal = edge.perpendicular()
+    side = normal.dot(point)
+    if side > 0:
+        return -normal
+    if side == 0:
+        return Vec2()
+    return normal
+
+
+def gjk(a: RigidBody, b: RigidBody) -> Optional[list[Vec2]]:
+    """Tests if two convex bodies overlap using the Gilbert-Johnson-Keerthi
+    algorithm.
+
+    The bodies overlap if the Minkowski difference A - B contains the
+    origin. Rather than building the whole difference, GJK grows a
+    simplex (a point, line, then triangle) inside it, each time adding
+    the support point in the direction of the origin. If a support point
+    does not get past the origin, the origin is outside.
+
+    Bodies which are only touching are not overlapping, as with SAT.
+
+    Args:
+        a: The first body.
+        b: The second body.
+
+    Returns:
+        A triangle inside A - B containing the origin if the bodies
+        overlap, otherwise None.
+    """
+    direction = b.position - a.position
+    if direction.x == 0 and direction.y == 0:
+        direction = Vec2(1, 0)
+    simplex = [support(a, b, direction)]
+    direction = -simplex[0]
+
+    for _ in range(MAX_GJK_ITERATIONS):
+        if direction.x == 0 and direction.y == 0:
+            # The origin is on the boundary of the simplex.
+            return None
+        point = support(a, b, direction)
+        if point.dot(direction) <= 0:
+            return None
+        simplex.append(point)
+
+        if len(simplex) == 2:
+            newest, other = simplex[1], simplex[0]
+            direction = towards_origin(other - newest, newest)
+            continue
+
+        newest, b_point, c_point = simplex[2], simplex[1], simplex[0]
+        ab = b_point - newest
+        ac = c_point - newest
+        ab_normal = ab.perpendicular()
+        if ab_normal.dot(ac) > 0:
+            ab_normal = -ab_normal
+        ac_normal = ac.perpendicular()
+        if ac_normal.dot(ab) > 0:
+            ac_normal = -ac_normal
+
+        if ab_normal.dot(-newest) > 0:
+            # The origin is beyond edge ab, so c is not needed.
+            simplex = [b_point, newest]
+            direction = ab_normal
+        elif ac_normal.dot(-newest) > 0:
+            simplex = [c_point, newest]
+            direction = ac_normal
+        else:
+            return simplex
+    return None
+
+
+def epa(a: RigidBody, b: RigidBody, simplex: list[Vec2]) -> tuple[Vec2, Scalar]:
+    """Finds the penetration of two overlapping bodies using the
+    Expanding Polytope Algorithm.
+
+    Starting from the GJK triangle, the edge of the polytope closest to
+    the origin is pushed out to the support point along its normal until
+    the polytope stops growing. That edge is then on the boundary of
+    A - B, and its normal and distance are the collision normal and
+    penetration.
+
+    Args:
+        a: The first body.
+        b: The second body.
+        simplex: The triangle returned by gjk.
+
+    Returns:
+        The collision normal, pointing from a to b, and the penetration.
+    """
+    polytope = list(simplex)
+    p0, p1, p2 = polytope
+    # Outward normals depend on the winding of the polytope.
+    clockwise = (p1 - p0).cross(p2 - p0) < 0
+
+    normal = Vec2()
+    distance: Scalar = 0
+    for _ in range(MAX_EPA_ITERATIONS):
+        closest = 0
+        distance = float("inf")
+        for i, point in enumerate(polytope):
+            edge = polytope[(i + 1) % len(polytope)] - point
+            edge_normal = edge.perpendicular() if clockwise else -edge.perpendicular()
+            edge_normal = edge_normal.normalized()
+            edge_distance = edge_normal.dot(point)
+            if edge_distance < distance:
+                closest, distance, normal = i, edge_distance, edge_normal
+
+        point = support(a, b, normal)
+        if point.dot(normal) - distance < EPA_TOLERANCE:
+            break
+        polytope.insert(closest + 1, point)
+    return normal, distance
+
+
+def gjk_epa(a: RigidBody, b: RigidBody) -> CollisionResult:
+    """Performs GJK and EPA to determine if two rigid bodies are colliding.
+
+    An alternative to sat; the result is in the same form.
+
+    Args:
+        a: The first rigid body to test for collision.
+        b: The second rigid body to test for collision.
+
+    Returns:
+        An object containing the result of the collision test. If a
+            collision occurs, it includes the penetration depth, the
+            collision normal, and the contact points; otherwise, it
+            indicates no collision.
+    """
+    simplex = gjk(a, b)
+    if simplex is None:
+        return CollisionResult(False)
+    normal, penetration = epa(a, b, simplex)
+    if penetration <= 0 or (normal.x == 0 and normal.y == 0):
+        return CollisionResult(False)
+
+    contact_points, features, depths = clip_contacts(
+        a.get_vertices(),
+        b.get_vertices(),
+        normal,
+        a.support_index(normal),
+        b.support_index(-normal),
+    )
+    return CollisionResult(True, penetration, normal, contact_points, features, depths)
@@ -1,7 +1,7 @@
 import time
 
 from datapoint import DataPointList
-from rigidbody import RigidBody
+from rigidbody import DYNAMIC, KINEMATIC, STATIC, RigidBody
 import physics
 import vec2
 
@@ -34,6 +34,7 @@ class InteractionManager:
     def setup_handlers(self) -> None:
         self.canvas.tag_bind("body", "<ButtonPress-1>", self.body_press)
         self.canvas.tag_bind("body", "<ButtonPress-3>", self.body_pin)
+        self.canvas.tag_bind("body", "<Shift-ButtonPress-3>", self.body_kinematic)
         self.canvas.tag_bind("body", "<B1-Motion>", self.body_drag_motion)
         self.canvas.tag_bind("body", "<ButtonRelease-1>", self.body_drag_release)
 
@@ -46,15 +47,19 @@ class InteractionManager:
             self.canvas.parent.play_pause_text.set("Pause")
             self.simulation_controller.step()
 
-    def search_body(self) -> RigidBody | None:
-        self.pressed_body_id = self.canvas.find_withtag("current")[0]
-        self.current_body = self.simulation_controller.physics_engine.get_body(
-            self.pressed_body_id
-        )
+    def search_body(self, event) -> RigidBody | None:
+        bodies = self.simulation_controller.physics_engine.bodies
+        found = bodies.query_point(vec2.Vec2(event.x, event.y))
+        if not found:
+            self.current_body = None
+            return None
+        # Bodies created later are drawn on top of earlier ones.
+        self.pressed_body_id = found[-1]
+        self.current_body = bodies.get(self.pressed_body_id)
         return self.current_body
 
-    def body_press(self, _) -> None:
-        self.search_body()
+    def body_press(self, event) -> None:
+        self.search_body(event)
         if self.current_body is not None:
             if self.current_body == self.last_body:
                 self.canvas.itemconfigure(self.pressed_body_id, fill="red")
@@ -66,19 +71,38 @@ class InteractionManager:
                 self.last_body = self.pressed_body_id
 
     def body_pin(self, event) -> None:
-        self.search_body()
+        self.search_body(event)
         if self.current_body is not None:
+            self.simulation_controller.physics_engine.wake_body(self.current_body)
             self.current_body.pin(vec2.Vec2(event.x, event.y))
 
+    def body_kinematic(self, event) -> None:
+        """Toggles a body between kinematic and dynamic.
+
+        A kinematic body keeps the velocity it is thrown with, and pushes
+        dynamic bodies out of its way.
+        """
+        self.search_body(event)
+        if self.current_body is not None:
+            self.simulation_controller.physics_engine.wake_body(self.current_body)
+            if self.current_body.body_type == KINEMATIC:
+                self.current_body.body_type = DYNAMIC
+            else:
+                self.current_body.body_type = KINEMATIC
+
     def body_drag_motion(self, event) -> None:
-        self.search_body()
+        # The body stays grabbed from the press, even if the cursor
+        # moves faster than it does.
         if self.current_body is None:
             return
         new_position = vec2.Vec2(event.x, event.y)
         new_velocity = vec2.Vec2(0, 0)
 
+        self.simulation_controller.physics_engine.wake_body(self.current_body)
+
         self.current_body.position = new_position
         self.current_body.velocity = new_velocity
+        self.simulation_controller.physics_engine.bodies.refit(self.pressed_body_id)
 
         time_ = time.perf_counter_ns()
 
@@ -86,6 +110,7 @@ class InteractionManager:
 
     def body_drag_release(self, _) -> None:
         new_velocity = physics.calculate_velocity(self.mouse_positions)
-        if self.current_body is None:
+        if self.current_body is None or self.current_body.body_type == STATIC:
             return
+        self.simulation_controller.physics_engine.wake_body(self.current_body)
         self.current_body.velocity = new_velocity
@@ -0,0 +1,363 @@
+import math
+from typing import Optional, Sequence
+
+from clipping import REFERENCE_TOLERANCE
+from custom_types import Feature
+
+# Kernels for the hot paths of collision detection and resolution.
+#
+# They work on flat sequences of floats, [x0, y0, x1, y1, ...], and plain
+# float arguments instead of Vec2, so no objects are created per
+# arithmetic step and no properties are read. Each one does the same
+# arithmetic in the same order as the Vec2 version it replaces, so the
+# results are identical, not just close. Engine uses them when created
+# with kernels=True (see collision.detect_collisions and
+# collision.solve_velocities_flat), and benchmark.check_kernels compares
+# them with the Vec2 code.
+
+# A flat list of coordinates, [x0, y0, x1, y1, ...].
+type FlatPoints = Sequence[float]
+
+
+def flatten(vectors) -> list[float]:
+    """Flattens vectors into a list of coordinates.
+
+    Args:
+        vectors: The vectors to flatten.
+
+    Returns:
+        The coordinates of each vector, [x0, y0, x1, y1, ...].
+    """
+    return [coordinate for vector in vectors for coordinate in (vector.x, vector.y)]
+
+
+def project(points: FlatPoints, axis_x: float, axis_y: float) -> tuple[float, float]:
+    """Projects a polygon onto an axis, like sat.project_polygon.
+
+    Args:
+        points: The flat coordinates of the polygon.
+        axis_x: The x component of the axis.
+        axis_y: The y component of the axis.
+
+    Returns:
+        The minimum and maximum of the projection.
+    """
+    low = high = points[0] * axis_x + points[1] * axis_y
+    for i in range(2, len(points), 2):
+        d = points[i] * axis_x + points[i + 1] * axis_y
+        if d < low:
+            low = d
+        elif d > high:
+            high = d
+    return low, high
+
+
+def support(points: FlatPoints, direction_x: float, direction_y: float) -> int:
+    """Finds the vertex furthest along a direction, like
+    RigidBody.support_index. Ties go to the lowest index.
+
+    Args:
+        points: The flat coordinates of the polygon.
+        direction_x: The x component of the direction.
+        direction_y: The y component of the direction.
+
+    Returns:
+        The index of the furthest vertex.
+    """
+    best = 0
+    furthest = points[0] * direction_x + points[1] * direction_y
+    for i in range(2, len(points), 2):
+        d = points[i] * direction_x + points[i + 1] * direction_y
+        if d > furthest:
+            best, furthest = i // 2, d
+    return best
+
+
+def sat(
+    a: FlatPoints,
+    b: FlatPoints,
+    axes: FlatPoints,
+    delta_x: float,
+    delta_y: float,
+) -> Optional[tuple[float, float, float]]:
+    """Tests two convex polygons for overlap, like sat.sat.
+
+    Args:
+        a: The flat coordinates of the first polygon.
+        b: The flat coordinates of the second polygon.
+        axes: The flat separating axes of the first polygon followed by
+            those of the second.
+        delta_x: The x offset from the first body's position to the
+            second's.
+        delta_y: The y offset from the first body's position to the
+            second's.
+
+    Returns:
+        The penetration and the x and y components of the collision
+        normal, pointing from a to b, or None if the polygons do not
+        overlap.
+    """
+    if not axes:
+        return None
+    penetration = math.inf
+    normal_x = normal_y = 0.0
+    for i in range(0, len(axes), 2):
+        axis_x = axes[i]
+        axis_y = axes[i + 1]
+        min_a, max_a = project(a, axis_x, axis_y)
+        min_b, max_b = project(b, axis_x, axis_y)
+        offset = min(max_a, max_b) - max(min_a, min_b)
+        if offset <= 0:
+            return None
+        if offset < penetration:
+            penetration, normal_x, normal_y = offset, axis_x, axis_y
+
+    if delta_x * normal_x + delta_y * normal_y < 0:
+        normal_x, normal_y = -normal_x, -normal_y
+    return penetration, normal_x, normal_y
+
+
+def normalized(x: float, y: float) -> tuple[float, float]:
+    """Normalizes a vector, like Vec2.normalized.
+
+    Args:
+        x: The x component.
+        y: The y component.
+
+    Returns:
+        The unit vector, or (0, 0) for the zero vector.
+    """
+    magnitude = math.hypot(x, y)
+    if not magnitude:
+        return 0, 0
+    return x / magnitude, y / magnitude
+
+
+def best_edge(
+    points: FlatPoints, index: int, normal_x: float, normal_y: float
+) -> tuple[int, int]:
+    """Finds the edge at a vertex most perpendicular to a normal, like
+    clipping.best_edge.
+
+    Args:
+        points: The flat coordinates of the polygon.
+        index: The vertex furthest along the normal.
+        normal_x: The x component of the normal.
+        normal_y: The y component of the normal.
+
+    Returns:
+        The indices of the edge's start and end vertices.
+    """
+    n = len(points) // 2
+    previous = (index - 1) % n
+    following = (index + 1) % n
+    x = points[2 * index]
+    y = points[2 * index + 1]
+    to_previous_x, to_previous_y = normalized(
+        x - points[2 * previous], y - points[2 * previous + 1]
+    )
+    to_following_x, to_following_y = normalized(
+        points[2 * following] - x, points[2 * following + 1] - y
+    )
+    if abs(to_following_x * normal_x + to_following_y * normal_y) <= abs(
+        to_previous_x * normal_x + to_previous_y * normal_y
+    ):
+        return index, following
+    return previous, index
+
+
+def clip_contacts(
+    a: FlatPoints,
+    b: FlatPoints,
+    normal_x: float,
+    normal_y: float,
+) -> tuple[list[float], list[Feature]]:
+    """Finds the contact points of two overlapping polygons by clipping,
+    like clipping.clip_contacts.
+
+    Args:
+        a: The flat coordinates of the first polygon.
+        b: The flat coordinates of the second polygon.
+        normal_x: The x component of the normal, pointing from a to b.
+        normal_y: The y component of the normal.
+
+    Returns:
+        The contacts as [x0, y0, depth0, x1, y1, depth1, ...], and the
+        feature each came from.
+    """
+    index_a = support(a, normal_x, normal_y)
+    index_b = support(b, -normal_x, -normal_y)
+    start_a, end_a = best_edge(a, index_a, normal_x, normal_y)
+    start_b, end_b = best_edge(b, index_b, -normal_x, -normal_y)
+
+    direction_a_x, direction_a_y = normalized(
+        a[2 * end_a] - a[2 * start_a], a[2 * end_a + 1] - a[2 * start_a + 1]
+    )
+    direction_b_x, direction_b_y = normalized(
+        b[2 * end_b] - b[2 * start_b], b[2 * end_b + 1] - b[2 * start_b + 1]
+    )
+    if abs(direction_a_x * normal_x + direction_a_y * normal_y) <= abs(
+        direction_b_x * normal_x + direction_b_y * normal_y
+    ) + REFERENCE_TOLERANCE:
+        reference, start, end, reference_body = a, start_a, end_a, 0
+        incident, incident_start, incident_end, incident_body = b, start_b, end_b, 1
+        reference_index, incident_index = index_a, index_b
+        reference_x, reference_y = normal_x, normal_y
+    else:
+        reference, start, end, reference_body = b, start_b, end_b, 1
+        incident, incident_start, incident_end, incident_body = a, start_a, end_a, 0
+        reference_index, incident_index = index_b, index_a
+        reference_x, reference_y = -normal_x, -normal_y
+
+    start_x = reference[2 * start]
+    start_y = reference[2 * start + 1]
+    end_x = reference[2 * end]
+    end_y = reference[2 * end + 1]
+    side_x, side_y = normalized(end_x - start_x, end_y - start_y)
+
+    # The incident face, clipped to the side planes of the reference face.
+    x0 = incident[2 * incident_start]
+    y0 = incident[2 * incident_start + 1]
+    x1 = incident[2 * incident_end]
+    y1 = incident[2 * incident_end + 1]
+    clipped = [
+        (x0, y0, (incident_body, incident_start)),
+        (x1, y1, (incident_body, incident_end)),
+    ]
+    for direction_x, direction_y, offset, feature in (
+        (side_x, side_y, side_x * start_x + side_y * start_y, (reference_body, start)),
+        (-side_x, -side_y, -(side_x * end_x + side_y * end_y), (reference_body, end)),
+    ):
+        if len(clipped) < 2:
+            break
+        (x0, y0, feature0), (x1, y1, feature1) = clipped
+        distance0 = direction_x * x0 + direction_y * y0 - offset
+        distance1 = direction_x * x1 + direction_y * y1 - offset
+        clipped = []
+        if distance0 >= 0:
+            clipped.append((x0, y0, feature0))
+        if distance1 >= 0:
+            clipped.append((x1, y1, feature1))
+        if distance0 * distance1 < 0:
+            t = distance0 / (distance0 - distance1)
+            clipped.append((x0 + (x1 - x0) * t, y0 + (y1 - y0) * t, feature))
+
+    face = (
+        reference_x * reference[2 * reference_index]
+        + reference_y * reference[2 * reference_index + 1]
+    )
+    contacts: list[float] = []
+    features: list[Feature] = []
+    for x, y, feature in clipped:
+        depth = face - (reference_x * x + reference_y * y)
+        if depth >= 0:
+            contacts += (x, y, depth)
+            features.append(feature)
+
+    if not features:
+        x = incident[2 * incident_index]
+        y = incident[2 * incident_index + 1]
+        contacts += (x, y, max(face - (reference_x * x + reference_y * y), 0))
+        features.append((incident_body, incident_index))
+    return contacts, features
+
+
+def solve_velocities(
+    velocities: list[float],
+    masses: FlatPoints,
+    manifolds: Sequence[tuple[int, int, float, float, float, int, int]],
+    offsets: FlatPoints,
+    impulses: list[float],
+    restitution_velocity: float,
+    iterations: int,
+) -> None:
+    """Resolves the contacts of many collisions together with impulses,
+    like collision.prepare_manifold and warm_start for each manifold in
+    turn, then iterations passes of collision.solve_velocity over them.
+
+    Args:
+        velocities: Every body's [vx, vy, angular velocity], one after
+            another, updated in place.
+        masses: Every body's [inverse mass, inverse moment of inertia,
+            1 if impulses move it else 0], in the same order.
+        manifolds: For each manifold, the indices of its two bodies, the
+            x and y components of its normal (pointing from the first
+            body to the second), its restitution, and the range of its
+            contacts as (start, stop).
+        offsets: The offset of each contact from each body's position,
+            as [ra_x, ra_y, rb_x, rb_y, ...].
+        impulses: The accumulated normal impulse of each contact, used
+            to warm start and updated in place.
+        restitution_velocity: collision.RESTITUTION_VELOCITY.
+        iterations: The number of passes over every contact.
+    """
+    normal_masses = [0.0] * len(impulses)
+    biases = [0.0] * len(impulses)
+
+    def closing_speed(a: int, b: int, normal_x: float, normal_y: float, k: int) -> float:
+        r_a_x = offsets[4 * k]
+        r_a_y = offsets[4 * k + 1]
+        r_b_x = offsets[4 * k + 2]
+        r_b_y = offsets[4 * k + 3]
+        angular_a = velocities[3 * a + 2]
+        angular_b = velocities[3 * b + 2]
+        relative_x = (velocities[3 * b] + -r_b_y * angular_b) - (
+            velocities[3 * a] + -r_a_y * angular_a
+        )
+        relative_y = (velocities[3 * b + 1] + r_b_x * angular_b) - (
+            velocities[3 * a + 1] + r_a_x * angular_a
+        )
+        return relative_x * normal_x + relative_y * normal_y
+
+    def apply(
+        a: int, b: int, normal_x: float, normal_y: float, k: int, impulse: float
+    ) -> None:
+        impulse_x = normal_x * impulse
+        impulse_y = normal_y * impulse
+        if masses[3 * a + 2]:
+            inv_mass = masses[3 * a]
+            velocities[3 * a] -= impulse_x * inv_mass
+            velocities[3 * a + 1] -= impulse_y * inv_mass
+            velocities[3 * a + 2] -= (
+                offsets[4 * k] * impulse_y - offsets[4 * k + 1] * impulse_x
+            ) * masses[3 * a + 1]
+        if masses[3 * b + 2]:
+            inv_mass = masses[3 * b]
+            velocities[3 * b] += impulse_x * inv_mass
+            velocities[3 * b + 1] += impulse_y * inv_mass
+            velocities[3 * b + 2] += (
+                offsets[4 * k + 2] * impulse_y - offsets[4 * k + 3] * impulse_x
+            ) * masses[3 * b + 1]
+
+    for a, b, normal_x, normal_y, restitution, start, stop in manifolds:
+        inv_mass_a = masses[3 * a]
+        inv_inertia_a = masses[3 * a + 1]
+        inv_mass_b = masses[3 * b]
+        inv_inertia_b = masses[3 * b + 1]
+        for k in range(start, stop):
+            ra_cross_n = offsets[4 * k] * normal_y - offsets[4 * k + 1] * normal_x
+            rb_cross_n = offsets[4 * k + 2] * normal_y - offsets[4 * k + 3] * normal_x
+            denominator = (
+                inv_mass_a
+                + inv_mass_b
+                + (ra_cross_n**2) * inv_inertia_a
+                + (rb_cross_n**2) * inv_inertia_b
+            )
+            normal_masses[k] = 0 if denominator == 0 else 1 / denominator
+            speed = closing_speed(a, b, normal_x, normal_y, k)
+            if speed < -restitution_velocity:
+                biases[k] = -restitution * speed
+        for k in range(start, stop):
+            if impulses[k]:
+                apply(a, b, normal_x, normal_y, k, impulses[k])
+
+    for _ in range(iterations):
+        for a, b, normal_x, normal_y, _, start, stop in manifolds:
+            for k in range(start, stop):
+                impulse = -normal_masses[k] * (
+                    closing_speed(a, b, normal_x, normal_y, k) - biases[k]
+                )
+                total = max(impulses[k] + impulse, 0)
+                impulse = total - impulses[k]
+                impulses[k] = total
+                apply(a, b, normal_x, normal_y, k, impulse)
@@ -64,7 +64,7 @@ class LessonFrame(ttk.Frame):
             return
         for body in self.parser.bodies:
             for _, properties in body.items():
-                self.parent.simulation_canvas.body_renderer.create_polygon(**properties)
+                self.parent.simulation_canvas.body_renderer.create_body(**properties)
 
 
 class LessonManager:
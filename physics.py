@@ -1,3 +1,5 @@
+import math
+
 import vec2
 
 
@@ -44,11 +46,117 @@ def compute_polygon_area(vertices):
     Returns:
         The area of the polygon. Returns 0 if the polygon is degenerate.
     """
+    return abs(compute_signed_area(vertices))
+
+
+def compute_signed_area(vertices):
+    """Calculates the signed area of a polygon defined by its vertices.
+
+    The sign gives the winding of the vertices; positive is counter-clockwise
+    with the y axis pointing up, which is clockwise on the canvas.
+
+    Args:
+        vertices: A list of Vec2 objects representing the vertices of the polygon.
+
+    Returns:
+        The signed area of the polygon.
+    """
     area = 0
     for i, vertex in enumerate(vertices):
         j = (i + 1) % len(vertices)
         area += vertex.cross(vertices[j])
-    return abs(area) / 2
+    return area / 2
+
+
+def compute_polygon_min_width(vertices):
+    """Calculates the smallest width of a convex polygon.
+
+    The narrowest way to measure a convex polygon is always perpendicular
+    to one of its edges, so only the edge normals need to be checked.
+
+    Args:
+        vertices: A list of Vec2 objects representing the vertices of the polygon.
+
+    Returns:
+        The smallest width of the polygon. Returns 0 if the polygon is degenerate.
+    """
+    n = len(vertices)
+    if n < 3:
+        return 0
+    min_width = float("inf")
+    for i, vertex in enumerate(vertices):
+        axis = (vertices[(i + 1) % n] - vertex).perpendicular().normalized()
+        dots = [other.dot(axis) for other in vertices]
+        min_width = min(min_width, max(dots) - min(dots))
+    return min_width
+
+
+def compute_bounding_radius(vertices):
+    """Calculates the radius of the smallest circle around the origin
+    containing a polygon.
+
+    For the regular polygons from drawing.draw_polygon this is the
+    circumradius.
+
+    Args:
+        vertices: A list of Vec2 objects representing the vertices of the polygon.
+
+    Returns:
+        The distance to the furthest vertex, or 0 if there are none.
+    """
+    return max((vertex.magnitude() for vertex in vertices), default=0)
+
+
+def compute_unique_axes(vertices, tolerance=1e-9):
+    """Calculates the separating axes of a convex polygon for SAT.
+
+    Each edge gives the unit normal as an axis, but parallel edges give
+    the same axis (facing the opposite way), so only the first of each
+    is kept. Every even-sided regular polygon has half as many unique
+    axes as edges.
+
+    Args:
+        vertices: A list of Vec2 objects representing the vertices of the polygon.
+        tolerance: How close to parallel two axes must be to count as
+            the same axis.
+
+    Returns:
+        A list of the unique unit edge normals.
+    """
+    axes = []
+    n = len(vertices)
+    for i, vertex in enumerate(vertices):
+        axis = (vertices[(i + 1) % n] - vertex).perpendicular().normalized()
+        if axis.x == 0 and axis.y == 0:
+            continue
+        if all(abs(axis.cross(other)) > tolerance for other in axes):
+            axes.append(axis)
+    return axes
+
+
+def compute_normal_angles(vertices):
+    """Calculates the direction of each edge's outward normal, sorted.
+
+    The outward normals of a convex polygon turn steadily around the
+    circle, so the vertex furthest in a direction lies between the two
+    edges whose normals surround that direction. Sorting the angles
+    lets that pair be found with a binary search.
+
+    Args:
+        vertices: A list of Vec2 objects representing the vertices of the polygon.
+
+    Returns:
+        A list of (angle, edge index) tuples sorted by angle, where edge
+        i runs from vertex i to vertex i + 1 and angles are in [0, 2π).
+    """
+    n = len(vertices)
+    # Flip the normals of clockwise polygons so they all face outwards.
+    winding = 1 if compute_signed_area(vertices) < 0 else -1
+    angles = []
+    for i, vertex in enumerate(vertices):
+        normal = (vertices[(i + 1) % n] - vertex).perpendicular() * winding
+        angles.append((math.atan2(normal.y, normal.x) % math.tau, i))
+    return sorted(angles)
 
 
 def calculate_velocity(data_points):
@@ -4,17 +4,20 @@ from tkinter import ttk
 class PropertiesFrame(ttk.LabelFrame):
     """A frame that displays properties of the currently selected body in the simulation.
 
-    This frame shows the velocity, mass, and restitution of the selected body,
-    updating the displayed values whenever the properties change.
+    This frame shows the velocity, mass, restitution, sleep state and type
+    of the selected body, updating the displayed values whenever the properties change.
 
     Attributes:
         simulation_canvas: The canvas used for rendering the simulation.
         velocity: A StringVar that holds the velocity of the selected body.
         mass: A StringVar that holds the mass of the selected body.
         restitution: A StringVar that holds the restitution of the selected body.
+        sleeping: A StringVar that holds the sleep state and type of the
+            selected body.
         velocity_text: A label that displays the velocity of the selected body.
         mass_text: A label that displays the mass of the selected body.
         restitution_text: A label that displays the restitution of the selected body.
+        sleeping_text: A label that displays the sleep state of the selected body.
     """
 
     def __init__(self, parent) -> None:
@@ -28,6 +31,8 @@ class PropertiesFrame(ttk.LabelFrame):
         self.mass_text = ttk.Label(self, textvariable=self.mass)
         self.restitution = tk.StringVar()
         self.restitution_text = ttk.Label(self, textvariable=self.restitution)
+        self.sleeping = tk.StringVar()
+        self.sleeping_text = ttk.Label(self, textvariable=self.sleeping)
 
         self.polygon_sides_label = ttk.Label(self, text="Polygon Vertices")
         self.polygon_size_label = ttk.Label(self, text="Polygon Size")
@@ -67,18 +72,19 @@ class PropertiesFrame(ttk.LabelFrame):
         self.velocity_text.grid(column=0, row=0, sticky=tk.W)
         self.mass_text.grid(column=0, row=1, sticky=tk.W)
         self.restitution_text.grid(column=0, row=2, sticky=tk.W)
+        self.sleeping_text.grid(column=0, row=3, sticky=tk.W)
 
-        self.polygon_sides_label.grid(column=0, row=3, sticky=tk.W)
-        self.polygon_size_label.grid(column=0, row=5, sticky=tk.W)
-        self.mass_label.grid(column=0, row=7, sticky=tk.W)
+        self.polygon_sides_label.grid(column=0, row=4, sticky=tk.W)
+        self.polygon_size_label.grid(column=0, row=6, sticky=tk.W)
+        self.mass_label.grid(column=0, row=8, sticky=tk.W)
 
-        self.polygon_sides_scale.grid(column=0, row=4, sticky=tk.W)
-        self.polygon_size_scale.grid(column=0, row=6, sticky=tk.W)
-        self.mass_scale.grid(column=0, row=8, sticky=tk.W)
+        self.polygon_sides_scale.grid(column=0, row=5, sticky=tk.W)
+        self.polygon_size_scale.grid(column=0, row=7, sticky=tk.W)
+        self.mass_scale.grid(column=0, row=9, sticky=tk.W)
 
-        self.polygon_sides_value_label.grid(column=1, row=4, sticky=tk.W)
-        self.polygon_size_value_label.grid(column=1, row=6, sticky=tk.W)
-        self.mass_value_label.grid(column=1, row=8, sticky=tk.W)
+        self.polygon_sides_value_label.grid(column=1, row=5, sticky=tk.W)
+        self.polygon_size_value_label.grid(column=1, row=7, sticky=tk.W)
+        self.mass_value_label.grid(column=1, row=9, sticky=tk.W)
 
         self.polygon_sides_scale.config(command=self.update_polygon_sides_value)
         self.polygon_size_scale.config(command=self.update_polygon_size_value)
@@ -95,6 +101,8 @@ class PropertiesFrame(ttk.LabelFrame):
         self.velocity.set(f"x: {velocity_x}, y: {velocity_y}")
         self.mass.set(f"mass: {round(state['mass'], 2)}")
         self.restitution.set(f"restitution: {state['restitution']}")
+        sleep_state = "asleep" if state["sleeping"] else "awake"
+        self.sleeping.set(f"{state['body_type']}, {sleep_state}")
 
     def update_polygon_sides_value(self, value: str) -> None:
         """Updates the displayed polygon vertices value."""
@@ -2,12 +2,30 @@ from typing import Optional
 import tkinter as tk
 from custom_types import Scalar
 
-import drawing
 import rigidbody
+import shapes
 from vec2 import Vec2
 
 
 
+def circle_coordinates(position: Vec2, radius: Scalar) -> tuple[Scalar, Scalar, Scalar, Scalar]:
+    """Calculates the canvas coordinates of a circle's bounding box.
+
+    Args:
+        position: The center of the circle.
+        radius: The radius of the circle.
+
+    Returns:
+        The top left and bottom right corners, as passed to create_oval.
+    """
+    return (
+        position.x - radius,
+        position.y - radius,
+        position.x + radius,
+        position.y + radius,
+    )
+
+
 class BodyRenderer:
     """A class to render bodies in a simulation canvas.
 
@@ -35,6 +53,24 @@ class BodyRenderer:
         self.default_polygon_size.set(100)
         self.default_polygon_mass.set(5)
 
+    def create_body(self, shape: str = "polygon", **properties) -> None:
+        """Creates a body from lesson metadata.
+
+        Args:
+            shape: Either "polygon" or "circle". Defaults to "polygon".
+            **properties: The remaining arguments of create_polygon or
+                create_circle.
+
+        Raises:
+            ValueError: If the shape is not known.
+        """
+        if shape == "polygon":
+            self.create_polygon(**properties)
+        elif shape == "circle":
+            self.create_circle(**properties)
+        else:
+            raise ValueError(f"Unknown shape: {shape}")
+
     def create_polygon(
         self,
         position: Optional[Vec2] = None,
@@ -44,6 +80,7 @@ class BodyRenderer:
         angle: float = 0,
         mass: float = 5,
         restitution: float = 0.5,
+        body_type: str = rigidbody.DYNAMIC,
     ) -> None:
         """Creates a polygonal rigid body and adds it to the simulation.
 
@@ -57,16 +94,85 @@ class BodyRenderer:
             angle: The initial rotation angle of the body in radians. Defaults to 0.
             mass: The mass of the body. Defaults to 5.
             restitution: The restitution coefficient for the body. Defaults to 0.5.
+            body_type: How the body moves, see rigidbody.BODY_TYPES.
+                Defaults to dynamic.
         """
         sides = self.default_polygon_sides.get()
-        side_length = drawing.calculate_side_length(
-            sides, self.default_polygon_size.get()
-        )
+        shape = shapes.get_shape(sides, self.default_polygon_size.get())
         mass = self.default_polygon_mass.get()
-        vertices = drawing.draw_polygon(side_length, sides)
 
         velocity = velocity if velocity is not None else Vec2()
+        position = self.place(position)
+
+        body = rigidbody.RigidBody(
+            shape, position, velocity, angle, mass, restitution, body_type
+        )
+        canvas_id = self.draw_polygon(
+            *body.get_vertices().flat(),
+            outline=self.canvas.polygon_outline,
+            fill=self.canvas.polygon_fill
+        )
+        self.simulation_controller.physics_engine.bodies.add(body, canvas_id)
+
+    def create_circle(
+        self,
+        position: Optional[Vec2] = None,
+        velocity: Optional[Vec2] = None,
+        radius: Optional[Scalar] = None,
+        angle: float = 0,
+        mass: Optional[float] = None,
+        restitution: float = 0.5,
+        body_type: str = rigidbody.DYNAMIC,
+    ) -> None:
+        """Creates a circular rigid body and adds it to the simulation.
 
+        Args:
+            position: The initial position of the body, as in create_polygon.
+            velocity: The initial velocity of the body. Defaults to a zero vector
+                if None.
+            radius: The radius of the circle. If None, the circle fits in
+                a square of the default polygon size.
+            angle: The initial rotation angle of the body in radians. Defaults to 0.
+            mass: The mass of the body. If None, the default polygon mass.
+            restitution: The restitution coefficient for the body. Defaults to 0.5.
+            body_type: How the body moves, see rigidbody.BODY_TYPES.
+                Defaults to dynamic.
+        """
+        if radius is None:
+            radius = self.default_polygon_size.get() / 2
+        if mass is None:
+            mass = self.default_polygon_mass.get()
+        velocity = velocity if velocity is not None else Vec2()
+        position = self.place(position)
+
+        body = rigidbody.RigidBody(
+            shapes.get_circle(radius),
+            position,
+            velocity,
+            angle,
+            mass,
+            restitution,
+            body_type,
+        )
+        canvas_id = self.draw_circle(
+            position,
+            radius,
+            outline=self.canvas.polygon_outline,
+            fill=self.canvas.polygon_fill
+        )
+        self.simulation_controller.physics_engine.bodies.add(body, canvas_id)
+
+    def place(self, position: Optional[Vec2 | str]) -> Vec2:
+        """Finds where to create a body.
+
+        Args:
+            position: The position of the body. If "center" or None, the
+                center of the canvas, and if "bottom", the middle of its
+                bottom edge.
+
+        Returns:
+            The position on the canvas.
+        """
         # Bad fix for cwidth and cheight not being set.
         if position == "center" or position is None:
             self.canvas.update_dimensions()
@@ -84,16 +190,7 @@ class BodyRenderer:
                 position = Vec2(100, 100)
             else:
                 position = Vec2(cwidth / 2, cheight)
-
-        body = rigidbody.RigidBody(
-            vertices, position, velocity, angle, mass, restitution
-        )
-        canvas_id = self.draw_polygon(
-            *body.get_vertices().unpack(),
-            outline=self.canvas.polygon_outline,
-            fill=self.canvas.polygon_fill
-        )
-        self.simulation_controller.physics_engine.bodies.add(body, canvas_id)
+        return position
 
     def draw_polygon(self, vertices: list[float], *args, **kwargs) -> int:
         """Draws a polygon on the canvas and returns its ID.
@@ -108,3 +205,20 @@ class BodyRenderer:
         """
         tags = "body"
         return self.canvas.create_polygon(vertices, tags=tags, *args, **kwargs)
+
+    def draw_circle(self, position: Vec2, radius: Scalar, *args, **kwargs) -> int:
+        """Draws a circle on the canvas and returns its ID.
+
+        Args:
+            position: The center of the circle.
+            radius: The radius of the circle.
+            *args: Additional positional arguments for the drawing function.
+            **kwargs: Additional keyword arguments for the drawing function.
+
+        Returns:
+            The ID of the drawn circle on the canvas.
+        """
+        tags = "body"
+        return self.canvas.create_oval(
+            *circle_coordinates(position, radius), tags=tags, *args, **kwargs
+        )
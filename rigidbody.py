@@ -1,9 +1,60 @@
+import itertools
+import math
+from array import array
+from bisect import bisect_left
 from typing import Any, Optional
 
 import physics
-from custom_types import Scalar
+from body_store import BodyStore
+from custom_types import AABB, Scalar
+from shapes import Shape
 from vec2 import Vec2, Vec2List
 
+# Bodies with at least this many vertices find support points with a
+# binary search; smaller bodies are quicker to scan.
+SUPPORT_THRESHOLD = 16
+
+# How a body moves. Dynamic bodies are integrated and pushed around by
+# collisions. Static bodies never move and have infinite mass. Kinematic
+# bodies move at their own velocity, ignoring gravity and forces, and
+# push dynamic bodies without being pushed back.
+DYNAMIC = "dynamic"
+STATIC = "static"
+KINEMATIC = "kinematic"
+BODY_TYPES = (DYNAMIC, STATIC, KINEMATIC)
+
+# Numbers every body in the order it was created. Pairs are ordered and
+# cached by these rather than by id(), which depends on where the body
+# happens to be in memory and can be reused once it is freed.
+_serials = itertools.count()
+
+# The properties of a body which move into a BodyStore when attached.
+STORED_PROPERTIES = (
+    "position",
+    "velocity",
+    "angle",
+    "angular_velocity",
+    "mass",
+    "moment_of_inertia",
+    "force",
+    "torque",
+    "previous_position",
+    "previous_angle",
+    "step_position",
+    "step_angle",
+    "body_type",
+    "sleeping",
+)
+
+
+def next_serial() -> int:
+    """Gets the next serial number for a body or wall.
+
+    Returns:
+        A number no body or wall has been given before.
+    """
+    return next(_serials)
+
 
 class RigidBody:
     """A class representing a rigid body in a physics simulation.
@@ -17,53 +68,202 @@ class RigidBody:
     two RigidBodies.
 
     Attributes:
-        vertices: The vertices of the body.
+        shape: The shape of the body, which may be shared with other
+            bodies; see shapes.py.
+        vertices: The vertices of the body. A circle's vertices are
+            an outline, used where it is not handled analytically.
+        radius: The radius of the body if it is a circle, otherwise 0.
         position: The current position of the body.
         velocity: The current velocity of the body.
         angle: The current rotation angle of the body in radians.
         mass: The mass of the body.
         restitution: The restitution coefficient of the body.
-        moment_of_inertia: The moment of inertia of the body.
+        moment_of_inertia: The moment of inertia of the body. It is
+            the shape's unit inertia scaled by the mass, and is
+            recalculated when either changes.
+        min_extent: The smallest width of the body.
+        bounding_radius: The radius of a circle around the body's
+            position which contains the whole body.
+        local_axes: The unique edge normals of the body before rotation,
+            used as the separating axes for SAT.
         angular_velocity: The current angular velocity of the body.
         force: The accumulated force applied to the body.
         torque: The accumulated torque applied to the body.
-        pinned: Indicates whether the body is pinned in place.
+        body_type: How the body moves; see BODY_TYPES.
+        dynamic: Whether the body is dynamic, so collisions move it.
+        pinned: Indicates whether the body is pinned in place, which is
+            the same as being static.
+        sleeping: Indicates whether the body is asleep. Sleeping bodies
+            are not integrated until they are woken.
+        sleep_time: How long the body has been moving slowly enough
+            to fall asleep.
+        previous_position: The position of the body before the last
+            engine update, which the renderer interpolates from.
+        previous_angle: The angle of the body before the last engine
+            update.
+        step_position: The position of the body before the last
+            substep, which continuous collision detection sweeps from.
+        step_angle: The angle of the body before the last substep.
+        cache_hits: How many times the world-space vertices or bounding
+            box were reused rather than recalculated.
+        cache_misses: How many times they had to be recalculated.
+        serial: A number unique to the body, given in the order bodies
+            are created, used to order pairs consistently between runs.
+
+    The world-space vertices and bounding box are cached until the body
+    is moved, rotated or reshaped.
+
+    A body keeps its own state until it is attached to a BodyStore,
+    after which it is a view onto its row in the store; see attach.
+
+    The body keeps its own copy of every vector it is given, and updates
+    its position and velocity in place, so a vector read from a body
+    changes as the body moves; copy it to keep the value. Changing one
+    in place from outside must still be assigned back (body.position =
+    body.position.add_scaled(...)) so the cached vertices are updated.
     """
 
+    __slots__ = (
+        "_store",
+        "_row",
+        "_shape",
+        "_position",
+        "_velocity",
+        "_angle",
+        "_mass",
+        "_restitution",
+        "_moment_of_inertia",
+        "_world_axes",
+        "_axes_angle",
+        "_angular_velocity",
+        "_force",
+        "_torque",
+        "_body_type",
+        "_sleeping",
+        "sleep_time",
+        "_previous_position",
+        "_previous_angle",
+        "_step_position",
+        "_step_angle",
+        "_world_vertices",
+        "_aabb",
+        "_store_version",
+        "cache_hits",
+        "cache_misses",
+        "serial",
+    )
+
     def __init__(
         self,
-        vertices: Vec2List,
+        vertices: Vec2List | Shape,
         position: Vec2,
         velocity: Vec2,
         angle: Scalar = 0,
         mass: Scalar = 5,
         restitution: Scalar = 0.5,
+        body_type: str = DYNAMIC,
     ):
         """Initializes a RigidBody with the specified parameters.
 
         Args:
-            vertices: The vertices of the body.
+            vertices: The vertices of the body, or a Shape to share
+                with other bodies.
             position: The initial position of the body.
-            velocity: The initial velocity of the body.
+            velocity: The initial velocity of the body. Ignored for
+                static bodies.
             angle: The initial rotation angle of the body in degrees.
                 Defaults to 0.
             mass: The mass of the body. Defaults to 5.
             restitution: The restitution coefficient of the body.
                 Defaults to 0.5.
+            body_type: How the body moves, see BODY_TYPES. Defaults to
+                DYNAMIC.
+
+        Raises:
+            ValueError: If the body type is not known.
         """
-        self._vertices: Vec2List = vertices
-        self._position: Vec2 = position
-        self._velocity: Vec2 = velocity
+        if body_type not in BODY_TYPES:
+            raise ValueError(f"Unknown body type: {body_type}")
+        self._store: Optional[BodyStore] = None
+        self._row: int = -1
+        self._shape: Shape = vertices if isinstance(vertices, Shape) else Shape(vertices)
+        self._position: Vec2 = Vec2(position.x, position.y)
+        # Static bodies never move, as when body_type is set.
+        if body_type == STATIC:
+            velocity = Vec2()
+        self._velocity: Vec2 = Vec2(velocity.x, velocity.y)
         self._angle: Scalar = angle
         self._mass: Scalar = mass
         self._restitution: Scalar = restitution
-        self.moment_of_inertia: Scalar = physics.compute_polygon_inertia(
-            self.vertices, mass
-        )
-        self.angular_velocity: Scalar = 0
-        self.force = Vec2()
-        self.torque = 0
-        self.pinned = False
+        self._moment_of_inertia: Scalar = self._shape.unit_inertia * mass
+        self._world_axes: Optional[list[Vec2]] = None
+        self._axes_angle: Scalar = 0
+        self._angular_velocity: Scalar = 0
+        self._force = Vec2()
+        self._torque: Scalar = 0
+        self._body_type: str = body_type
+        self._sleeping = False
+        self.sleep_time: Scalar = 0
+        self._previous_position: Vec2 = Vec2(position.x, position.y)
+        self._previous_angle: Scalar = angle
+        self._step_position: Vec2 = Vec2(position.x, position.y)
+        self._step_angle: Scalar = angle
+        self._world_vertices: Optional[Vec2List] = None
+        self._aabb: Optional[AABB] = None
+        self._store_version: int = -1
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+        self.serial: int = next_serial()
+
+    @property
+    def store(self) -> Optional[BodyStore]:
+        """Gets the store the body is attached to, if any."""
+        return self._store
+
+    def attach(self, store: BodyStore) -> None:
+        """Moves the state of the body into a row of a BodyStore.
+
+        From then on every property reads and writes the row, so the
+        store can integrate the body along with all of the others.
+
+        Args:
+            store: The store to attach to.
+        """
+        if self._store is store:
+            return
+        self.detach()
+        state = self._get_dynamic_state()
+        self._row = store.allocate(self)
+        self._store = store
+        self._set_dynamic_state(state)
+
+    def detach(self) -> None:
+        """Moves the state of the body out of its BodyStore, if any."""
+        if self._store is None:
+            return
+        state = self._get_dynamic_state()
+        self._store.release(self._row)
+        self._store = None
+        self._row = -1
+        self._set_dynamic_state(state)
+
+    def relocate(self, row: int) -> None:
+        """Follows the body's values to another row of its store, after
+        the store has moved them there (see BodyStore.release).
+
+        Args:
+            row: The new index of the row.
+        """
+        self._row = row
+
+    def _get_dynamic_state(self) -> dict[str, Any]:
+        """Reads every value that is kept in a BodyStore."""
+        return {name: getattr(self, name) for name in STORED_PROPERTIES}
+
+    def _set_dynamic_state(self, state: dict[str, Any]) -> None:
+        """Writes every value that is kept in a BodyStore."""
+        for name in STORED_PROPERTIES:
+            setattr(self, name, state[name])
 
     @property
     def velocity(self) -> Vec2:
@@ -72,6 +272,8 @@ class RigidBody:
         Returns:
             The current velocity of the body.
         """
+        if self._store is not None:
+            return Vec2(float(self._store.vx[self._row]), float(self._store.vy[self._row]))
         return self._velocity
 
     @velocity.setter
@@ -81,7 +283,12 @@ class RigidBody:
         Args:
             new_velocity: The new velocity to set.
         """
-        self._velocity = new_velocity
+        if self._store is not None:
+            self._store.vx[self._row] = new_velocity.x
+            self._store.vy[self._row] = new_velocity.y
+            return
+        if new_velocity is not self._velocity:
+            self._velocity = Vec2(new_velocity.x, new_velocity.y)
 
     @property
     def angle(self) -> Scalar:
@@ -90,6 +297,8 @@ class RigidBody:
         Returns:
             The current rotation angle in degrees.
         """
+        if self._store is not None:
+            return float(self._store.angle[self._row])
         return self._angle
 
     @angle.setter
@@ -99,6 +308,10 @@ class RigidBody:
         Args:
             new_angle: The new angle to set in degrees.
         """
+        self._invalidate()
+        if self._store is not None:
+            self._store.angle[self._row] = new_angle
+            return
         self._angle = new_angle
 
     @property
@@ -118,6 +331,9 @@ class RigidBody:
             new_mass: The new mass to set.
         """
         self._mass = new_mass
+        if self._store is not None:
+            self._store.mass[self._row] = new_mass
+        self.moment_of_inertia = self._shape.unit_inertia * new_mass
 
     @property
     def restitution(self) -> Scalar:
@@ -149,6 +365,8 @@ class RigidBody:
         Returns:
             The current position of the body.
         """
+        if self._store is not None:
+            return Vec2(float(self._store.x[self._row]), float(self._store.y[self._row]))
         return self._position
 
     @position.setter
@@ -158,7 +376,301 @@ class RigidBody:
         Args:
             new_position: The new position to set
         """
-        self._position = new_position
+        self._invalidate()
+        if self._store is not None:
+            self._store.x[self._row] = new_position.x
+            self._store.y[self._row] = new_position.y
+            return
+        if new_position is not self._position:
+            self._position = Vec2(new_position.x, new_position.y)
+
+    @property
+    def moment_of_inertia(self) -> Scalar:
+        """Gets the moment of inertia of the body.
+
+        Returns:
+            The moment of inertia of the body.
+        """
+        return self._moment_of_inertia
+
+    @moment_of_inertia.setter
+    def moment_of_inertia(self, new_moment_of_inertia: Scalar):
+        """Sets the moment of inertia of the body.
+
+        Args:
+            new_moment_of_inertia: The new moment of inertia to set.
+        """
+        self._moment_of_inertia = new_moment_of_inertia
+        if self._store is not None:
+            self._store.moment_of_inertia[self._row] = new_moment_of_inertia
+
+    @property
+    def angular_velocity(self) -> Scalar:
+        """Gets the current angular velocity of the body.
+
+        Returns:
+            The angular velocity in radians per second.
+        """
+        if self._store is not None:
+            return float(self._store.angular_velocity[self._row])
+        return self._angular_velocity
+
+    @angular_velocity.setter
+    def angular_velocity(self, new_angular_velocity: Scalar):
+        """Sets the current angular velocity of the body.
+
+        Args:
+            new_angular_velocity: The new angular velocity to set.
+        """
+        if self._store is not None:
+            self._store.angular_velocity[self._row] = new_angular_velocity
+            return
+        self._angular_velocity = new_angular_velocity
+
+    @property
+    def force(self) -> Vec2:
+        """Gets the force accumulated since the last step.
+
+        Returns:
+            The accumulated force.
+        """
+        if self._store is not None:
+            return Vec2(float(self._store.fx[self._row]), float(self._store.fy[self._row]))
+        return self._force
+
+    @force.setter
+    def force(self, new_force: Vec2):
+        """Sets the force accumulated since the last step.
+
+        Args:
+            new_force: The new force to set.
+        """
+        if self._store is not None:
+            self._store.fx[self._row] = new_force.x
+            self._store.fy[self._row] = new_force.y
+            return
+        if new_force is not self._force:
+            self._force = Vec2(new_force.x, new_force.y)
+
+    @property
+    def torque(self) -> Scalar:
+        """Gets the torque accumulated since the last step.
+
+        Returns:
+            The accumulated torque.
+        """
+        if self._store is not None:
+            return float(self._store.torque[self._row])
+        return self._torque
+
+    @torque.setter
+    def torque(self, new_torque: Scalar):
+        """Sets the torque accumulated since the last step.
+
+        Args:
+            new_torque: The new torque to set.
+        """
+        if self._store is not None:
+            self._store.torque[self._row] = new_torque
+            return
+        self._torque = new_torque
+
+    @property
+    def previous_position(self) -> Vec2:
+        """Gets the position of the body before the last update.
+
+        Returns:
+            The previous position of the body.
+        """
+        if self._store is not None:
+            return Vec2(
+                float(self._store.previous_x[self._row]),
+                float(self._store.previous_y[self._row]),
+            )
+        return self._previous_position
+
+    @previous_position.setter
+    def previous_position(self, new_position: Vec2):
+        """Sets the position of the body before the last update.
+
+        Args:
+            new_position: The new previous position to set.
+        """
+        if self._store is not None:
+            self._store.previous_x[self._row] = new_position.x
+            self._store.previous_y[self._row] = new_position.y
+            return
+        if new_position is not self._previous_position:
+            self._previous_position = Vec2(new_position.x, new_position.y)
+
+    @property
+    def previous_angle(self) -> Scalar:
+        """Gets the angle of the body before the last update.
+
+        Returns:
+            The previous angle of the body.
+        """
+        if self._store is not None:
+            return float(self._store.previous_angle[self._row])
+        return self._previous_angle
+
+    @previous_angle.setter
+    def previous_angle(self, new_angle: Scalar):
+        """Sets the angle of the body before the last update.
+
+        Args:
+            new_angle: The new previous angle to set.
+        """
+        if self._store is not None:
+            self._store.previous_angle[self._row] = new_angle
+            return
+        self._previous_angle = new_angle
+
+    @property
+    def step_position(self) -> Vec2:
+        """Gets the position of the body before the last substep.
+
+        Returns:
+            The position at the start of the substep.
+        """
+        if self._store is not None:
+            return Vec2(
+                float(self._store.step_x[self._row]),
+                float(self._store.step_y[self._row]),
+            )
+        return self._step_position
+
+    @step_position.setter
+    def step_position(self, new_position: Vec2):
+        """Sets the position of the body before the last substep.
+
+        Args:
+            new_position: The new position at the start of the substep.
+        """
+        if self._store is not None:
+            self._store.step_x[self._row] = new_position.x
+            self._store.step_y[self._row] = new_position.y
+            return
+        if new_position is not self._step_position:
+            self._step_position = Vec2(new_position.x, new_position.y)
+
+    @property
+    def step_angle(self) -> Scalar:
+        """Gets the angle of the body before the last substep.
+
+        Returns:
+            The angle at the start of the substep.
+        """
+        if self._store is not None:
+            return float(self._store.step_angle[self._row])
+        return self._step_angle
+
+    @step_angle.setter
+    def step_angle(self, new_angle: Scalar):
+        """Sets the angle of the body before the last substep.
+
+        Args:
+            new_angle: The new angle at the start of the substep.
+        """
+        if self._store is not None:
+            self._store.step_angle[self._row] = new_angle
+            return
+        self._step_angle = new_angle
+
+    @property
+    def body_type(self) -> str:
+        """Gets how the body moves.
+
+        Returns:
+            One of BODY_TYPES.
+        """
+        return self._body_type
+
+    @body_type.setter
+    def body_type(self, new_body_type: str):
+        """Sets how the body moves.
+
+        Static bodies are stopped, as a static body's velocity would
+        still be felt by bodies touching it.
+
+        Args:
+            new_body_type: One of BODY_TYPES.
+
+        Raises:
+            ValueError: If the body type is not known.
+        """
+        if new_body_type not in BODY_TYPES:
+            raise ValueError(f"Unknown body type: {new_body_type}")
+        self._body_type = new_body_type
+        if new_body_type == STATIC:
+            self.velocity = Vec2()
+            self.angular_velocity = 0
+        self._update_movable()
+
+    @property
+    def dynamic(self) -> bool:
+        """Gets whether the body is dynamic, so collisions move it."""
+        return self._body_type == DYNAMIC
+
+    @property
+    def pinned(self) -> bool:
+        """Gets whether the body is pinned in place, which is the same
+        as being static."""
+        return self._body_type == STATIC
+
+    @pinned.setter
+    def pinned(self, pinned: bool):
+        """Sets whether the body is pinned in place.
+
+        Args:
+            pinned: True to make the body static, False to make it
+                dynamic.
+        """
+        self.body_type = STATIC if pinned else DYNAMIC
+
+    @property
+    def sleeping(self) -> bool:
+        """Gets whether the body is asleep."""
+        return self._sleeping
+
+    @sleeping.setter
+    def sleeping(self, sleeping: bool):
+        """Sets whether the body is asleep.
+
+        Args:
+            sleeping: True to put the body to sleep.
+        """
+        self._sleeping = sleeping
+        self._update_movable()
+
+    def _update_movable(self) -> None:
+        """Tells the store whether and how the body should be integrated."""
+        if self._store is not None:
+            still = self._body_type == STATIC or self._sleeping
+            self._store.movable[self._row] = 0 if still else 1
+            self._store.dynamic[self._row] = 1 if self._body_type == DYNAMIC else 0
+
+    @property
+    def shape(self) -> Shape:
+        """Gets the shape of the body.
+
+        Returns:
+            The shape of the body.
+        """
+        return self._shape
+
+    @shape.setter
+    def shape(self, new_shape: Shape):
+        """Sets the shape of the body, and recalculates its moment of
+        inertia for the new shape.
+
+        Args:
+            new_shape: The new shape to set.
+        """
+        self._invalidate()
+        self._shape = new_shape
+        self._world_axes = None
+        self.moment_of_inertia = new_shape.unit_inertia * self.mass
 
     @property
     def vertices(self) -> Vec2List:
@@ -167,31 +679,356 @@ class RigidBody:
         Returns:
             The vertices of the body.
         """
-        return self._vertices
+        return self._shape.vertices
 
     @vertices.setter
     def vertices(self, new_vertices: Vec2List):
-        """Sets the current vertices of the body.
+        """Sets the current vertices of the body, giving it a shape of
+        its own.
 
         Args:
             new_vertices: The new vertices to set.
         """
-        self._vertices = new_vertices
+        self.shape = Shape(new_vertices)
+
+    @property
+    def radius(self) -> Scalar:
+        """Gets the radius of the body if it is a circle.
+
+        Returns:
+            The radius of the body, or 0 if it is a polygon.
+        """
+        return self._shape.radius
+
+    @property
+    def min_extent(self) -> Scalar:
+        """Gets the smallest width of the body.
+
+        Returns:
+            The smallest width of the body.
+        """
+        return self._shape.min_extent
+
+    @property
+    def bounding_radius(self) -> Scalar:
+        """Gets the radius of a circle around the body's position which
+        contains the whole body.
+
+        Returns:
+            The bounding radius of the body.
+        """
+        return self._shape.bounding_radius
+
+    @property
+    def local_axes(self) -> list[Vec2]:
+        """Gets the unique edge normals of the body before rotation.
+
+        Returns:
+            The separating axes of the body in local space.
+        """
+        return self._shape.axes
+
+    def _invalidate(self) -> None:
+        """Marks the cached vertices and bounding box as out of date."""
+        self._world_vertices = None
+        self._aabb = None
+
+    def _check_store(self) -> None:
+        """Invalidates the caches if the body's BodyStore has integrated
+        since they were filled.
+
+        A BodyStore moves bodies without calling the setters, so the
+        setters cannot invalidate the caches themselves.
+        """
+        if self._store is not None and self._store.version != self._store_version:
+            self._invalidate()
+            self._store_version = self._store.version
+
+    def _is_cached(self) -> bool:
+        """Determines if the cached vertices are still up to date."""
+        self._check_store()
+        return self._world_vertices is not None
 
     def get_vertices(self) -> Vec2List:
         """Calculates and returns the rotated vertices of the body based on
         its current angle and position.
 
+        The result is cached until the body moves, so it must not be
+        modified.
+
         Returns:
             A Vec2List containing the transformed vertices of the body.
         """
-        transformed_vertices = []
-        for vertex in self.vertices:
-            rotated_vertex = vertex.rotated(self.angle)
-            translated_vertex = rotated_vertex + self.position
-            transformed_vertices.append(translated_vertex)
+        if self._is_cached():
+            self.cache_hits += 1
+            return self._world_vertices
+        self.cache_misses += 1
+        self._world_vertices = self.transform_vertices(self.position, self.angle)
+        return self._world_vertices
+
+    def support_index(self, direction: Vec2) -> int:
+        """Finds the vertex furthest along a direction.
+
+        Bodies with SUPPORT_THRESHOLD or more vertices find it in
+        O(log n) with a binary search over their edge normal angles;
+        the vertices either side are also checked, so rounding in the
+        angles cannot pick the wrong one. Ties go to the lowest index,
+        the same as scanning every vertex.
+
+        Args:
+            direction: The direction to search in.
+
+        Returns:
+            The index of the furthest vertex.
+        """
+        vertices = self.get_vertices()
+        n = len(vertices)
+        dx = direction.x
+        dy = direction.y
+        if n < SUPPORT_THRESHOLD:
+            coordinates = vertices.flat()
+            best = 0
+            best_dot = coordinates[0] * dx + coordinates[1] * dy
+            for i in range(1, n):
+                dot = coordinates[2 * i] * dx + coordinates[2 * i + 1] * dy
+                if dot > best_dot:
+                    best, best_dot = i, dot
+            return best
+
+        angle = (math.atan2(dy, dx) - self.angle) % math.tau
+        shape = self._shape
+        k = bisect_left(shape.normal_angles, angle)
+        # The edges with normals either side of the direction share the
+        # furthest vertex.
+        before = shape.normal_edges[k - 1]
+        after = shape.normal_edges[k % n]
+        index = after if (before + 1) % n == after else before
+
+        coordinates = vertices.flat()
+        best = index
+        best_dot = coordinates[2 * index] * dx + coordinates[2 * index + 1] * dy
+        for i in ((index - 1) % n, (index + 1) % n):
+            dot = coordinates[2 * i] * dx + coordinates[2 * i + 1] * dy
+            if dot > best_dot or dot == best_dot and i < best:
+                best, best_dot = i, dot
+        return best
+
+    def get_axes(self) -> list[Vec2]:
+        """Rotates the body's unique edge normals by its current angle.
+
+        The result only depends on the angle, so it is cached until the
+        body rotates, and must not be modified.
+
+        Returns:
+            The separating axes of the body in world space.
+        """
+        angle = self.angle
+        if self._world_axes is None or self._axes_angle != angle:
+            cos_a = math.cos(angle)
+            sin_a = math.sin(angle)
+            self._world_axes = [
+                Vec2(axis.x * cos_a - axis.y * sin_a, axis.x * sin_a + axis.y * cos_a)
+                for axis in self.local_axes
+            ]
+            self._axes_angle = angle
+        return self._world_axes
 
-        return Vec2List(transformed_vertices)
+    def get_interpolated_vertices(self, alpha: Scalar) -> Vec2List:
+        """Calculates the vertices of the body part of the way between
+        its previous and current state.
+
+        Used for rendering, so motion stays smooth when the physics steps
+        don't line up with the frames.
+
+        Args:
+            alpha: How far between the previous (0) and current (1)
+                state to place the body.
+
+        Returns:
+            A Vec2List containing the transformed vertices of the body.
+        """
+        previous_position = self.previous_position
+        previous_angle = self.previous_angle
+        position = self.position
+        angle = self.angle
+        # Bodies that did not move in the last step can use the cache.
+        if (
+            alpha == 1
+            or previous_position.x == position.x
+            and previous_position.y == position.y
+            and previous_angle == angle
+        ):
+            return self.get_vertices()
+        position = previous_position + (position - previous_position) * alpha
+        angle = previous_angle + (angle - previous_angle) * alpha
+        return self.transform_vertices(position, angle)
+
+    def get_interpolated_position(self, alpha: Scalar) -> Vec2:
+        """Calculates the position of the body part of the way between
+        its previous and current state.
+
+        Used to render circles, which need no vertices.
+
+        Args:
+            alpha: How far between the previous (0) and current (1)
+                state to place the body.
+
+        Returns:
+            The interpolated position.
+        """
+        previous_position = self.previous_position
+        return previous_position + (self.position - previous_position) * alpha
+
+    def transform_vertices(self, position: Vec2, angle: Scalar) -> Vec2List:
+        """Rotates and translates the vertices of the body.
+
+        Args:
+            position: The position to move the vertices to.
+            angle: The angle to rotate the vertices by, in radians.
+
+        Returns:
+            A Vec2List containing the transformed vertices of the body.
+        """
+        # The same rotation as Vec2.rotated, with cos and sin
+        # calculated once rather than per vertex.
+        cos_a = math.cos(angle)
+        sin_a = math.sin(angle)
+        x = position.x
+        y = position.y
+        local = self.vertices.flat()
+        world = array("d", local)
+        for i in range(0, len(local), 2):
+            vertex_x = local[i]
+            vertex_y = local[i + 1]
+            world[i] = vertex_x * cos_a - vertex_y * sin_a + x
+            world[i + 1] = vertex_x * sin_a + vertex_y * cos_a + y
+        return Vec2List.from_flat(world)
+
+    def get_aabb(self) -> AABB:
+        """Calculates the axis-aligned bounding box of the body based on
+        its current angle and position.
+
+        Circles are bounded by their radius, without their vertices.
+
+        Returns:
+            An AABB enclosing all of the transformed vertices of the body.
+        """
+        self._check_store()
+        if self._aabb is None:
+            radius = self._shape.radius
+            if radius:
+                position = self.position
+                self._aabb = AABB(
+                    position.x - radius,
+                    position.y - radius,
+                    position.x + radius,
+                    position.y + radius,
+                )
+            else:
+                coordinates = self.get_vertices().flat()
+                xs = coordinates[0::2]
+                ys = coordinates[1::2]
+                self._aabb = AABB(min(xs), min(ys), max(xs), max(ys))
+        return self._aabb
+
+    def contains_point(self, point: Vec2) -> bool:
+        """Determines if a point lies inside the body.
+
+        As bodies are convex, the point is inside if it is on the same
+        side of every edge.
+
+        Args:
+            point: The point to test.
+
+        Returns:
+            True if the point is inside or on the edge of the body.
+        """
+        radius = self._shape.radius
+        if radius:
+            offset = point - self.position
+            return offset.dot(offset) <= radius * radius
+        vertices = self.get_vertices()
+        sign = 0
+        for i, vertex in enumerate(vertices):
+            edge = vertices[(i + 1) % len(vertices)] - vertex
+            side = edge.cross(point - vertex)
+            if side == 0:
+                continue
+            if sign == 0:
+                sign = 1 if side > 0 else -1
+            elif (side > 0) != (sign > 0):
+                return False
+        return True
+
+    def raycast(
+        self, origin: Vec2, direction: Vec2, max_distance: Scalar = float("inf")
+    ) -> Scalar | None:
+        """Finds where a ray first hits the body.
+
+        Uses Cyrus-Beck clipping: the ray is clipped against the inside
+        half-plane of each edge, and hits if anything is left. Circles
+        are hit analytically.
+
+        Args:
+            origin: The start of the ray.
+            direction: The normalized direction of the ray.
+            max_distance: The length of the ray. Defaults to infinity.
+
+        Returns:
+            The distance along the ray to the body, which is 0 if the
+            ray starts inside, or None if the ray misses.
+        """
+        radius = self._shape.radius
+        if radius:
+            return self._raycast_circle(origin, direction, max_distance, radius)
+        vertices = self.get_vertices()
+        # The winding decides which perpendicular faces outwards.
+        winding = physics.compute_signed_area(vertices)
+        t_enter: Scalar = 0
+        t_exit: Scalar = max_distance
+        for i, vertex in enumerate(vertices):
+            edge = vertices[(i + 1) % len(vertices)] - vertex
+            outward = Vec2(edge.y, -edge.x) if winding > 0 else Vec2(-edge.y, edge.x)
+            denominator = outward.dot(direction)
+            numerator = outward.dot(vertex - origin)
+            if denominator == 0:
+                if numerator < 0:
+                    return None
+                continue
+            t = numerator / denominator
+            if denominator < 0:
+                t_enter = max(t_enter, t)
+            else:
+                t_exit = min(t_exit, t)
+            if t_enter > t_exit:
+                return None
+        return t_enter
+
+    def _raycast_circle(
+        self, origin: Vec2, direction: Vec2, max_distance: Scalar, radius: Scalar
+    ) -> Scalar | None:
+        """Finds where a ray first hits a circular body, see raycast.
+
+        Args:
+            origin: The start of the ray.
+            direction: The normalized direction of the ray.
+            max_distance: The length of the ray.
+            radius: The radius of the body.
+
+        Returns:
+            The distance along the ray to the body, or None if it misses.
+        """
+        offset = origin - self.position
+        # The distance t solves |offset + t * direction|^2 = radius^2.
+        half_b = offset.dot(direction)
+        c = offset.dot(offset) - radius * radius
+        if c <= 0:
+            return 0
+        discriminant = half_b * half_b - c
+        if half_b > 0 or discriminant < 0:
+            return None
+        t = -half_b - math.sqrt(discriminant)
+        return t if t <= max_distance else None
 
     def apply_force(self, force: Vec2, point: Optional[Vec2] = None) -> None:
         """Applies a force to the body at a specified point.
@@ -201,13 +1038,14 @@ class RigidBody:
             point: The point of application of the force.
                 If provided, torque will be calculated.
         """
-        self.force = self.force + force
+        self.force += force
         if point is not None:
             r = point - self.position
             self.torque += r.cross(force)
 
     def pin(self, position: Optional[Vec2] = None) -> None:
-        """Pins the body in place, preventing it from moving.
+        """Pins the body in place by making it static, or unpins it if
+        it is already pinned.
 
         Args:
             position: The position to pin the body to.
@@ -225,9 +1063,63 @@ class RigidBody:
         self.pinned = True
 
     def unpin(self) -> None:
-        """Unpins the body, allowing it to move freely again."""
+        """Unpins the body, making it dynamic again."""
         self.pinned = False
 
+    def sleep(self) -> None:
+        """Puts the body to sleep, stopping it in place."""
+        self.velocity = Vec2()
+        self.angular_velocity = 0
+        self.force = Vec2()
+        self.torque = 0
+        self.sleeping = True
+
+    def wake(self) -> None:
+        """Wakes the body, restarting its sleep timer."""
+        self.sleeping = False
+        self.sleep_time = 0
+
+    def update_sleep(
+        self,
+        delta_time: Scalar,
+        linear_threshold: Scalar,
+        angular_threshold: Scalar,
+        time_to_sleep: Scalar,
+    ) -> bool:
+        """Advances the sleep timer, putting the body to sleep if it has
+        been still for long enough.
+
+        Args:
+            delta_time: The time step for the update.
+            linear_threshold: The speed below which the body is still.
+            angular_threshold: The angular speed below which the body is still.
+            time_to_sleep: How long the body must be still before sleeping.
+
+        Returns:
+            True if the body fell asleep during this update.
+        """
+        if (
+            self.velocity.magnitude() > linear_threshold
+            or abs(self.angular_velocity) > angular_threshold
+        ):
+            self.sleep_time = 0
+            return False
+        self.sleep_time += delta_time
+        if self.sleep_time < time_to_sleep:
+            return False
+        self.sleep()
+        return True
+
+    def save_state(self) -> None:
+        """Remembers the current position and angle for interpolation."""
+        self.previous_position = self.position
+        self.previous_angle = self.angle
+
+    def save_step(self) -> None:
+        """Remembers the current position and angle for sweeping."""
+        self.step_position = self.position
+        self.step_angle = self.angle
+
     def update(self, delta_time: Scalar, gravity: Scalar = 9.8) -> None:
         """Updates the state of the body based on the elapsed time and gravity.
 
@@ -236,31 +1128,48 @@ class RigidBody:
             gravity: The gravitational acceleration to apply.
                 Defaults to 9.8 m/s².
         """
-        if self.pinned:
+        if self._body_type == STATIC:
             return
-        self.apply_force(Vec2(0, self.mass * gravity))
-
-        acceleration = self.force / self.mass
-        self.velocity = self.velocity + acceleration * delta_time
-        self.position = self.position + self.velocity * delta_time
+        if self._body_type == KINEMATIC:
+            # Kinematic bodies keep their velocity; forces are dropped.
+            self.position = self.position.add_scaled(self.velocity, delta_time)
+            self.angle += self.angular_velocity * delta_time
+            self.force = Vec2()
+            self.torque = 0
+            return
+        mass = self.mass
+        force = self.force
+        # Gravity is added to the force here rather than with apply_force.
+        acceleration = Vec2(force.x / mass, (force.y + mass * gravity) / mass)
+        # The velocity and position are updated in place.
+        velocity = self.velocity.add_scaled(acceleration, delta_time)
+        self.velocity = velocity
+        self.position = self.position.add_scaled(velocity, delta_time)
 
         angular_acc = self.torque / self.moment_of_inertia
         self.angular_velocity += angular_acc * delta_time
         self.angle += self.angular_velocity * delta_time
 
-        self.force = Vec2()
+        # Forces and torques only last for one step.
+        force *= 0
+        self.force = force
+        self.torque = 0
 
     def get_state(self) -> dict[str, Any]:
         """Gets the current state of the body as a dictionary.
 
         Returns:
             A dictionary containing the position, velocity,
-                angle, mass, and restitution of the body.
+                angle, mass, restitution, sleep state and type of the body.
         """
+        position = self.position
+        velocity = self.velocity
         return {
-            "position": self.position,
-            "velocity": self.velocity,
+            "position": Vec2(position.x, position.y),
+            "velocity": Vec2(velocity.x, velocity.y),
             "angle": self.angle,
             "mass": self.mass,
             "restitution": self.restitution,
+            "sleeping": self.sleeping,
+            "body_type": self.body_type,
         }
@@ -1,5 +1,8 @@
-from custom_types import CollisionResult, Scalar
-from rigidbody import RigidBody
+from typing import Optional
+
+from clipping import clip_contacts
+from custom_types import CollisionResult, Feature, Scalar
+from rigidbody import SUPPORT_THRESHOLD, RigidBody
 from vec2 import Vec2, Vec2List
 
 
@@ -18,10 +21,42 @@ def project_polygon(axis: Vec2, corners: Vec2List) -> tuple[Scalar, Scalar]:
                                scalar values of the projection of the polygon
                                onto the specified axis.
     """
-    dots = [corner.dot(axis) for corner in corners]
+    coordinates = corners.flat()
+    axis_x = axis.x
+    axis_y = axis.y
+    dots = [
+        coordinates[i] * axis_x + coordinates[i + 1] * axis_y
+        for i in range(0, len(coordinates), 2)
+    ]
     return min(dots), max(dots)
 
 
+def project_body(axis: Vec2, body: RigidBody) -> tuple[Scalar, Scalar]:
+    """Projects a body onto a given axis, like project_polygon.
+
+    Bodies with many vertices only project the two furthest along the
+    axis, found with RigidBody.support_index, rather than every vertex.
+
+    Args:
+        axis: A vector representing the axis onto which the body
+                     will be projected.
+        body: The body to project.
+
+    Returns:
+        tuple[Scalar, Scalar]: The minimum and maximum of the projection.
+    """
+    vertices = body.get_vertices()
+    if len(vertices) < SUPPORT_THRESHOLD:
+        return project_polygon(axis, vertices)
+    coordinates = vertices.flat()
+    low = 2 * body.support_index(-axis)
+    high = 2 * body.support_index(axis)
+    return (
+        coordinates[low] * axis.x + coordinates[low + 1] * axis.y,
+        coordinates[high] * axis.x + coordinates[high + 1] * axis.y,
+    )
+
+
 def overlap_intervals(
     min_a: Scalar, max_a: Scalar, min_b: Scalar, max_b: Scalar
 ) -> Scalar:
@@ -47,36 +82,179 @@ def overlap_intervals(
 def find_contact_points(a: Vec2List, b: Vec2List, normal: Vec2) -> Vec2List:
     """Finds the contact points between two sets of 2D vectors based on a given normal vector.
 
-    This function identifies the closest points between two shapes represented by
-    lists of vectors (`a` and `b`) along a specified normal direction. If the
-    closest points are the same, only one contact point is returned; otherwise, both
-    contact points are returned.
+    The face of each shape most facing the other is found, and the one
+    less aligned with the normal is clipped against the other (see
+    clipping.clip_contacts). Face-to-face contacts give two points, one
+    at each end of the overlap; a corner touching a face gives one.
 
     Args:
         a: A list of vectors representing the first shape.
         b: A list of vectors representing the second shape.
         normal: A vector representing the normal direction for the contact
-                       point calculation.
+                       point calculation, pointing from a to b.
 
     Returns:
         Vec2List: A list of vectors representing the contact points between the
                    two shapes. The list may contain one or two contact points.
     """
-    min_a = min(a, key=lambda v: v.dot(-normal))
-    min_b = min(b, key=lambda v: v.dot(normal))
+    contacts, _ = find_contact_features(a, b, normal)
+    return contacts
 
-    contacts = Vec2List()
 
-    if min_a == min_b:
-        contacts.append(min_a)
-    else:
-        contacts.append(min_a)
-        contacts.append(min_b)
+def find_contact_features(
+    a: Vec2List, b: Vec2List, normal: Vec2
+) -> tuple[Vec2List, list[Feature]]:
+    """Finds the contact points between two shapes, and the vertex each
+    one came from.
 
-    return contacts
+    See find_contact_points.
 
+    Args:
+        a: A list of vectors representing the first shape.
+        b: A list of vectors representing the second shape.
+        normal: A vector representing the normal direction for the contact
+                       point calculation, pointing from a to b.
 
-def sat(a: RigidBody, b: RigidBody) -> CollisionResult:
+    Returns:
+        The contact points, and a feature for each contact point naming
+        the body and vertex index it came from.
+    """
+    contacts, features, _ = clip_contacts(a, b, normal)
+    return contacts, features
+
+
+def axis_feature(index: int, count_a: int) -> Feature:
+    """Converts an index into the axes of both bodies to a (body, index) pair.
+
+    Args:
+        index: The index into the axes of the first body followed by
+            the axes of the second.
+        count_a: The number of axes of the first body.
+
+    Returns:
+        0 and the index for an axis of the first body, otherwise 1 and
+        the index into the second body's axes.
+    """
+    return (0, index) if index < count_a else (1, index - count_a)
+
+
+class AxisCache:
+    """Remembers the best axis for each pair of bodies between frames.
+
+    A pair that was separated last frame is usually still separated by
+    the same axis, so sat tries that axis first and returns after a
+    single projection if it still separates them. For colliding pairs
+    the axis of least penetration is remembered, which is the first to
+    separate them as they move apart.
+
+    Axes are stored as (body, index) into RigidBody.get_axes, with body
+    0 for the first body of the pair and 1 for the second, so they
+    follow the bodies as they rotate.
+
+    Attributes:
+        hits: The number of tests ended by the cached axis.
+        misses: The number of tests which had to check every axis.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty cache."""
+        self._axes: dict[tuple[int, int], Feature] = {}
+        self._touched: set[tuple[int, int]] = set()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        """Returns the number of cached pairs."""
+        return len(self._axes)
+
+    @property
+    def hit_rate(self) -> Scalar:
+        """Gets the fraction of tests ended by the cached axis.
+
+        Returns:
+            The hit rate between 0 and 1, or 0 if nothing has been tested.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+    def get_axis(self, a: RigidBody, b: RigidBody) -> Optional[Vec2]:
+        """Gets the cached axis for a pair in world space.
+
+        Args:
+            a: The first body of the pair.
+            b: The second body of the pair.
+
+        Returns:
+            The axis, or None if the pair has no cached axis.
+        """
+        key = (a.serial, b.serial)
+        self._touched.add(key)
+        cached = self._axes.get(key)
+        if cached is None:
+            return None
+        body, index = cached
+        axes = (a if body == 0 else b).get_axes()
+        return axes[index] if index < len(axes) else None
+
+    def set_axis(self, a: RigidBody, b: RigidBody, axis: Feature) -> None:
+        """Remembers the axis for a pair.
+
+        Args:
+            a: The first body of the pair.
+            b: The second body of the pair.
+            axis: The body (0 or 1) and index of the axis.
+        """
+        self._axes[(a.serial, b.serial)] = axis
+
+    def separates(self, a: RigidBody, b: RigidBody) -> bool:
+        """Tests if the cached axis of a pair still separates it,
+        counting a hit or a miss.
+
+        Args:
+            a: The first body of the pair.
+            b: The second body of the pair.
+
+        Returns:
+            True if the pair is separated along its cached axis.
+        """
+        axis = self.get_axis(a, b)
+        if axis is not None:
+            min_a, max_a = project_body(axis, a)
+            min_b, max_b = project_body(axis, b)
+            if overlap_intervals(min_a, max_a, min_b, max_b) <= 0:
+                self.hits += 1
+                return True
+        self.misses += 1
+        return False
+
+    def prune(self) -> None:
+        """Forgets every pair which was not tested since the last prune."""
+        self._axes = {
+            key: axis for key, axis in self._axes.items() if key in self._touched
+        }
+        self._touched = set()
+
+    def forget(self, serial: int) -> None:
+        """Forgets every pair involving a body, such as one which has
+        been removed.
+
+        Args:
+            serial: The serial number of the body.
+        """
+        self._axes = {
+            key: axis for key, axis in self._axes.items() if serial not in key
+        }
+        self._touched = {key for key in self._touched if serial not in key}
+
+    def clear(self) -> None:
+        """Forgets every pair."""
+        self._axes = {}
+        self._touched = set()
+
+
+def sat(
+    a: RigidBody, b: RigidBody, cache: Optional[AxisCache] = None
+) -> CollisionResult:
     """Performs the Separating Axis Theorem (SAT) test to determine
     if two rigid bodies are colliding.
 
@@ -85,13 +263,15 @@ def sat(a: RigidBody, b: RigidBody) -> CollisionResult:
 
     This function checks for collisions between two rigid
     bodies by projecting their vertices onto potential
-    separating axes derived from their edges. If a collision
+    separating axes derived from their edges (see RigidBody.get_axes). If a collision
     is detected, it calculates the penetration depth, the
     collision normal, and the contact points.
 
     Args:
         a: The first rigid body to test for collision.
         b: The second rigid body to test for collision.
+        cache: A cache of the best axis from earlier tests, which is
+            tried first. If None, every axis is checked in order.
 
     Returns:
         An object containing the result of the
@@ -100,28 +280,29 @@ def sat(a: RigidBody, b: RigidBody) -> CollisionResult:
             collision normal, and the contact points;
             otherwise, it indicates no collision.
     """
+    if cache is not None and cache.separates(a, b):
+        return CollisionResult(False)
+
     body_a = a.get_vertices()
     body_b = b.get_vertices()
-    axes: Vec2List = Vec2List()
     penetration: float = float("inf") # Arbitrary upper bound for searching.
     normal = Vec2()
-    contact_points = Vec2List()
+    best = 0
 
-    # Find all axes to check seperation on.
-    for poly in (body_a, body_b):
-        for i in range(len(poly)):
-            edge = poly[(i + 1) % len(poly)] - poly[i]
-            axes.append(edge.perpendicular().normalized())
+    # Find all axes to check seperation on. Each body keeps its unique
+    # edge normals, so they only need rotating rather than recalculating.
+    axes_a = a.get_axes()
+    axes = axes_a + b.get_axes()
 
     if not axes:
         return CollisionResult(False)
 
-    for axis in axes:
+    for i, axis in enumerate(axes):
         # We project the polygon on the axis. The minimum and maximum
         # of each respective body is the minimum and maximum vector,
         # representing the vertex at that position.
-        min_a, max_a = project_polygon(axis, body_a)
-        min_b, max_b = project_polygon(axis, body_b)
+        min_a, max_a = project_body(axis, a)
+        min_b, max_b = project_body(axis, b)
 
         # We overlap the minimum and maximum values of both bodies to
         # get the offset, or translation vector. This is the overlap
@@ -130,17 +311,26 @@ def sat(a: RigidBody, b: RigidBody) -> CollisionResult:
         offset: Scalar = overlap_intervals(min_a, max_a, min_b, max_b)
 
         if offset <= 0:
+            if cache is not None:
+                cache.set_axis(a, b, axis_feature(i, len(axes_a)))
             return CollisionResult(False)
 
         if offset < penetration:
             penetration = offset
             normal = axis
+            best = i
+
+    if cache is not None:
+        cache.set_axis(a, b, axis_feature(best, len(axes_a)))
 
     d = b.position - a.position
     # Reverse the normal direction if it points away from the other body.
     if d.dot(normal) < 0:
         normal = -normal
 
-    contact_points = find_contact_points(body_a, body_b, normal)
+    # Clip the faces at the deepest vertex of each body along the normal.
+    contact_points, features, depths = clip_contacts(
+        body_a, body_b, normal, a.support_index(normal), b.support_index(-normal)
+    )
 
-    return CollisionResult(True, penetration, normal, contact_points)
+    return CollisionResult(True, penetration, normal, contact_points, features, depths)
@@ -0,0 +1,264 @@
+import math
+from collections import OrderedDict
+from typing import Callable
+
+import drawing
+import physics
+from custom_types import Scalar
+from vec2 import Vec2, Vec2List
+
+# The most shapes a ShapeRegistry keeps before evicting the least
+# recently used.
+DEFAULT_CAPACITY = 256
+
+# The number of vertices in the outline of a circle, which is used
+# wherever a circle is not handled analytically (see Circle).
+CIRCLE_SEGMENTS = 32
+
+# Identifies a regular polygon as (sides, size), or a circle as
+# (CIRCLE, radius).
+CIRCLE = "circle"
+type ShapeKey = tuple[int | str, Scalar]
+
+
+class Shape:
+    """The local geometry of a polygon, shared by every body with it.
+
+    Everything here depends only on the vertices, so it is calculated
+    once per shape rather than once per body. Bodies keep a reference to
+    their shape, so it must not be modified once created.
+
+    Attributes:
+        vertices: The vertices of the polygon, relative to its position.
+        radius: The radius of a circle, or 0 for a polygon.
+        area: The area of the polygon.
+        unit_inertia: The moment of inertia of the polygon for a mass
+            of 1. A body's moment of inertia is this times its mass.
+        min_extent: The smallest width of the polygon.
+        bounding_radius: The radius of a circle around the polygon's
+            position which contains the whole polygon.
+        axes: The unique edge normals, used as the separating axes for SAT.
+        normal_angles: The sorted angles of the outward edge normals,
+            used by RigidBody.support_index.
+        normal_edges: The edge each angle in normal_angles belongs to.
+        winding: 1 or -1, so that edge.perpendicular() * winding faces
+            out of the polygon.
+    """
+
+    __slots__ = (
+        "vertices",
+        "radius",
+        "area",
+        "unit_inertia",
+        "min_extent",
+        "bounding_radius",
+        "axes",
+        "normal_angles",
+        "normal_edges",
+        "winding",
+    )
+
+    def __init__(self, vertices: Vec2List) -> None:
+        """Calculates the geometry of a polygon.
+
+        Args:
+            vertices: The vertices of the polygon, relative to its position.
+        """
+        self.vertices = vertices
+        self.radius: Scalar = 0
+        self.area: Scalar = physics.compute_polygon_area(vertices)
+        self.unit_inertia: Scalar = physics.compute_polygon_inertia(vertices, 1)
+        self.min_extent: Scalar = physics.compute_polygon_min_width(vertices)
+        self.bounding_radius: Scalar = physics.compute_bounding_radius(vertices)
+        self.axes: list[Vec2] = physics.compute_unique_axes(vertices)
+        normal_angles = physics.compute_normal_angles(vertices)
+        self.normal_angles: list[Scalar] = [angle for angle, _ in normal_angles]
+        self.normal_edges: list[int] = [edge for _, edge in normal_angles]
+        self.winding: int = 1 if physics.compute_signed_area(vertices) < 0 else -1
+
+    @classmethod
+    def regular(cls, sides: int, size: Scalar) -> "Shape":
+        """Creates a regular polygon, as drawn by the renderer.
+
+        Args:
+            sides: The number of sides.
+            size: The side length of a square of the same size (see
+                drawing.calculate_side_length).
+
+        Returns:
+            The new shape.
+        """
+        side_length = drawing.calculate_side_length(sides, size)
+        return cls(drawing.draw_polygon(side_length, sides))
+
+
+class Circle(Shape):
+    """A circle, which collides analytically rather than as a polygon.
+
+    A circle still has vertices: a regular polygon of CIRCLE_SEGMENTS
+    sides inscribed in it, so anything which only works on polygons
+    (continuous collision detection, or calling sat directly) treats it
+    as that outline. Its area, inertia, extent and bounding radius are
+    those of the true circle.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, radius: Scalar) -> None:
+        """Calculates the geometry of a circle.
+
+        Args:
+            radius: The radius of the circle.
+
+        Raises:
+            ValueError: If the radius is not positive.
+        """
+        if radius <= 0:
+            raise ValueError("Radius must be positive")
+        side_length = 2 * radius * math.sin(math.pi / CIRCLE_SEGMENTS)
+        super().__init__(drawing.draw_polygon(side_length, CIRCLE_SEGMENTS))
+        self.radius = radius
+        self.area = math.pi * radius * radius
+        self.unit_inertia = radius * radius / 2
+        self.min_extent = 2 * radius
+        self.bounding_radius = radius
+
+
+class ShapeRegistry:
+    """Interns regular polygon and circle shapes, so identical bodies
+    share one Shape.
+
+    Polygons are keyed by (sides, size) and circles by (CIRCLE, radius).
+    Once capacity shapes are held,
+    the least recently used is evicted; bodies already using it keep it.
+
+    Attributes:
+        capacity: The most shapes kept at once.
+        hits: How many times a shape was found in the registry.
+        misses: How many times a shape had to be created.
+        evictions: How many shapes have been evicted.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        """Initializes an empty registry.
+
+        Args:
+            capacity: The most shapes kept at once.
+
+        Raises:
+            ValueError: If the capacity is less than 1.
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        self.capacity = capacity
+        self._shapes: OrderedDict[ShapeKey, Shape] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        """Returns the number of shapes held."""
+        return len(self._shapes)
+
+    def __contains__(self, key: ShapeKey) -> bool:
+        """Determines if a shape is held, without counting as a use.
+
+        Args:
+            key: The (sides, size) of a polygon, or (CIRCLE, radius).
+
+        Returns:
+            True if the shape is held.
+        """
+        return key in self._shapes
+
+    def get(self, sides: int, size: Scalar) -> Shape:
+        """Gets the shape of a regular polygon, creating it if needed.
+
+        Args:
+            sides: The number of sides.
+            size: The side length of a square of the same size.
+
+        Returns:
+            The shared shape.
+        """
+        return self._lookup((sides, size), lambda: Shape.regular(sides, size))
+
+    def get_circle(self, radius: Scalar) -> Circle:
+        """Gets the shape of a circle, creating it if needed.
+
+        Args:
+            radius: The radius of the circle.
+
+        Returns:
+            The shared shape.
+        """
+        return self._lookup((CIRCLE, radius), lambda: Circle(radius))
+
+    def _lookup(self, key: ShapeKey, create: Callable[[], Shape]) -> Shape:
+        """Finds a held shape, or creates and holds a new one.
+
+        Args:
+            key: The key of the shape.
+            create: Creates the shape if it is not held.
+
+        Returns:
+            The shared shape.
+        """
+        shape = self._shapes.get(key)
+        if shape is not None:
+            self.hits += 1
+            self._shapes.move_to_end(key)
+            return shape
+        self.misses += 1
+        shape = create()
+        self._shapes[key] = shape
+        if len(self._shapes) > self.capacity:
+            self._shapes.popitem(last=False)
+            self.evictions += 1
+        return shape
+
+    def clear(self) -> None:
+        """Forgets every shape and resets the counts."""
+        self._shapes.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> Scalar:
+        """Gets the fraction of lookups which found a held shape.
+
+        Returns:
+            The hit rate between 0 and 1, or 0 if there were no lookups.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+
+# The registry shared by the renderer and the controller.
+SHAPES = ShapeRegistry()
+
+
+def get_shape(sides: int, size: Scalar) -> Shape:
+    """Gets a regular polygon shape from the shared registry.
+
+    Args:
+        sides: The number of sides.
+        size: The side length of a square of the same size.
+
+    Returns:
+        The shared shape.
+    """
+    return SHAPES.get(sides, size)
+
+
+def get_circle(radius: Scalar) -> Circle:
+    """Gets a circle shape from the shared registry.
+
+    Args:
+        radius: The radius of the circle.
+
+    Returns:
+        The shared shape.
+    """
+    return SHAPES.get_circle(radius)
@@ -1,13 +1,17 @@
 from __future__ import annotations
+import time
 import tkinter as tk
 import engine
 import vec2
-import drawing
-from renderer import BodyRenderer
+import shapes
+from renderer import BodyRenderer, circle_coordinates
 from interaction_manager import InteractionManager
 
 DELTA_TIME = 0.016
 SPEED_FACTOR = 3
+# The most physics steps run in one frame. If the simulation falls further
+# behind than this, the extra time is dropped instead of trying to catch up.
+MAX_STEPS_PER_FRAME = 12
 
 class Controller:
     """Controls the simulation step and manages the physics engine.
@@ -16,12 +20,24 @@ class Controller:
     during each simulation step. It handles the simulation's running state,
     gravity, and speed factor.
 
+    The physics always advances in fixed steps of dt. Real time, scaled by
+    the speed factor, is added to an accumulator each frame, and as many
+    steps are run as fit in it. Bodies are drawn part of the way between
+    their last two states, by how much time is left over.
+
     Attributes:
         running: A boolean indicating whether the simulation is currently running.
         dt: The time step for the simulation.
-        speed: The speed factor for the simulation.
+        speed: The speed factor for the simulation; how many seconds of
+            simulated time pass per real second.
         canvas: The canvas on which the simulation is rendered.
         physics_engine: The physics engine that handles the simulation logic.
+        accumulator: Simulated time which has not been stepped yet.
+        last_time: The time of the last frame, or None when stopped.
+        stats: Frame counters. "steps" is the number of physics steps in
+            the last frame, "dropped_frames" counts frames which hit
+            MAX_STEPS_PER_FRAME and dropped time, and "over_budget_frames"
+            counts frames which took longer than dt to run.
     """
 
     def __init__(self, canvas) -> None:
@@ -30,24 +46,47 @@ class Controller:
         self.speed = SPEED_FACTOR
         self.canvas = canvas
         self.physics_engine = engine.Engine(canvas=self.canvas)
+        self.accumulator = 0.0
+        self.last_time: float | None = None
+        self.stats = {"steps": 0, "dropped_frames": 0, "over_budget_frames": 0}
 
     def step(self) -> None:
-        """Performs a single step in the simulation.
+        """Performs a single frame of the simulation.
 
-        This method updates the physics engine and the canvas based on the
-        current time step and speed factor. If the simulation is running,
-        it schedules the next step using the Tkinter after method.
+        This method steps the physics engine as many times as the elapsed
+        time allows and redraws the canvas. If the simulation is running,
+        it schedules the next frame using the Tkinter after method.
         """
-        scaled_dt = self.dt * self.speed
+        now = time.perf_counter()
+        elapsed = self.dt if self.last_time is None else now - self.last_time
+        self.last_time = now
+        self.accumulator += elapsed * self.speed
+
         self.canvas.update_dimensions()
-        self.physics_engine.update(
-            scaled_dt, vec2.Vec2(self.canvas.width, self.canvas.height)
-        )
+        dimensions = vec2.Vec2(self.canvas.width, self.canvas.height)
+        steps = 0
+        while self.accumulator >= self.dt:
+            if steps == MAX_STEPS_PER_FRAME:
+                # Too far behind to catch up; drop the time rather than
+                # running even more steps next frame.
+                self.accumulator %= self.dt
+                self.stats["dropped_frames"] += 1
+                break
+            self.physics_engine.update(self.dt, dimensions)
+            self.accumulator -= self.dt
+            steps += 1
+        self.stats["steps"] = steps
+
         if self.running:
-            self.update()
-            self.canvas.after(int(self.dt * 1000 / self.speed), self.step)
+            self.update(self.accumulator / self.dt)
+            self.canvas.after(int(self.dt * 1000), self.step)
+        else:
+            self.last_time = None
         self.canvas.parent.properties_frame.update_properties()
 
+        if time.perf_counter() - now > self.dt:
+            self.stats["over_budget_frames"] += 1
+
     def reset(self) -> None:
         """Resets the simulation to its initial state.
 
@@ -57,21 +96,33 @@ class Controller:
         self.dt = DELTA_TIME
         self.running = False
         self.speed = SPEED_FACTOR
+        self.accumulator = 0.0
+        self.last_time = None
         self.physics_engine.reset()
         self.canvas.delete("all")
 
-    def update(self) -> None:
+    def update(self, alpha: float = 1.0) -> None:
         """Updates the positions of all bodies in the simulation.
 
         This method retrieves the current positions of the bodies from the
         physics engine and updates their coordinates on the canvas.
+
+        Args:
+            alpha: How far between their previous (0) and current (1)
+                state to draw the bodies. Defaults to 1.
         """
         for id, body in self.physics_engine.bodies:
-            self.canvas.coords(id, *body.get_vertices().unpack())
+            if body.radius:
+                position = body.get_interpolated_position(alpha)
+                self.canvas.coords(id, *circle_coordinates(position, body.radius))
+            else:
+                self.canvas.coords(id, *body.get_interpolated_vertices(alpha).flat())
 
     def set_gravity(self, new_gravity: str) -> None:
         """Sets the gravity for the physics engine.
 
+        Changing the gravity wakes every sleeping body.
+
         Args:
             new_gravity: A string representing the new gravity value to be set.
         """
@@ -80,6 +131,9 @@ class Controller:
     def set_speed_factor(self, value: str) -> None:
         """Sets the speed factor for the simulation.
 
+        This only changes how much simulated time passes per frame; the
+        physics step stays the same size.
+
         Args:
             value: A string representing the new speed factor to be set.
         """
@@ -96,13 +150,13 @@ class Controller:
         sides = self.canvas.body_renderer.default_polygon_sides.get()
 
         current_body.mass = mass
-
-        side_length = drawing.calculate_side_length(
-            sides, size
+        if current_body.radius:
+            current_body.shape = shapes.get_circle(size / 2)
+        else:
+            current_body.shape = shapes.get_shape(sides, size)
+        self.physics_engine.bodies.refit(
+            self.canvas.interaction_manager.pressed_body_id
         )
-        vertices = drawing.draw_polygon(side_length, sides)
-
-        current_body.vertices = vertices
 
 class Canvas(tk.Canvas):
     """A canvas for rendering the simulation.
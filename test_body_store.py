@@ -0,0 +1,87 @@
+import random
+import unittest
+from unittest import mock
+
+from body_store import HAS_NUMPY
+from engine import Engine
+from rigidbody import DYNAMIC, KINEMATIC, STATIC, RigidBody
+from shapes import get_circle, get_shape
+from vec2 import Vec2
+
+CANVAS = Vec2(800, 600)
+FRAMES = 60
+
+
+def run(backend: str) -> list[tuple]:
+    """Runs a seeded scene with every kind of body, pushing some of them.
+
+    Args:
+        backend: The engine backend, see engine.BACKENDS.
+
+    Returns:
+        The state of every body after every frame.
+    """
+    rng = random.Random(5)
+    engine = Engine(backend=backend)
+    for i in range(60):
+        if i % 3 == 0:
+            shape = get_circle(rng.uniform(8, 20))
+        else:
+            shape = get_shape(rng.randint(3, 8), 30)
+        body_type = STATIC if i % 10 == 1 else KINEMATIC if i % 17 == 2 else DYNAMIC
+        engine.bodies.add(
+            RigidBody(
+                shape,
+                Vec2(rng.uniform(50, 750), rng.uniform(50, 550)),
+                Vec2(rng.uniform(-50, 50), rng.uniform(-50, 50)),
+                mass=rng.uniform(1, 10),
+                restitution=rng.uniform(0, 1),
+                body_type=body_type,
+            )
+        )
+    states = []
+    for _ in range(FRAMES):
+        for i, (_, body) in enumerate(engine.bodies):
+            if i % 4 == 0:
+                body.apply_force(Vec2(30, -20), body.position + Vec2(3, 1))
+        engine.update(0.032, CANVAS)
+        states.append(
+            tuple(
+                (
+                    body.position.x,
+                    body.position.y,
+                    body.velocity.x,
+                    body.velocity.y,
+                    body.angle,
+                    body.angular_velocity,
+                    body.sleeping,
+                )
+                for _, body in engine.bodies
+            )
+        )
+    return states
+
+
+class TestBackends(unittest.TestCase):
+    """The "arrays" backend must give exactly the same results as the
+    "objects" backend, whichever way its store integrates."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = run("objects")
+
+    def assertSameStates(self, states):
+        for frame, (expected, actual) in enumerate(zip(self.expected, states)):
+            self.assertEqual(expected, actual, f"frame {frame}")
+
+    @unittest.skipUnless(HAS_NUMPY, "NumPy is not installed")
+    def test_numpy_store_matches_objects(self):
+        self.assertSameStates(run("arrays"))
+
+    def test_python_store_matches_objects(self):
+        with mock.patch("body_store.HAS_NUMPY", False):
+            self.assertSameStates(run("arrays"))
+
+
+if __name__ == "__main__":
+    unittest.main()
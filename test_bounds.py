@@ -0,0 +1,83 @@
+import unittest
+
+from bounds import Boundary
+from engine import Engine
+from rigidbody import KINEMATIC, RigidBody
+from shapes import get_shape
+from vec2 import Vec2
+
+CANVAS = Vec2(800, 600)
+
+
+def inside(body: RigidBody, dimensions: Vec2) -> bool:
+    """Determines if a body's bounding box is within the canvas."""
+    aabb = body.get_aabb()
+    return (
+        aabb.min_x >= 0
+        and aabb.min_y >= 0
+        and aabb.max_x <= dimensions.x
+        and aabb.max_y <= dimensions.y
+    )
+
+
+class TestKinematicWalls(unittest.TestCase):
+    def test_kinematic_body_bounces_off_walls(self):
+        engine = Engine()
+        body = RigidBody(
+            get_shape(4, 40), Vec2(700, 300), Vec2(400, 150), body_type=KINEMATIC
+        )
+        engine.bodies.add(body)
+        bounced = False
+        for _ in range(300):
+            engine.update(0.016, CANVAS)
+            self.assertTrue(inside(body, CANVAS))
+            bounced = bounced or body.velocity.x < 0
+        self.assertTrue(bounced)
+        # Kinematic bodies keep their speed; only the direction changes.
+        self.assertAlmostEqual(body.velocity.magnitude(), Vec2(400, 150).magnitude())
+
+    def test_reflect_brings_body_back_inside(self):
+        bounds = Boundary(CANVAS)
+        body = RigidBody(
+            get_shape(4, 40), Vec2(-50, 300), Vec2(-30, 10), body_type=KINEMATIC
+        )
+        self.assertTrue(bounds.reflect(body))
+        self.assertTrue(inside(body, CANVAS))
+        self.assertEqual((body.velocity.x, body.velocity.y), (30, 10))
+
+    def test_reflect_leaves_body_moving_away(self):
+        bounds = Boundary(CANVAS)
+        body = RigidBody(
+            get_shape(4, 40), Vec2(790, 300), Vec2(-30, 0), body_type=KINEMATIC
+        )
+        self.assertTrue(bounds.reflect(body))
+        self.assertTrue(inside(body, CANVAS))
+        self.assertEqual(body.velocity.x, -30)
+
+    def test_untouched_body_is_unchanged(self):
+        bounds = Boundary(CANVAS)
+        body = RigidBody(
+            get_shape(4, 40), Vec2(400, 300), Vec2(30, 0), body_type=KINEMATIC
+        )
+        self.assertFalse(bounds.reflect(body))
+        self.assertEqual((body.position.x, body.position.y), (400, 300))
+
+
+class TestWithoutWalls(unittest.TestCase):
+    def test_step_before_first_update(self):
+        engine = Engine(ccd=True)
+        kinematic = RigidBody(
+            get_shape(4, 40), Vec2(-50, 300), Vec2(-30, 0), body_type=KINEMATIC
+        )
+        dynamic = RigidBody(get_shape(4, 40), Vec2(400, 300), Vec2(5000, 0))
+        engine.bodies.add(kinematic)
+        engine.bodies.add(dynamic)
+        self.assertIsNone(engine.bounds)
+        engine.step(0.016)
+        # With no walls yet, nothing is held inside the canvas.
+        self.assertLess(kinematic.position.x, -50)
+        self.assertGreater(dynamic.position.x, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import random
+import unittest
+
+from collision import (
+    detect_collision,
+    detect_collision_flat,
+    handle_collision,
+    resolve_collision,
+    resolve_collision_flat,
+)
+from contacts import Manifold
+from engine import Engine
+from rigidbody import DYNAMIC, KINEMATIC, STATIC, RigidBody
+from shapes import CIRCLE, get_circle, get_shape
+from vec2 import Vec2
+
+# CIRCLE checks that circles are routed the same way by both paths.
+VERTEX_COUNTS = (3, 4, 6, 8, 12, 16, 20, 25, CIRCLE)
+PAIRS = 200
+SIZE = 40
+CANVAS = Vec2(800, 600)
+
+
+def make_pairs(sides: int | str, seed: int = 0) -> list[tuple[RigidBody, RigidBody]]:
+    """Creates pairs of bodies close enough to often overlap, with some
+    velocity so that resolving a collision changes them.
+
+    Args:
+        sides: The number of sides of every polygon, or CIRCLE.
+        seed: The seed for the random positions, angles and velocities.
+
+    Returns:
+        The pairs of bodies.
+    """
+    rng = random.Random(seed)
+    shape = get_circle(SIZE / 2) if sides == CIRCLE else get_shape(sides, SIZE)
+    pairs = []
+    for _ in range(PAIRS):
+        offset = Vec2(rng.uniform(-SIZE, SIZE), rng.uniform(-SIZE, SIZE))
+        body_a = RigidBody(shape, Vec2(0, 0), Vec2(), rng.uniform(0, 6.3))
+        body_b = RigidBody(shape, offset, Vec2(), rng.uniform(0, 6.3))
+        body_a.velocity = Vec2(rng.uniform(-SIZE, SIZE), rng.uniform(-SIZE, SIZE))
+        body_b.angular_velocity = rng.uniform(-1, 1)
+        pairs.append((body_a, body_b))
+    return pairs
+
+
+def describe_result(result) -> tuple | None:
+    """Gets the values of a collision result, for comparison."""
+    if result is None:
+        return None
+    return (
+        result.penetration,
+        tuple(result.normal),
+        tuple(tuple(contact) for contact in result.contacts),
+        tuple(result.features),
+        tuple(result.depths),
+    )
+
+
+def describe_body(body: RigidBody) -> tuple:
+    """Gets the state of a body, for comparison."""
+    return tuple(body.position), tuple(body.velocity), body.angular_velocity
+
+
+def run_engine(**options) -> tuple:
+    """Runs a seeded scene with every kind of body.
+
+    Args:
+        options: The options for the Engine.
+
+    Returns:
+        The state of every body at the end.
+    """
+    rng = random.Random(5)
+    engine = Engine(**options)
+    for i in range(60):
+        if i % 3 == 0:
+            shape = get_circle(rng.uniform(8, 20))
+        else:
+            shape = get_shape(rng.randint(3, 8), 30)
+        body_type = STATIC if i % 10 == 1 else KINEMATIC if i % 17 == 2 else DYNAMIC
+        engine.bodies.add(
+            RigidBody(
+                shape,
+                Vec2(rng.uniform(50, 750), rng.uniform(50, 550)),
+                Vec2(rng.uniform(-50, 50), rng.uniform(-50, 50)),
+                body_type=body_type,
+            )
+        )
+    for _ in range(60):
+        engine.update(0.032, CANVAS)
+    return tuple(
+        (describe_body(body), body.angle, body.sleeping) for _, body in engine.bodies
+    )
+
+
+
+class TestKernels(unittest.TestCase):
+    """The flat-float kernels must give exactly the same results as the
+    Vec2 code they replace, not just close ones."""
+
+    def test_detection_matches(self):
+        for sides in VERTEX_COUNTS:
+            with self.subTest(sides=sides):
+                for body_a, body_b in make_pairs(sides):
+                    self.assertEqual(
+                        describe_result(detect_collision(body_a, body_b)),
+                        describe_result(detect_collision_flat(body_a, body_b)),
+                    )
+
+    def test_resolution_matches(self):
+        for sides in VERTEX_COUNTS:
+            with self.subTest(sides=sides):
+                for (a, b), (flat_a, flat_b) in zip(
+                    make_pairs(sides), make_pairs(sides)
+                ):
+                    result = handle_collision(a, b)
+                    flat_result = handle_collision(flat_a, flat_b, use_kernels=True)
+                    self.assertEqual(describe_result(result), describe_result(flat_result))
+                    if result is not None:
+                        # Resolve again from a made-up accumulated impulse,
+                        # as a warm started manifold would be.
+                        manifold = Manifold(a, b, result)
+                        flat_manifold = Manifold(flat_a, flat_b, flat_result)
+                        for contact in manifold.contacts + flat_manifold.contacts:
+                            contact.normal_impulse = SIZE
+                        resolve_collision(a, b, result, manifold)
+                        resolve_collision_flat(flat_a, flat_b, flat_result, flat_manifold)
+                    for body, flat_body in ((a, flat_a), (b, flat_b)):
+                        self.assertEqual(describe_body(body), describe_body(flat_body))
+
+    def test_engine_matches(self):
+        for backend in ("objects", "arrays"):
+            for narrowphase in ("sat", "gjk"):
+                with self.subTest(backend=backend, narrowphase=narrowphase):
+                    self.assertEqual(
+                        run_engine(backend=backend, narrowphase=narrowphase),
+                        run_engine(backend=backend, narrowphase=narrowphase, kernels=True),
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,7 +11,8 @@ class Toolbar(ttk.Frame):
         parent: The parent widget of this toolbar.
         simulation_canvas: The canvas on which the simulation is rendered.
         play_pause_button: A button to start or pause the simulation.
-        add_square_button: A button to add a polygon to the simulation.
+        add_polygon_button: A button to add a polygon to the simulation.
+        add_circle_button: A button to add a circle to the simulation.
         gravity_scale: A scale widget to adjust the gravity in the simulation.
         speed_factor_scale: A scale widget to adjust the speed factor of the simulation.
         gravity_label: A label displaying the text "Gravity".
@@ -34,6 +35,11 @@ class Toolbar(ttk.Frame):
             text="Add polygon",
             command=self.simulation_canvas.body_renderer.create_polygon,
         )
+        self.add_circle_button = ttk.Button(
+            self,
+            text="Add circle",
+            command=self.simulation_canvas.body_renderer.create_circle,
+        )
 
         self.gravity_scale = ttk.Scale(
             self,
@@ -68,6 +74,7 @@ class Toolbar(ttk.Frame):
 
         self.play_pause_button.grid(column=0, row=1)
         self.add_polygon_button.grid(column=1, row=1)
+        self.add_circle_button.grid(column=1, row=2)
         self.gravity_scale.grid(column=2, row=1)
         self.speed_factor_scale.grid(column=3, row=1)
 
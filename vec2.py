@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import math
-from typing import Generator
+from array import array
+from typing import Generator, Iterable
 
 type Scalar = int | float
 
@@ -9,47 +10,70 @@ type Scalar = int | float
 class Vec2List:
     """A class to manage a list of 2D vectors.
 
+    The coordinates are stored interleaved, [x0, y0, x1, y1, ...], in a
+    single array('d') rather than as a list of Vec2 objects. Indexing
+    gives a Vec2View of the stored coordinates, and flat() gives the
+    array itself, which can be passed straight to canvas.coords and
+    create_polygon.
+
     Attributes:
-        vectors: A list of Vec2 objects.
+        vectors: A list of views of every vector.
     """
 
-    def __init__(self, vectors: list[Vec2] | None = None):
+    def __init__(self, vectors: Iterable[Vec2] | None = None):
         """Initializes a Vec2List with an optional list of Vec2 vectors.
 
         Args:
             vectors: A list of Vec2 objects. If None, initializes an empty list.
         """
-        if vectors is None:
-            self._vectors = []
-        else:
-            self._vectors = vectors
+        self._coordinates = array("d")
+        if vectors is not None:
+            self.vectors = vectors
+
+    @classmethod
+    def from_flat(cls, coordinates: array) -> Vec2List:
+        """Creates a Vec2List which uses an array of coordinates as its
+        storage, without copying it.
+
+        Args:
+            coordinates: The interleaved coordinates, [x0, y0, x1, y1, ...].
+
+        Returns:
+            The new Vec2List.
+        """
+        vectors = cls()
+        vectors._coordinates = coordinates
+        return vectors
 
     @property
     def vectors(self) -> list[Vec2]:
         """Gets the list of vectors.
 
         Returns:
-            The list of Vec2 objects.
+            A view of each vector in the list.
         """
-        return self._vectors
+        return list(self)
 
     @vectors.setter
-    def vectors(self, vectors: list[Vec2]) -> None:
+    def vectors(self, vectors: Iterable[Vec2]) -> None:
         """Sets the list of vectors.
 
         Args:
-            vectors: A new list of Vec2 objects.
+            vectors: A new list of Vec2 objects. Their coordinates are copied.
         """
-        self._vectors = vectors
+        self._coordinates = array(
+            "d", [coordinate for vector in vectors for coordinate in (vector.x, vector.y)]
+        )
 
     def __iter__(self) -> Generator[Vec2, None, None]:
         """Iterates over the vectors in the list.
 
         Yields:
-            Each Vec2 object in the list.
+            A view of each vector in the list.
         """
-        for vector in self.vectors:
-            yield vector
+        coordinates = self._coordinates
+        for offset in range(0, len(coordinates), 2):
+            yield Vec2View(coordinates, offset)
 
     def __getitem__(self, index: int) -> Vec2:
         """Gets a vector by index.
@@ -58,43 +82,70 @@ class Vec2List:
             index: The index of the vector to retrieve.
 
         Returns:
-            Vec2: The Vec2 object at the specified index.
+            Vec2: A view of the vector at the specified index.
+
+        Raises:
+            IndexError: If the index is out of range.
         """
-        return self.vectors[index]
+        count = len(self._coordinates) // 2
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("Vec2List index out of range")
+        return Vec2View(self._coordinates, 2 * index)
 
     def __len__(self) -> int:
         """Gets the number of vectors in the list.
 
         Returns:
-            The number of Vec2 objects in the list.
+            The number of vectors in the list.
         """
-        return len(self.vectors)
+        return len(self._coordinates) // 2
 
     def append(self, item: Vec2) -> None:
-        """Appends a Vec2 object to the list.
+        """Appends a vector to the list.
 
         Args:
-            item: The Vec2 object to append.
+            item: The vector to append. Its coordinates are copied.
         """
-        self.vectors.append(item)
+        self._coordinates.append(item.x)
+        self._coordinates.append(item.y)
+
+    def flat(self) -> array:
+        """Gets the coordinates of every vector, without copying them.
+
+        The array is the list's own storage, so it must not be modified.
+
+        Returns:
+            The interleaved coordinates, [x0, y0, x1, y1, ...].
+        """
+        return self._coordinates
 
     def unpack(self) -> list[Scalar]:
         """Unpacks the list of vectors into a flat list of x and y coordinates.
 
+        flat() does the same without building a new list.
+
         Returns:
             A flat list containing the x and y coordinates of each vector.
         """
-        return [vector for vec in self.vectors for vector in (vec.x, vec.y)]
+        return self._coordinates.tolist()
 
 
 class Vec2:
     """A class representing a 2D vector.
 
+    The in-place operators (+=, -=, *=) and add_scaled change the vector
+    itself rather than creating a new one, so every other reference to
+    it sees the change.
+
     Attributes:
         x: The x-coordinate of the vector.
         y: The y-coordinate of the vector.
     """
 
+    __slots__ = ("_x", "_y")
+
     def __init__(self, x: Scalar = 0.0, y: Scalar = 0.0):
         """Initializes a Vec2 object with x and y coordinates.
 
@@ -158,7 +209,7 @@ class Vec2:
         Returns:
             The resulting vector after addition.
         """
-        return Vec2(self._x + other.x, self._y + other.y)
+        return Vec2(self._x + other._x, self._y + other._y)
     def __sub__(self, other: Vec2) -> Vec2:
         """Subtracts another vector from this vector
 
@@ -168,7 +219,7 @@ class Vec2:
         Returns:
             The resulting vector after subtraction.
         """
-        return Vec2(self._x - other.x, self._y - other.y)
+        return Vec2(self._x - other._x, self._y - other._y)
 
     def __mul__(self, scalar: Scalar) -> Vec2:
         """Multiplies this vector by a scalar.
@@ -181,6 +232,62 @@ class Vec2:
         """
         return Vec2(self._x * scalar, self._y * scalar)
 
+    def __iadd__(self, other: Vec2) -> Vec2:
+        """Adds another vector to this vector in place.
+
+        Args:
+            other: The vector to add.
+
+        Returns:
+            This vector.
+        """
+        self._x += other._x
+        self._y += other._y
+        return self
+
+    def __isub__(self, other: Vec2) -> Vec2:
+        """Subtracts another vector from this vector in place.
+
+        Args:
+            other: The vector to subtract.
+
+        Returns:
+            This vector.
+        """
+        self._x -= other._x
+        self._y -= other._y
+        return self
+
+    def __imul__(self, scalar: Scalar) -> Vec2:
+        """Multiplies this vector by a scalar in place.
+
+        Args:
+            scalar: The scalar to multiply by.
+
+        Returns:
+            This vector.
+        """
+        self._x *= scalar
+        self._y *= scalar
+        return self
+
+    def add_scaled(self, other: Vec2, scalar: Scalar) -> Vec2:
+        """Adds a multiple of another vector to this vector in place.
+
+        The same as self += other * scalar, without creating the
+        intermediate vector.
+
+        Args:
+            other: The vector to add.
+            scalar: The scalar to multiply it by.
+
+        Returns:
+            This vector.
+        """
+        self._x += other._x * scalar
+        self._y += other._y * scalar
+        return self
+
     def __truediv__(self, scalar: Scalar) -> Vec2:
         """Divides this vector by a scalar.
 
@@ -198,7 +305,7 @@ class Vec2:
         Returns:
             The negated vector.
         """
-        return Vec2(-self.x, -self.y)
+        return Vec2(-self._x, -self._y)
 
     def dot(self, other: Vec2) -> Scalar:
         """Calculates the dot product with another vector.
@@ -209,7 +316,7 @@ class Vec2:
         Returns:
             The dot product of the two vectors.
         """
-        return self.x * other.x + self.y * other.y
+        return self._x * other._x + self._y * other._y
 
     def cross(self, other: Vec2) -> Scalar:
         """Calculates the cross product with another vector.
@@ -220,7 +327,7 @@ class Vec2:
         Returns:
             The cross product of the two vectors.
         """
-        return self.x * other.y - self.y * other.x
+        return self._x * other._y - self._y * other._x
 
     def magnitude(self) -> Scalar:
         """Calculates the magnitude (length) of the vector.
@@ -228,7 +335,7 @@ class Vec2:
         Returns:
             The magnitude of the vector.
         """
-        return math.hypot(self.x, self.y)
+        return math.hypot(self._x, self._y)
 
     def rotated(self, angle: Scalar) -> Vec2:
         """Rotates the vector by a given angle in radians.
@@ -241,7 +348,7 @@ class Vec2:
         """
         cos_a = math.cos(angle)
         sin_a = math.sin(angle)
-        return Vec2(self.x * cos_a - self.y * sin_a, self.x * sin_a + self.y * cos_a)
+        return Vec2(self._x * cos_a - self._y * sin_a, self._x * sin_a + self._y * cos_a)
 
     def perpendicular(self) -> Vec2:
         """Calculate the perpendicular vector.
@@ -277,3 +384,63 @@ class Vec2:
         """
         mag = self.magnitude()
         return self / mag if mag else Vec2(0, 0)
+
+
+class Vec2View(Vec2):
+    """A Vec2 whose coordinates are stored in a Vec2List.
+
+    Reading or writing x and y reads or writes the list's storage, and
+    every Vec2 operation works as normal (returning a plain Vec2).
+
+    Attributes:
+        x: The x-coordinate of the vector.
+        y: The y-coordinate of the vector.
+    """
+
+    __slots__ = ("_coordinates", "_offset")
+
+    def __init__(self, coordinates: array, offset: int):
+        """Initializes a view of one vector in an array of coordinates.
+
+        Args:
+            coordinates: The interleaved coordinates, [x0, y0, x1, y1, ...].
+            offset: The index of the vector's x-coordinate in the array.
+        """
+        self._coordinates = coordinates
+        self._offset = offset
+
+    @property
+    def _x(self) -> Scalar:
+        """Gets the stored x-coordinate.
+
+        Returns:
+            The x-coordinate.
+        """
+        return self._coordinates[self._offset]
+
+    @_x.setter
+    def _x(self, new_x: Scalar) -> None:
+        """Sets the stored x-coordinate.
+
+        Args:
+            new_x: The new x-coordinate.
+        """
+        self._coordinates[self._offset] = new_x
+
+    @property
+    def _y(self) -> Scalar:
+        """Gets the stored y-coordinate.
+
+        Returns:
+            The y-coordinate.
+        """
+        return self._coordinates[self._offset + 1]
+
+    @_y.setter
+    def _y(self, new_y: Scalar) -> None:
+        """Sets the stored y-coordinate.
+
+        Args:
+            new_y: The new y-coordinate.
+        """
+        self._coordinates[self._offset + 1] = new_y